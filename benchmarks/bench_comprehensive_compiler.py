@@ -0,0 +1,93 @@
+import sys
+import time
+import logging
+import argparse
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, '.')
+from cleaners.comprehensive_compiler import Compiler
+
+STAT_COLUMNS = [
+    'points', 'threes_attempted', 'threes_made', 'field_goals_attempted', 'field_goals_made', 'free_throws_attempted',
+    'free_throws_made', 'offensive_rebounds', 'defensive_rebounds', 'assists', 'steals', 'blocks', 'turnovers'
+]
+
+def legacy_compile(processed_player_statistic, processed_fixture, intermediate_player_data):
+    """Original outer-merge based compiler, kept here as the benchmark reference."""
+
+    stats_df = processed_player_statistic
+    fixture_df = processed_fixture[['fixture_id', 'played_on']]
+    player_df = intermediate_player_data[['player_id', 'Name']]
+    stats_df = pd.merge(stats_df, player_df, on='player_id', how='outer')
+    stats_df = pd.merge(stats_df, fixture_df, on='fixture_id', how='outer')
+
+    stats_df['rebounds'] = stats_df['offensive_rebounds'] + stats_df['defensive_rebounds']
+    stats_df['fg%'] = round(stats_df['field_goals_made'] / stats_df['field_goals_attempted'] * 100, 2)
+    stats_df['ft%'] = round(stats_df['free_throws_made'] / stats_df['free_throws_attempted'] * 100, 2)
+    stats_df['3pt%'] = round(stats_df['threes_made'] / stats_df['threes_attempted'] * 100, 2)
+    stats_df.rename(columns={'Name': 'player_name'}, inplace=True)
+    return stats_df.sort_values(by=['fixture_id'], ascending=True).reset_index(drop=True)
+
+def compile_data(processed_player_statistic, processed_fixture, intermediate_player_data):
+    """Runs the current compiler end to end."""
+
+    compiler = Compiler(processed_player_statistic, processed_fixture, intermediate_player_data)
+    compiler.compile_data()
+    compiler.clean_compiled_data()
+    return compiler.comprehensive_player_statistic
+
+def synthetic_inputs(rows, players=2400, seed=0):
+    """Builds processed player_statistic, fixture & intermediate player dataframes with ~26 player rows per game."""
+
+    rng = np.random.default_rng(seed)
+    fixtures = max(rows // 26, 1)
+    fixture_df = pd.DataFrame({
+        'fixture_id': 3200000 + np.arange(fixtures) % 1300 + np.arange(fixtures) // 1300 * 1000000,
+        'played_on': pd.Timestamp('2003-10-28') + pd.to_timedelta(np.arange(fixtures) // 8, unit='D')
+    })
+    player_df = pd.DataFrame({'player_id': np.arange(1, players + 1),
+                              'Name': [f'Player {i}' for i in range(1, players + 1)]})
+    stats_df = pd.DataFrame({
+        'player_id': rng.integers(1, players + 1, rows),
+        'fixture_id': fixture_df['fixture_id'].values[rng.integers(0, fixtures, rows)],
+        'player_status': rng.choice(['N/A', 'INJ', 'DNP-CD'], rows),
+        'is_starter': rng.random(rows) < 0.4,
+        'seconds_played': rng.integers(0, 2900, rows)
+    })
+    for col in STAT_COLUMNS:
+        stats_df[col] = rng.integers(0, 15, rows).astype(float)
+    return stats_df, fixture_df, player_df
+
+def measure(func, *args):
+    """Returns the wall time (seconds) & peak traced memory (MB) of calling func with the given arguments."""
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def main():
+    """Times & memory-profiles the legacy and current compilers on a synthetic ~600k-row stats frame."""
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    parser = argparse.ArgumentParser(description='Benchmark the comprehensive compiler against the legacy version.')
+    parser.add_argument('--rows', type=int, default=615626, help='number of player_statistic rows to compile')
+    args = parser.parse_args()
+
+    inputs = synthetic_inputs(args.rows)
+    legacy_df, legacy_time, legacy_peak = measure(legacy_compile, *(df.copy() for df in inputs))
+    current_df, current_time, current_peak = measure(compile_data, *inputs)
+
+    logging.info(f'Compiled {args.rows:,} player_statistic rows')
+    logging.info(f'legacy compiler:  {legacy_time:.3f}s | peak {legacy_peak:.1f} MB | '
+                 f'result {legacy_df.memory_usage(deep=True).sum() / 2 ** 20:.1f} MB')
+    logging.info(f'current compiler: {current_time:.3f}s | peak {current_peak:.1f} MB | '
+                 f'result {current_df.memory_usage(deep=True).sum() / 2 ** 20:.1f} MB')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+import sys
+import time
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, '.')
+from utils import generate_game_id
+
+def legacy_raw_to_fixture_id(raw_ids):
+    """Original per-row string reformatting used by the cleaners, kept here as the benchmark reference."""
+    return raw_ids.apply(lambda x: int(str(x)[1:3] + str(x)[0] + str(x)[3:]))
+
+def random_raw_ids(size, seed=0):
+    """Builds a Series of random raw NBA game IDs (PYYNNNNN) of the given size."""
+    rng = np.random.default_rng(seed)
+    return pd.Series(
+        rng.choice(generate_game_id.PHASES, size) * 10 ** 7 + rng.integers(3, 21, size) * 10 ** 5 +
+        rng.integers(1, 1300, size)
+    )
+
+def time_call(func, *args):
+    """Returns the result & wall time (seconds) of calling func with the given arguments."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    """Times the legacy & vectorized fixture-ID conversions on millions of IDs and checks they agree."""
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    parser = argparse.ArgumentParser(description='Benchmark the game-ID codec against the legacy conversion.')
+    parser.add_argument('--size', type=int, default=5000000, help='number of game IDs to convert')
+    args = parser.parse_args()
+
+    raw_ids = random_raw_ids(args.size)
+    legacy_ids, legacy_time = time_call(legacy_raw_to_fixture_id, raw_ids)
+    codec_ids, codec_time = time_call(generate_game_id.raw_to_fixture_id, raw_ids)
+    assert legacy_ids.equals(codec_ids), 'Vectorized conversion does not match the legacy conversion'
+
+    played_on = np.datetime64('2003-10-01') + np.random.default_rng(1).integers(0, 6500, args.size).astype('m8[D]')
+    schedule_ids, schedule_time = time_call(
+        generate_game_id.generate_game_id, generate_game_id.fixture_season(codec_ids),
+        generate_game_id.fixture_phase(codec_ids), played_on
+    )
+
+    logging.info(f'Converted {args.size:,} game IDs')
+    logging.info(f'legacy raw_to_fixture_id: {legacy_time:.3f}s ({args.size / legacy_time:,.0f} IDs/s)')
+    logging.info(f'codec raw_to_fixture_id:  {codec_time:.3f}s ({args.size / codec_time:,.0f} IDs/s)')
+    logging.info(f'codec generate_game_id:   {schedule_time:.3f}s ({args.size / schedule_time:,.0f} IDs/s)')
+
+if __name__ == '__main__':
+    main()
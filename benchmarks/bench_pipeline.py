@@ -0,0 +1,276 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+
+sys.path.insert(0, '.')
+from benchmarks.bench_comprehensive_compiler import measure
+from execute_cleaners import ExecuteCleaners
+from cleaners.generate_intermediate_player_data import IntermediatePDBuilder
+from cleaners.generate_player_statistic import PlayerStatsCleanser
+from cleaners.generate_fixture import GamesCleanser
+from utils.max_sum_dac_algorithm import MSSDAC
+from utils import generate_raw_data, db_loader, db_schema, async_ingest
+
+try:
+    import psycopg2
+    from psycopg2.pool import ThreadedConnectionPool
+    from inject_rds_data import DBClient, LOAD_PLAN, prepare_dataset
+except ImportError:
+    psycopg2 = None
+
+RESULTS_PATH = './benchmarks/results/'
+HISTORY_PATH = f'{RESULTS_PATH}history.json'  # Every run is appended here
+BASELINE_PATH = f'{RESULTS_PATH}baseline.json'  # Results of the run saved with --save-baseline
+SYNTHETIC_PATH = './data/synthetic/bench/'  # Generated raw data sets, re-used across runs (same seed, same data)
+TEST_DSN = os.getenv('NBA3K_TEST_DSN')  # Local PostgreSQL for the insert stages
+BENCH_SCHEMA = 'nba3k_bench'
+
+# Fixed-size inputs: (seasons, players) passed to the raw data generator; 'large' matches the real 2003-2020 data
+SCALES = {'small': (1, 450), 'medium': (4, 1200), 'large': (18, 2400)}
+# A stage regresses when slower (or hungrier) than its baseline by more than the tolerance, beyond the noise floor
+TOLERANCE = 0.25
+NOISE_SECONDS = 0.1
+NOISE_MB = 1.0
+
+class BenchData:
+    """Raw dataframes of one synthetic scale (loaded like execute_cleaners does), plus the cleaned frames the later
+    stages start from."""
+
+    def __init__(self, scale, seed=0):
+        seasons, players = SCALES[scale]
+        self.scale = scale
+        path = os.path.join(SYNTHETIC_PATH, f'{scale}-s{seasons}-p{players}-seed{seed}')
+        if not os.path.exists(os.path.join(path, 'season_calendar.csv')):
+            logging.info(f'Generating the {scale} raw data set into {path}...')
+            generate_raw_data.generate(path, seasons, players, seed=seed)
+
+        self.from_season = generate_raw_data.FIRST_SEASON
+        loader = ExecuteCleaners(self.from_season, path)
+        loader.load_raw_csv()
+        self.raw_player_data = loader.raw_player_data
+        self.raw_games_details = loader.raw_games_details
+        self.raw_games = loader.raw_games
+        self.raw_season_calendar = loader.raw_season_calendar
+
+        builder = IntermediatePDBuilder(self.raw_player_data, self.raw_games_details)
+        builder.build_comprehensive_player_data()
+        self.intermediate_player_data = builder.intermediate_player_data
+        games = GamesCleanser(self.from_season, self.raw_games, self.raw_season_calendar)
+        games.clean_games_data()
+        self.filtered_fixtures = games.filtered_fixtures
+        self.player_statistic = self.clean_player_statistic()
+
+    def clean_player_statistic(self):
+        """Runs the player_statistic cleaner over the raw games details."""
+        cleaner = PlayerStatsCleanser(
+            self.intermediate_player_data, self.raw_games, self.raw_games_details, self.filtered_fixtures)
+        cleaner.clean_games_details()
+        return cleaner.processed_player_statistic
+
+# Each stage builder returns (prepare, run, rows) for a data set, or None when it can't run here: prepare() is
+# called ahead of every (untimed) run & its result is passed to run(); rows is the stage's input size.
+
+def intermediate_player_data_stage(data):
+    """IntermediatePDBuilder over raw player_data & games_details (rows: games_details rows)."""
+    def run(_):
+        IntermediatePDBuilder(data.raw_player_data, data.raw_games_details).build_comprehensive_player_data()
+    return lambda: None, run, len(data.raw_games_details)
+
+def player_statistic_stage(data):
+    """PlayerStatsCleanser.clean_games_details (rows: games_details rows)."""
+    return lambda: None, lambda _: data.clean_player_statistic(), len(data.raw_games_details)
+
+def dates_parser_stage(data):
+    """GamesCleanser.dates_parser, classifying every raw game (rows: games rows)."""
+    cleaner = GamesCleanser(data.from_season, data.raw_games, data.raw_season_calendar)
+    games_df = data.raw_games[['GAME_DATE_EST', 'SEASON']].rename(
+        columns={'GAME_DATE_EST': 'game_date_est', 'SEASON': 'season'})
+    return games_df.copy, cleaner.dates_parser, len(games_df)
+
+def max_subarray_stage(data):
+    """MSSDAC.max_subarray over every player-season's points deviations, as the streak finder runs it (rows: games)."""
+    stats_df = data.player_statistic[data.player_statistic['seconds_played'] > 0]
+    groups = stats_df.groupby(['player_id', stats_df['fixture_id'] // 10 ** 6])['points']
+    deviations = [(points - points.mean()).tolist() for _, points in groups]
+
+    def run(_):
+        for deviation_list in deviations:
+            MSSDAC().max_subarray(input_list=deviation_list)
+    return lambda: None, run, sum(len(deviation_list) for deviation_list in deviations)
+
+def db_rows_stage(data):
+    """DBClient insert tuples & COPY payload of player_statistic (rows: player_statistic rows)."""
+    if psycopg2 is None:
+        return None
+    client = DBClient.__new__(DBClient)  # Building rows needs no connection
+    dataset = prepare_dataset('player_statistic', data.player_statistic)
+
+    def run(_):
+        async_ingest.copy_text(client._table_rows('player_statistic', dataset, 1))
+    return lambda: None, run, len(dataset)
+
+def _insert_stage(data, write):
+    """Shared set up of the insert stages: player_statistic rows written into an FK-less scratch schema."""
+    if psycopg2 is None or not TEST_DSN:
+        return None
+    pool = ThreadedConnectionPool(1, 1, TEST_DSN)
+    connection = pool.getconn()
+    db_schema.migrate(connection, schema=BENCH_SCHEMA, target=1)
+    pool.putconn(connection)
+    rows = DBClient.__new__(DBClient)._table_rows(
+        'player_statistic', prepare_dataset('player_statistic', data.player_statistic), 1)
+    columns = LOAD_PLAN['player_statistic'][0] + ['created_at']
+
+    def prepare():
+        connection = pool.getconn()
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE TABLE {BENCH_SCHEMA}.player_statistic')
+        connection.commit()
+        pool.putconn(connection)
+    return prepare, lambda _: write(pool, columns, rows), len(rows)
+
+def db_insert_stage(data):
+    """db_loader.insert_rows batches (DBClient.build_database path) into PostgreSQL (rows: player_statistic rows)."""
+    def write(pool, columns, rows):
+        connection = pool.getconn()
+        try:
+            db_loader.insert_rows(connection, 'player_statistic', columns, rows, db_loader.RejectLog(), BENCH_SCHEMA)
+        finally:
+            pool.putconn(connection)
+    return _insert_stage(data, write)
+
+def db_copy_stage(data):
+    """async_ingest.copy_rows (DBClient.stream_database path) into PostgreSQL (rows: player_statistic rows)."""
+    def write(pool, columns, rows):
+        async_ingest.copy_rows(pool, 'player_statistic', columns, db_loader.RejectLog(), rows, BENCH_SCHEMA)
+    return _insert_stage(data, write)
+
+STAGES = {
+    'intermediate_player_data': intermediate_player_data_stage,
+    'player_statistic': player_statistic_stage,
+    'dates_parser': dates_parser_stage,
+    'max_subarray': max_subarray_stage,
+    'db_rows': db_rows_stage,
+    'db_insert': db_insert_stage,
+    'db_copy': db_copy_stage
+}
+
+def run_stage(prepare, run, rows, repeat=3):
+    """Times run (best wall time of repeat runs) & traces its peak memory in one extra run.
+
+    Returns:
+        dict: rows, seconds, peak_mb & rows_per_sec of the stage
+    """
+    times = []
+    for _ in range(repeat):
+        args = prepare()
+        start = time.perf_counter()
+        run(args)
+        times.append(time.perf_counter() - start)
+    peak = measure(run, prepare())[2]
+    seconds = min(times)
+    return {'rows': rows, 'seconds': round(seconds, 6), 'peak_mb': round(peak, 2),
+            'rows_per_sec': round(rows / seconds) if seconds else None}
+
+def find_regressions(results, baseline, tolerance=TOLERANCE):
+    """Compares results with the baseline results of the same stage & scale.
+
+    Returns:
+        list: Messages describing each stage that got slower or used more memory than the tolerance allows
+    """
+    reference = {(result['stage'], result['scale']): result for result in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        base = reference.get((result['stage'], result['scale']))
+        if base is None:
+            continue
+        for metric, unit, noise in (('seconds', 's', NOISE_SECONDS), ('peak_mb', 'MB', NOISE_MB)):
+            if result[metric] > base[metric] * (1 + tolerance) and result[metric] - base[metric] > noise:
+                regressions.append(f'{result["stage"]} [{result["scale"]}]: {metric} {base[metric]}{unit} -> '
+                                   f'{result[metric]}{unit} (x{result[metric] / max(base[metric], 1e-9):.2f})')
+    return regressions
+
+def load_json(path, default):
+    """Reads a JSON results file, or returns default when it doesn't exist yet."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+def write_json(path, content):
+    """Writes a JSON results file, creating its directory if needed."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(content, f, indent=2)
+
+def current_commit():
+    """Returns the short hash of the checked-out commit (None outside of a git checkout)."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    """Times each pipeline stage on synthetic data at several scales, appends the results to the history & flags
+    regressions against the stored baseline (exit status 1 when any stage regressed)."""
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    parser = argparse.ArgumentParser(description='Benchmark the cleaners, streak & loader stages with regression '
+                                                 'tracking.')
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=['small', 'medium'],
+                        help='synthetic data scales to run (large matches the real 2003-2020 data)')
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES), help='stages to run')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per stage (the best one is kept)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the synthetic data sets')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='allowed slow-down before flagging')
+    parser.add_argument('--history', default=HISTORY_PATH, help='JSON file every run is appended to')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='JSON file of the baseline run')
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the new baseline')
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        data = BenchData(scale, args.seed)
+        for stage in args.stages:
+            built = STAGES[stage](data)
+            if built is None:
+                logging.info(f'{stage} [{scale}]: skipped (needs psycopg2, & NBA3K_TEST_DSN for the insert stages)')
+                continue
+            result = {'stage': stage, 'scale': scale, **run_stage(*built, repeat=args.repeat)}
+            results.append(result)
+            logging.info(f'{stage} [{scale}]: {result["rows"]:,} rows | {result["seconds"]:.3f}s | '
+                         f'peak {result["peak_mb"]:.1f} MB | {result["rows_per_sec"] or 0:,} rows/s')
+
+    run = {'timestamp': datetime.now().isoformat(timespec='seconds'), 'commit': current_commit(),
+           'python': platform.python_version(), 'platform': platform.platform(), 'seed': args.seed,
+           'repeat': args.repeat, 'results': results}
+    history = load_json(args.history, [])
+    history.append(run)
+    write_json(args.history, history)
+    logging.info(f'Appended the results to {args.history} ({len(history)} runs).')
+
+    baseline = load_json(args.baseline, None)
+    if args.save_baseline:
+        write_json(args.baseline, run)
+        logging.info(f'Saved this run as the baseline ({args.baseline}).')
+    elif baseline is None:
+        logging.info(f'No baseline at {args.baseline} yet; store one with --save-baseline.')
+    else:
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for regression in regressions:
+            logging.warning(f'REGRESSION {regression}')
+        logging.info(f'{len(regressions)} regressions against the baseline of {baseline["timestamp"]} '
+                     f'({baseline["commit"]}).')
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+import sys
+import time
+import logging
+import argparse
+
+sys.path.insert(0, '.')
+from benchmarks.bench_comprehensive_compiler import synthetic_inputs, compile_data
+from player_valuation import LeagueValuation, PUNT_MASKS
+
+def main():
+    """Times the valuation of a whole season's pool in every punt variant (cold & cached) on synthetic data."""
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    parser = argparse.ArgumentParser(description='Benchmark the 9-cat league valuation engine.')
+    parser.add_argument('--rows', type=int, default=615626, help='number of player_statistic rows to value')
+    parser.add_argument('--season', type=int, default=2005, help='season to value')
+    args = parser.parse_args()
+
+    comprehensive_df = compile_data(*synthetic_inputs(args.rows))
+    start = time.perf_counter()
+    valuation = LeagueValuation(comprehensive_df)
+    logging.info(f'pre-processing {args.rows:,} rows: {time.perf_counter() - start:.3f}s')
+
+    for label, kwargs in [('full season', {}), ('last 10 games', {'last_n': 10})]:
+        start = time.perf_counter()
+        result = valuation.valuate(args.season, **kwargs)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        valuation.valuate(args.season, **kwargs)
+        cached = time.perf_counter() - start
+        logging.info(f'{label}: {len(result["player_ids"])} players x {len(PUNT_MASKS)} punt variants | '
+                     f'cold {cold:.4f}s | cached {cached * 1e6:.1f}us')
+
+if __name__ == '__main__':
+    main()
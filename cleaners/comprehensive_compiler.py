@@ -1,5 +1,20 @@
 import logging
+import numpy as np
 import pandas as pd
+from utils.instrumentation import instrumented
+
+# Column order & compact dtypes of the comprehensive dataframe (counting stats stay float to keep missing values)
+COUNTING_COLUMNS = [
+    'points', 'offensive_rebounds', 'defensive_rebounds', 'rebounds', 'assists', 'steals', 'blocks',
+    'field_goals_made', 'field_goals_attempted', 'free_throws_made', 'free_throws_attempted',
+    'threes_made', 'threes_attempted', 'turnovers'
+]
+COMPREHENSIVE_COLUMNS = [
+    'player_id', 'player_name', 'fixture_id', 'played_on', 'player_status', 'is_starter', 'seconds_played',
+    'points', 'offensive_rebounds', 'defensive_rebounds', 'rebounds', 'assists', 'steals', 'blocks',
+    'field_goals_made', 'field_goals_attempted', 'fg%', 'free_throws_made', 'free_throws_attempted', 'ft%',
+    'threes_made', 'threes_attempted', '3pt%', 'turnovers'
+]
 
 class Compiler:
     """Implements merging & minor cleaning to generate a compiled CSV containing comprehensive player-game-stats data.
@@ -12,17 +27,20 @@ class Compiler:
         self.comprehensive_player_statistic = None
 
     def compile_data(self):
-        """Add player names, game dates info via merge to games details & statistics."""
+        """Add player names, game dates info to games details & statistics via ID lookups (no intermediate merges)."""
 
-        stats_df = self.processed_player_statistic
-        fixture_df = self.processed_fixture[['fixture_id', 'played_on']]
-        player_df = self.intermediate_player_data[['player_id', 'Name']]
+        # Shallow copy, so that new columns are added without copying (or modifying) the processed statistics
+        stats_df = self.processed_player_statistic.copy(deep=False)
 
-        # Use player_id to retrieve player names
-        stats_df = pd.merge(stats_df, player_df, on='player_id', how='outer')
+        # Build ID-indexed lookups (fixtures de-duplicated, as a lookup index must be unique)
+        player_df = self.intermediate_player_data.drop_duplicates(subset=['player_id'])
+        fixture_df = self.processed_fixture.drop_duplicates(subset=['fixture_id'])
+        player_names = pd.Series(player_df['Name'].values, index=player_df['player_id'].values)
+        fixture_dates = pd.Series(fixture_df['played_on'].values, index=fixture_df['fixture_id'].values)
 
-        # Use fixture_id to retrieve game dates
-        stats_df = pd.merge(stats_df, fixture_df, on='fixture_id', how='outer')
+        # Use player_id to retrieve player names & fixture_id to retrieve game dates, aligned on the stats rows
+        stats_df['Name'] = stats_df['player_id'].map(player_names)
+        stats_df['played_on'] = stats_df['fixture_id'].map(fixture_dates)
 
         self.comprehensive_player_statistic = stats_df
 
@@ -36,18 +54,27 @@ class Compiler:
         stats_df['fg%'] = round(stats_df['field_goals_made'] / stats_df['field_goals_attempted'] * 100, 2)
         stats_df['ft%'] = round(stats_df['free_throws_made'] / stats_df['free_throws_attempted'] * 100, 2)
         stats_df['3pt%'] = round(stats_df['threes_made'] / stats_df['threes_attempted'] * 100, 2)
-
         stats_df.rename(columns={'Name': 'player_name'}, inplace=True)
-        stats_df = stats_df[[
-            'player_id', 'player_name', 'fixture_id', 'played_on', 'player_status', 'is_starter', 'seconds_played',
-            'points', 'offensive_rebounds', 'defensive_rebounds', 'rebounds', 'assists', 'steals', 'blocks',
-            'field_goals_made', 'field_goals_attempted', 'fg%', 'free_throws_made', 'free_throws_attempted', 'ft%',
-            'threes_made', 'threes_attempted', '3pt%', 'turnovers'
-        ]]
-        stats_df = stats_df.sort_values(by=['fixture_id'], ascending=True).reset_index(drop=True)
 
-        self.comprehensive_player_statistic = stats_df
+        # Sort by fixture (stable, to keep the original player order within each fixture) & build the typed output
+        order = np.argsort(stats_df['fixture_id'].to_numpy(), kind='mergesort')
+        self.comprehensive_player_statistic = pd.DataFrame({
+            col: self.cast_column(col, stats_df[col].take(order).reset_index(drop=True))
+            for col in COMPREHENSIVE_COLUMNS
+        })
+
+    def cast_column(self, col, values):
+        """Recasts a comprehensive column into a compact type (int32 IDs, float32 counting stats, categories)."""
+
+        if col in ('player_id', 'fixture_id', 'seconds_played') and values.notna().all():
+            return values.astype(np.int32)
+        if col in COUNTING_COLUMNS:
+            return values.astype(np.float32)
+        if col == 'player_status':
+            return values.astype('category')
+        return values
 
+@instrumented()
 def main(processed_player_statistic, processed_fixture, intermediate_player_data):
     """Instantiates compiler object and executes appropriate methods to generate comprehensive_player_statistic df."""
 
@@ -0,0 +1,167 @@
+import logging
+import numpy as np
+import pandas as pd
+from utils.instrumentation import instrumented
+
+# Status codes of the timeline: games played, then the custom statuses of player_status_conversion
+STATUS_CODES = ['PLAYED', 'DNP-CD', 'DNP-REST', 'NWT', 'SUS', 'DNP-ILL', 'INJ', 'PROTOCOL']
+# Statuses where the player wasn't available to play (a coach's decision isn't an absence)
+ABSENCE_CODES = ['DNP-REST', 'NWT', 'SUS', 'DNP-ILL', 'INJ', 'PROTOCOL']
+
+def _day(date):
+    """Returns the day number (days since epoch) of a date, passing day numbers through."""
+    if isinstance(date, (int, np.integer)):
+        return int(date)
+    return int(np.datetime64(pd.Timestamp(date).date(), 'D').astype(np.int64))
+
+class AvailabilityTimeline:
+    """Builds & incrementally extends per-player availability timelines from processed player statistics.
+    Each timeline keeps its game days plus runs of consecutive games sharing a status code (run-length encoding),
+    with cumulative games per status at every run start, so interval queries are binary searches."""
+
+    def __init__(self):
+        self.timelines = {}  # player_id -> dict of days, run_starts, run_codes & run_cumulative arrays
+        self.aggregated_rows = set()  # (player_id, fixture_id) of each row already in the timelines
+
+    @staticmethod
+    def status_codes(player_statistic_df):
+        """Returns the status code index of each row (games with play time are PLAYED, whatever the comment)."""
+        codes = pd.Categorical(player_statistic_df['player_status'].astype(str), categories=STATUS_CODES).codes
+        played = (player_statistic_df['seconds_played'].fillna(0) > 0).to_numpy()
+        return np.where(played | (codes < 0), STATUS_CODES.index('PLAYED'), codes).astype(np.int8)
+
+    @staticmethod
+    def encode(days, codes):
+        """Run-length encodes the status codes of date-ordered games into a timeline dict."""
+        is_start = np.r_[True, codes[1:] != codes[:-1]] if len(codes) else np.zeros(0, dtype=bool)
+        run_starts = np.flatnonzero(is_start).astype(np.int32)
+        run_codes = codes[is_start]
+        lengths = np.diff(np.r_[run_starts, len(codes)])
+        run_games = np.zeros((len(run_starts) + 1, len(STATUS_CODES)), dtype=np.int32)
+        run_games[np.arange(1, len(run_starts) + 1), run_codes] = lengths
+        return {'days': days.astype(np.int32), 'run_starts': run_starts, 'run_codes': run_codes,
+                'run_cumulative': np.cumsum(run_games, axis=0)}
+
+    @staticmethod
+    def decode(timeline):
+        """Returns the per-game status codes of a timeline."""
+        lengths = np.diff(np.r_[timeline['run_starts'], len(timeline['days'])])
+        return np.repeat(timeline['run_codes'], lengths)
+
+    def update(self, player_statistic_df, processed_fixture):
+        """Adds the games of player & fixture pairs not seen yet to the players' timelines (only the affected players
+        change). Rows of an already listed player & fixture are dropped with a warning (runs can't be corrected)."""
+
+        stats_df = player_statistic_df[player_statistic_df['fixture_id'].notna()]
+        rows = pd.MultiIndex.from_arrays([stats_df['player_id'], stats_df['fixture_id']])
+        aggregated = rows.isin(self.aggregated_rows)
+        if aggregated.any():
+            logging.warning(f'Dropped {aggregated.sum()} player statistic rows of already listed (player_id, '
+                            f'fixture_id) pairs, e.g. {rows[aggregated][:5].tolist()}')
+        stats_df = stats_df[~aggregated]
+        fixture_df = processed_fixture.drop_duplicates(subset=['fixture_id'])
+        fixture_days = pd.Series(pd.to_datetime(fixture_df['played_on']).to_numpy(dtype='datetime64[D]'),
+                                 index=fixture_df['fixture_id'].to_numpy())
+        days = stats_df['fixture_id'].map(fixture_days).to_numpy(dtype='datetime64[D]')
+        known = ~np.isnat(days)
+        if not known.all():
+            logging.debug(f'Skipped {int((~known).sum())} rows of fixtures without a date.')
+        stats_df, days = stats_df[known], days[known].astype(np.int64)
+        self.aggregated_rows.update(zip(stats_df['player_id'].tolist(), stats_df['fixture_id'].tolist()))
+
+        player_ids = stats_df['player_id'].to_numpy()
+        codes = self.status_codes(stats_df)
+        order = np.lexsort((stats_df['fixture_id'].to_numpy(), days, player_ids))
+        player_ids, days, codes = player_ids[order], days[order], codes[order]
+        bounds = np.flatnonzero(np.r_[True, player_ids[1:] != player_ids[:-1], True]) if len(order) else []
+
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            player_id, new_days, new_codes = player_ids[lo], days[lo:hi], codes[lo:hi]
+            timeline = self.timelines.get(player_id)
+            if timeline is not None:
+                # Merge with the existing games (a stable sort keeps already-ordered history untouched)
+                all_days = np.r_[timeline['days'], new_days]
+                merge = np.argsort(all_days, kind='stable')
+                new_days, new_codes = all_days[merge], np.r_[self.decode(timeline), new_codes][merge]
+            self.timelines[player_id] = self.encode(new_days, new_codes)
+
+        logging.debug(f'Updated availability timelines of {max(len(bounds) - 1, 0)} players from {len(order)} rows.')
+
+    def _games_before(self, timeline, positions):
+        """Returns the cumulative games by status before the given game positions (one binary search each)."""
+        positions = np.atleast_1d(positions)
+        runs = np.searchsorted(timeline['run_starts'], positions, side='right') - 1
+        counts = timeline['run_cumulative'][np.maximum(runs, 0)].copy()
+        inside = runs >= 0
+        counts[np.flatnonzero(inside), timeline['run_codes'][runs[inside]]] += \
+            positions[inside] - timeline['run_starts'][runs[inside]]
+        return counts
+
+    def games_by_status(self, player_id, start=None, end=None):
+        """Returns a dict of games by status code for a player between two dates (inclusive)."""
+
+        timeline = self.timelines.get(player_id)
+        if timeline is None:
+            return dict.fromkeys(STATUS_CODES, 0)
+        days = timeline['days']
+        lo = 0 if start is None else np.searchsorted(days, _day(start), side='left')
+        hi = len(days) if end is None else np.searchsorted(days, _day(end), side='right')
+        counts = self._games_before(timeline, [hi, max(lo, 0)])
+        return dict(zip(STATUS_CODES, (counts[0] - counts[1]).tolist()))
+
+    def games_missed(self, player_id, statuses=('INJ',), days=30, as_of=None):
+        """Returns the games a player missed with the given statuses in the last N days up to as_of (inclusive)."""
+        as_of = self.last_day(player_id) if as_of is None else _day(as_of)
+        if as_of is None:
+            return 0
+        games = self.games_by_status(player_id, as_of - days + 1, as_of)
+        return sum(games[status] for status in statuses)
+
+    def current_absence(self, player_id, as_of=None):
+        """Returns (status, games missed, first day missed) of a player's ongoing absence as of a date, else None."""
+
+        timeline = self.timelines.get(player_id)
+        if timeline is None:
+            return None
+        position = len(timeline['days']) if as_of is None else np.searchsorted(timeline['days'], _day(as_of), 'right')
+        if position == 0:
+            return None
+        run = np.searchsorted(timeline['run_starts'], position - 1, side='right') - 1
+        status = STATUS_CODES[timeline['run_codes'][run]]
+        if status not in ABSENCE_CODES:
+            return None
+        first = timeline['run_starts'][run]
+        return status, int(position - first), np.datetime64(int(timeline['days'][first]), 'D')
+
+    def last_day(self, player_id):
+        """Returns the day number (days since epoch) of a player's last listed game, or None."""
+        timeline = self.timelines.get(player_id)
+        return None if timeline is None or not len(timeline['days']) else int(timeline['days'][-1])
+
+    def to_frame(self):
+        """Returns every timeline run (player_id, status, first & last day, games), sorted by player & day."""
+
+        frames = []
+        for player_id, timeline in self.timelines.items():
+            ends = np.r_[timeline['run_starts'][1:], len(timeline['days'])]
+            frames.append(pd.DataFrame({
+                'player_id': player_id,
+                'status': np.array(STATUS_CODES)[timeline['run_codes']],
+                'start_date': timeline['days'][timeline['run_starts']].astype('datetime64[D]'),
+                'end_date': timeline['days'][ends - 1].astype('datetime64[D]'),
+                'games': ends - timeline['run_starts']
+            }))
+        if not frames:
+            return pd.DataFrame(columns=['player_id', 'status', 'start_date', 'end_date', 'games'])
+        return pd.concat(frames).sort_values(by=['player_id', 'start_date']).reset_index(drop=True)
+
+@instrumented()
+def main(processed_player_statistic, processed_fixture):
+    """Instantiates timeline object and executes appropriate methods to generate player_availability df.
+    The timelines aren't persisted between runs, so the table is rebuilt in full from every processed statistic."""
+
+    timeline = AvailabilityTimeline()
+    timeline.update(processed_player_statistic, processed_fixture)
+
+    logging.debug(f'Finished building player availability timelines.')
+    return timeline.to_frame()
@@ -1,13 +1,26 @@
+import os
 import logging
 import numpy as np
 import pandas as pd
+from utils import generate_game_id
+from utils.instrumentation import instrumented
+
+# Default location of the season calendar (start, all-star break & end dates of every regular season since 2003)
+SEASON_CALENDAR_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'raw', 'season_calendar.csv')
+
+def load_season_calendar(path=SEASON_CALENDAR_PATH):
+    """Loads the season calendar CSV into a dataframe with datetime64 date columns, sorted by season."""
+    calendar_df = pd.read_csv(path, sep=',', header=0, encoding='utf-8',
+                              parse_dates=['regular_season_start', 'all_star_break', 'regular_season_end'])
+    return calendar_df.sort_values(by='season').reset_index(drop=True)
 
 class GamesCleanser:
     """Implements cleaning methods to generate processed fixture df from the raw games information."""
 
-    def __init__(self, from_season, raw_games):
+    def __init__(self, from_season, raw_games, season_calendar=None):
         self.from_season = from_season
         self.raw_games_data = raw_games
+        self.season_calendar = season_calendar if season_calendar is not None else load_season_calendar()
         self.processed_fixture = None
         self.filtered_fixtures = None
 
@@ -27,14 +40,14 @@ class GamesCleanser:
         # Remove duplicate records of the same game (based on duplicated game_id/fixture)
         games_df.drop_duplicates(keep='first', inplace=True)
 
-        # Calls dates parser function to classify games based on phase of season
+        # Convert game date & call dates parser function to classify games based on phase of season
+        games_df['game_date_est'] = games_df['game_date_est'].astype('datetime64[ns]')
         games_df = self.dates_parser(games_df)
 
         # Edit game_id to new format (YYPNNNNN: YY-Season, P-Phase, NNNNN-GameNumber)
-        games_df['game_id'] = games_df['game_id'].apply(lambda x: int(str(x)[1:3] + str(x)[0] + str(x)[3:]))
+        games_df['game_id'] = generate_game_id.raw_to_fixture_id(games_df['game_id'])
 
-        # Convert game date, sort the dataframe, and reset the index
-        games_df['game_date_est'] = games_df['game_date_est'].astype('datetime64[ns]')
+        # Sort the dataframe, and reset the index
         games_df = games_df.sort_values(by=['season', 'game_date_est'], ascending=True).reset_index(drop=True)
 
         # Set winner/loser conditionally based on scores
@@ -56,38 +69,40 @@ class GamesCleanser:
         self.processed_fixture = games_df
 
     def dates_parser(self, games_df):
-        """Uses custom dates dictionary to classify games according to phase of season."""
-
-        dates_dict = {
-            2020: ('2020-12-22', '2021-03-07', '2021-05-16'),
-            2019: ('2019-10-22', '2020-02-16', '2020-08-14'),
-            2018: ('2018-10-16', '2019-02-17', '2019-04-10'),
-            2017: ('2017-10-17', '2018-02-18', '2018-04-11'),
-            2016: ('2016-10-25', '2017-02-19', '2017-04-12'),
-            2015: ('2015-10-27', '2016-02-14', '2016-04-13')
-        }
-        games_df['game_date_est'] = games_df['game_date_est'].astype(str)
+        """Uses the season calendar to classify games according to type & phase of season in one vectorized pass."""
+
+        if self.season_calendar.empty:
+            raise ValueError('The season calendar is empty, so games cannot be classified by type & phase')
+        calendar_df = self.season_calendar.sort_values(by='season')
+        calendar_seasons = calendar_df['season'].to_numpy(dtype=np.int64)
+        seasons = games_df['season'].to_numpy(dtype=np.int64, na_value=-1)
+        played_on = games_df['game_date_est'].to_numpy(dtype='datetime64[ns]')
 
+        # Look up each game's season within the calendar (games of seasons missing from the calendar stay unclassified)
         logging.debug('Classifying each game into appropriate type and phase...')
-        for season, dates in dates_dict.items():
-            games_df.loc[(games_df['season'] == season) &
-                         (games_df['game_date_est'] < dates[0]), 'game_type'] = 'pre-season'
-            games_df.loc[(games_df['season'] == season) &
-                         (games_df['game_date_est'] > dates[2]), 'game_type'] = 'post-season'
-            games_df.loc[(games_df['game_date_est'] <= dates[2]) &
-                         (games_df['game_date_est'] >= dates[0]), 'game_type'] = 'regular-season'
-            games_df.loc[(games_df['game_type'] == 'regular-season') &
-                         (games_df['game_date_est'] < dates[1]), 'season_phase'] = 'before-asb'
-            games_df.loc[(games_df['game_type'] == 'regular-season') &
-                         (games_df['season_phase'] != 'before-asb'), 'season_phase'] = 'after-asb'
-            games_df.loc[games_df['game_type'] != 'regular-season', 'season_phase'] = 'na'
+        idx = np.minimum(np.searchsorted(calendar_seasons, seasons), len(calendar_seasons) - 1)
+        in_calendar = calendar_seasons[idx] == seasons
+        start, asb, end = (calendar_df[col].to_numpy(dtype='datetime64[ns]')[idx]
+                           for col in ['regular_season_start', 'all_star_break', 'regular_season_end'])
+        if not in_calendar.all():
+            logging.warning(f'Seasons missing from the season calendar: {sorted(set(seasons[~in_calendar]))}')
+
+        game_type = np.select(
+            [~in_calendar, played_on < start, played_on > end],
+            [None, 'pre-season', 'post-season'],
+            default='regular-season'
+        )
+        games_df['game_type'] = game_type
+        games_df['season_phase'] = np.where(
+            game_type == 'regular-season', np.where(played_on < asb, 'before-asb', 'after-asb'), 'na')
 
         return games_df
 
-def main(from_season, raw_games):
+@instrumented()
+def main(from_season, raw_games, season_calendar=None):
     """Instantiates data cleanser object and executes appropriate methods to generate processed_fixture df."""
 
-    cleaner = GamesCleanser(from_season, raw_games)
+    cleaner = GamesCleanser(from_season, raw_games, season_calendar)
     cleaner.clean_games_data()
 
     logging.debug(f'Finished processing games information for seasons of interest.')
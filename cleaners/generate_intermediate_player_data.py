@@ -1,5 +1,6 @@
 import logging
 import pandas as pd
+from utils.instrumentation import instrumented
 
 class IntermediatePDBuilder:
     """Implements cleaning & merging to generate intermediate_player_data containing comprehensive player info.
@@ -46,6 +47,7 @@ class IntermediatePDBuilder:
 
         self.intermediate_player_data = intermediate_df
 
+@instrumented()
 def main(raw_player_data, raw_games_details):
     """Instantiates data cleanser object and executes appropriate methods to generate intermediate_player_data df."""
 
@@ -1,5 +1,6 @@
 import logging
 import pandas as pd
+from utils.instrumentation import instrumented
 
 class PlayerCleanser:
     """Utilizes intermediate_player_data to clean & generate player dataframe."""
@@ -50,6 +51,7 @@ class PlayerCleanser:
 
         self.processed_player_data = player_df
 
+@instrumented()
 def main(intermediate_player_data):
     """Instantiates data cleanser object and executes appropriate methods to generate processed team.csv."""
 
@@ -1,5 +1,6 @@
 import logging
 import pandas as pd
+from utils.instrumentation import instrumented
 
 class PositionCleanser:
     """Utilizes intermediate_player_data to clean & generate player_position dataframe."""
@@ -28,6 +29,7 @@ class PositionCleanser:
 
         self.processed_position_data = position_2020_df
 
+@instrumented()
 def main(intermediate_player_data):
     """Instantiates data cleanser object and executes appropriate methods to generate processed player_position df."""
 
@@ -0,0 +1,126 @@
+import logging
+import numpy as np
+import pandas as pd
+from utils import generate_game_id
+from utils.instrumentation import instrumented
+
+# Counting stats aggregated per player & season (rebounds derived from offensive + defensive rebounds)
+AGGREGATE_STATS = [
+    'points', 'offensive_rebounds', 'defensive_rebounds', 'rebounds', 'assists', 'steals', 'blocks', 'turnovers',
+    'field_goals_made', 'field_goals_attempted', 'free_throws_made', 'free_throws_attempted',
+    'threes_made', 'threes_attempted'
+]
+# Shooting percentages computed from season made/attempted totals (rather than averaging per-game percentages)
+PERCENTAGE_STATS = {
+    'fg%': ('field_goals_made', 'field_goals_attempted'),
+    'ft%': ('free_throws_made', 'free_throws_attempted'),
+    '3pt%': ('threes_made', 'threes_attempted')
+}
+
+class SeasonAggregator:
+    """Builds & incrementally maintains per-player regular-season aggregates from processed player statistics.
+    Purpose: To let analytic modules look up season totals, averages & variances instead of recomputing them."""
+
+    def __init__(self):
+        self.keys = []  # (player_id, season) of each aggregate row, in insertion order
+        self.index = {}  # (player_id, season) -> row position, for O(1) look-ups
+        self.sums = np.zeros((0, 2 + 2 * len(AGGREGATE_STATS)))  # games, seconds, stat totals, stat sums of squares
+        self.aggregated_rows = set()  # (player_id, fixture_id) of each row already in the running sums
+
+    def partial_sums(self, player_statistic_df):
+        """Sums games, seconds, stats & squared stats by (player_id, season) for regular-season rows not aggregated yet.
+        Rows of an already aggregated player & fixture are dropped with a warning (sums can't be corrected in place)."""
+
+        stats_df = player_statistic_df[generate_game_id.is_regular_season(player_statistic_df['fixture_id'])]
+        rows = pd.MultiIndex.from_arrays([stats_df['player_id'], stats_df['fixture_id']])
+        aggregated = rows.isin(self.aggregated_rows)
+        if aggregated.any():
+            logging.warning(f'Dropped {aggregated.sum()} player statistic rows of already aggregated (player_id, '
+                            f'fixture_id) pairs, e.g. {rows[aggregated][:5].tolist()}')
+        stats_df = stats_df[~aggregated]
+        self.aggregated_rows.update(rows[~aggregated].tolist())
+
+        # Rows without play time (DNP, injuries, etc.) don't count as games & carry no stats
+        seconds = stats_df['seconds_played'].fillna(0).to_numpy(dtype=np.float64)
+        played = seconds > 0
+        values = pd.DataFrame({
+            'player_id': stats_df['player_id'].to_numpy(),
+            'season': generate_game_id.fixture_season(stats_df['fixture_id'].to_numpy(dtype=np.int64))
+        })
+        stats = stats_df.reindex(columns=AGGREGATE_STATS).fillna(0).to_numpy(dtype=np.float64)
+        if 'rebounds' not in stats_df.columns:
+            stats[:, AGGREGATE_STATS.index('rebounds')] = (stats[:, AGGREGATE_STATS.index('offensive_rebounds')] +
+                                                          stats[:, AGGREGATE_STATS.index('defensive_rebounds')])
+        stats[~played] = 0
+
+        sums_df = pd.concat([values, pd.DataFrame(
+            np.column_stack([played, seconds, stats, stats ** 2]), index=values.index
+        )], axis=1).groupby(['player_id', 'season'], sort=False).sum()
+
+        return list(sums_df.index), sums_df.to_numpy()
+
+    def update(self, player_statistic_df):
+        """Adds the regular-season rows of fixtures not aggregated yet into the running sums (in place)."""
+
+        keys, sums = self.partial_sums(player_statistic_df)
+
+        # Append rows for (player_id, season) pairs seen for the first time, then add the new sums at each position
+        new_keys = [key for key in keys if key not in self.index]
+        for key in new_keys:
+            self.index[key] = len(self.keys)
+            self.keys.append(key)
+        self.sums = np.vstack([self.sums, np.zeros((len(new_keys), self.sums.shape[1]))])
+        np.add.at(self.sums, [self.index[key] for key in keys], sums)
+
+        logging.debug(f'Aggregated {len(keys)} player-seasons ({len(new_keys)} new) from {len(sums)} sum rows.')
+
+    def derive(self, sums):
+        """Derives games, minutes, totals, per-game, per-36, variance & percentages from rows of running sums."""
+
+        n_stats = len(AGGREGATE_STATS)
+        games, seconds = sums[:, 0], sums[:, 1]
+        totals, squares = sums[:, 2:2 + n_stats], sums[:, 2 + n_stats:]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            per_game = totals / games[:, None]
+            per_36 = totals / seconds[:, None] * 2160
+            variance = np.where(games[:, None] > 1, (squares - totals * per_game) / (games[:, None] - 1), np.nan)
+
+            derived = {'games': games.astype(np.int64), 'minutes': np.round(seconds / 60, 1)}
+            for i, stat in enumerate(AGGREGATE_STATS):
+                derived[stat] = totals[:, i]
+                derived[f'{stat}_per_game'] = np.round(per_game[:, i], 2)
+                derived[f'{stat}_per_36'] = np.round(per_36[:, i], 2)
+                derived[f'{stat}_var'] = np.round(np.maximum(variance[:, i], 0), 3)
+            for pct, (made, attempted) in PERCENTAGE_STATS.items():
+                derived[pct] = np.round(
+                    totals[:, AGGREGATE_STATS.index(made)] / totals[:, AGGREGATE_STATS.index(attempted)] * 100, 2)
+
+        return derived
+
+    def get(self, player_id, season):
+        """Returns the aggregates of a player's season as a dict (O(1) look-up), or None if there is no record."""
+
+        position = self.index.get((player_id, season))
+        if position is None:
+            return None
+        derived = self.derive(self.sums[position:position + 1])
+        return {'player_id': player_id, 'season': season, **{col: values[0] for col, values in derived.items()}}
+
+    def to_frame(self):
+        """Returns the aggregates table of every player & season, sorted by player_id & season."""
+
+        aggregate_df = pd.DataFrame(self.keys, columns=['player_id', 'season'])
+        aggregate_df = pd.concat([aggregate_df, pd.DataFrame(self.derive(self.sums))], axis=1)
+        return aggregate_df.sort_values(by=['player_id', 'season']).reset_index(drop=True)
+
+@instrumented()
+def main(processed_player_statistic):
+    """Instantiates aggregator object and executes appropriate methods to generate player_season_aggregate df.
+    The aggregator isn't persisted between runs, so the table is rebuilt in full from every processed statistic."""
+
+    aggregator = SeasonAggregator()
+    aggregator.update(processed_player_statistic)
+
+    logging.debug(f'Finished aggregating player statistics by season.')
+    return aggregator.to_frame()
@@ -1,5 +1,7 @@
 import logging
 import pandas as pd
+from utils import generate_game_id
+from utils.instrumentation import instrumented
 
 class PlayerStatsCleanser:
     """Implements extensive cleaning & merging to generate processed player_statistic df from several raw sources."""
@@ -27,9 +29,7 @@ class PlayerStatsCleanser:
         games_details_df = games_details_df[games_details_df["GAME_ID"].isin(self.games_df.GAME_ID.unique())]
 
         # Edit game_id to new format (YYPNNNNN: YY=Season, P=Phase, NNNNN=GameNumber)
-        games_details_df['GAME_ID'] = games_details_df['GAME_ID'].apply(
-            lambda x: int(str(x)[1:3] + str(x)[0] + str(x)[3:])
-        )
+        games_details_df['GAME_ID'] = generate_game_id.raw_to_fixture_id(games_details_df['GAME_ID'])
 
         # Call intermediary cleaning functions to convert column values in desired formats
         games_details_df = self.position_conversion(games_details_df)  # Convert start positions to bool
@@ -160,12 +160,17 @@ class PlayerStatsCleanser:
 
         player_id_df = self.intermediate_player_data[['player_id', 'Name']]
 
-        logging.debug(f'games_details_df row length before merging: {len(games_details_df.index)}')  # 615626
+        # The merge must keep one row per games_details row (a repeated player name would duplicate rows)
+        rows_before = len(games_details_df.index)
         games_details_df = pd.merge(games_details_df, player_id_df, left_on='PLAYER_NAME', right_on='Name', how='left')
-        logging.debug(f'games_details_copy row length after merging: {len(games_details_df.index)}')  # 615626
+        if len(games_details_df.index) != rows_before:
+            logging.warning(f'Merging player IDs changed games_details_df from {rows_before} to '
+                            f'{len(games_details_df.index)} rows; check intermediate player data for repeated names')
+        logging.debug(f'games_details_df rows after merging player IDs: {len(games_details_df.index)}')
 
         return games_details_df
 
+@instrumented()
 def main(intermediate_player_data, raw_games, raw_games_details, filtered_fixtures):
     """Instantiates data cleanser object and executes appropriate methods to generate processed player_statistic.csv."""
 
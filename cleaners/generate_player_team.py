@@ -1,5 +1,6 @@
 import logging
 import pandas as pd
+from utils.instrumentation import instrumented
 
 class PlayerTeamCleanser:
     """Cleans & merges to generate processed player_team df from intermediate player & processed team info."""
@@ -29,6 +30,7 @@ class PlayerTeamCleanser:
 
         self.processed_player_team_2020 = player_team_2020
 
+@instrumented()
 def main(intermediate_player_data, processed_team):
     """Instantiates data cleanser object and executes appropriate methods to generate processed player_team.csv."""
 
@@ -1,5 +1,6 @@
 import logging
 import pandas as pd
+from utils.instrumentation import instrumented
 
 class TeamCleanser:
     """Implements cleaning & merging to generate processed_team df containing desired team info with team IDs."""
@@ -30,6 +31,7 @@ class TeamCleanser:
 
         self.processed_team = merged_teams_df
 
+@instrumented()
 def main(teams_df, nba_teams_df):
     """Instantiates data cleanser object and executes appropriate methods to generate processed team df."""
 
@@ -0,0 +1,147 @@
+import os
+import hashlib
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+from utils.kmeans_algorithm import fit_many
+from utils.player_registry import PlayerRegistry
+
+# Defining the paths for the season totals CSV (basketball-reference 2020-21), feature cache & exported clusters
+DATA_PATH = './bballref2.csv'
+FEATURES_CACHE_PATH = './data/intermediate/cluster_features.npz'
+CLUSTERS_PATH = './data/processed/player_cluster.csv'
+
+# Basketball-reference columns renamed to the 9-cat (and made/attempted) names used across the analysis
+COLUMNS = {
+    'Player': 'player_name', 'Pos': 'position', 'Tm': 'team', 'G': 'games_played', 'MP': 'minutes_played',
+    'FG': 'field_goals_made', 'FGA': 'field_goals_attempted', 'FG%': 'fg%', '3P': 'threes_made',
+    'FT': 'free_throws_made', 'FTA': 'free_throws_attempted', 'FT%': 'ft%', 'TRB': 'rebounds', 'AST': 'assists',
+    'STL': 'steals', 'BLK': 'blocks', 'TOV': 'turnovers', 'PTS': 'points'
+}
+FEATURES = ['fg%', 'threes_made', 'ft%', 'rebounds', 'assists', 'steals', 'blocks', 'turnovers', 'points']
+
+def logger_setup():
+    """Standardized logging set up with custom handlers & formatters. Implements logging for all submodules executed."""
+    logger = logging.getLogger()
+    sh, fh = logging.StreamHandler(), logging.FileHandler('../logs_nba3k.log', 'a')
+    sh.setFormatter(logging.Formatter('%(message)s'))
+    fh.setFormatter(logging.Formatter('%(module)s (%(lineno)d): %(asctime)s | %(levelname)s | %(message)s'))
+    logger.setLevel(logging.DEBUG), sh.setLevel(logging.INFO), logger.addHandler(fh), logger.addHandler(sh)
+    return logger
+
+class ClusterAnalysis:
+    """Implements k-means clustering of players' 9-cat production into fantasy archetypes (ported from the Rmd)."""
+
+    def __init__(self, n_clusters=3, n_init=20, seed=123456, workers=None):
+        """Instantiates class attributes for storing input parameters, features & the resulting clusters."""
+        self.n_clusters = n_clusters
+        self.n_init = n_init
+        self.seed = seed
+        self.workers = workers
+        self.players_df = None
+        self.scaled_features = None
+        self.inertias = None
+        self.clusters_df = None
+
+    def pre_processing(self, raw_df):
+        """Keeps season totals rows of qualified players with consolidated positions (as done in the Rmd)."""
+
+        players_df = raw_df[list(COLUMNS)].rename(columns=COLUMNS)
+
+        # Traded players have a row per team after their 'TOT' row; keep only the first (season total) row
+        players_df = players_df.drop_duplicates(subset=['player_name'], keep='first')
+
+        # Fill NA values (e.g. percentages with no attempts) with 0 & consolidate to the primary position
+        players_df = players_df.fillna(0)
+        players_df['position'] = players_df['position'].str.split('-').str[0]
+
+        # Remove low-usage players, with minutes played lower than the league median
+        players_df = players_df[players_df['minutes_played'] >= players_df['minutes_played'].median()]
+
+        self.players_df = players_df.reset_index(drop=True)
+
+    def load_features(self, data_path=DATA_PATH, cache_path=FEATURES_CACHE_PATH):
+        """Loads the scaled feature matrix from cache if the source CSV is unchanged, or builds & caches it."""
+
+        with open(data_path, 'rb') as f:
+            source_hash = hashlib.sha1(f.read()).hexdigest()
+        self.pre_processing(pd.read_csv(data_path, sep=',', header=0, encoding='utf-8'))
+
+        if os.path.exists(cache_path):
+            cache = np.load(cache_path)
+            if str(cache['source_hash']) == source_hash:
+                logging.debug('Loaded scaled features from cache.')
+                self.scaled_features = cache['features']
+                return
+
+        # Scale each category to zero mean & unit (sample) standard deviation, like R's scale()
+        features = self.players_df[FEATURES].to_numpy(dtype=np.float64)
+        self.scaled_features = (features - features.mean(axis=0)) / features.std(axis=0, ddof=1)
+
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        np.savez(cache_path, features=self.scaled_features, source_hash=source_hash)
+        logging.debug('Built & cached scaled features.')
+
+    def cluster(self, max_k=10):
+        """Fits every k from 1 to max_k (elbow analysis) & the chosen k in one parallel batch of restarts."""
+
+        k_values = sorted(set(range(1, max_k + 1)) | {self.n_clusters})
+        results = fit_many(self.scaled_features, k_values, self.n_init, self.seed, self.workers)
+        self.inertias = {k: results[k][2] for k in k_values}
+
+        labels, centers, _ = results[self.n_clusters]
+        clusters_df = self.players_df.copy()
+        clusters_df['cluster'] = labels + 1
+        clusters_df['archetype'] = clusters_df['cluster'].map(self.label_archetypes(centers))
+        self.clusters_df = clusters_df
+
+    def label_archetypes(self, centers):
+        """Names clusters by their centers: highest points is high-usage, then most interior-leaning, rest guard/wing."""
+
+        if len(centers) != 3:
+            return {i + 1: f'cluster-{i + 1}' for i in range(len(centers))}
+
+        idx = {cat: FEATURES.index(cat) for cat in FEATURES}
+        top_tier = int(np.argmax(centers[:, idx['points']]))
+        remaining = [i for i in range(3) if i != top_tier]
+        interior_score = (centers[:, idx['rebounds']] + centers[:, idx['blocks']] + centers[:, idx['fg%']] -
+                          centers[:, idx['threes_made']] - centers[:, idx['assists']])
+        interior = max(remaining, key=lambda i: interior_score[i])
+        guard_wing = [i for i in remaining if i != interior][0]
+        return {top_tier + 1: 'high-usage', interior + 1: 'interior', guard_wing + 1: 'guard-wing'}
+
+    def export_clusters(self, registry=None, path=CLUSTERS_PATH):
+        """Exports cluster labels (with player IDs & the raw stats needed downstream) into the processed data."""
+
+        clusters_df = self.clusters_df.copy()
+        if registry is not None:
+            clusters_df.insert(0, 'player_id', registry.resolve(clusters_df['player_name']).values)
+        clusters_df.to_csv(path_or_buf=path, index=False)
+        logging.info(f'Exported {len(clusters_df)} player clusters to {path}.')
+
+def main():
+    """Loads & scales player season totals, runs the elbow analysis & k-means, then exports the player clusters."""
+    logger = logger_setup()
+
+    parser = argparse.ArgumentParser(description='Cluster players into 9-cat fantasy archetypes with k-means.')
+    parser.add_argument('--k', dest='n_clusters', type=int, default=3, help='number of clusters to label players with')
+    parser.add_argument('--max-k', dest='max_k', type=int, default=10, help='largest k of the elbow analysis')
+    parser.add_argument('--n-init', dest='n_init', type=int, default=20, help='k-means++ restarts per k value')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes (defaults to CPU count)')
+    parser.add_argument('--seed', type=int, default=123456, help='random seed for reproducible clusters')
+    args = parser.parse_args()
+
+    analysis = ClusterAnalysis(args.n_clusters, args.n_init, args.seed, args.workers)
+    analysis.load_features()
+    analysis.cluster(args.max_k)
+
+    logging.info('Elbow analysis (within-cluster sum of squares by k):')
+    for k, inertia in analysis.inertias.items():
+        logging.info(f'  k={k}: {inertia:.1f}')
+    logging.info(analysis.clusters_df.groupby('archetype')[FEATURES].mean().round(2).to_string())
+
+    analysis.export_clusters(PlayerRegistry.from_csv())
+
+if __name__ == '__main__':
+    main()
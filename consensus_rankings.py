@@ -0,0 +1,154 @@
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+from utils.player_registry import PlayerRegistry
+
+# Defining the paths for the ranking sources, the player registry used to resolve names & the exported consensus
+RANKINGS_SHEET_PATH = './data/processed/player_rankings_2021.csv'
+ROTOBALLER_RANKS_PATH = './data/raw/rotoballer_ranks.csv'
+REGISTRY_PATH = './data/intermediate/intermediate_player_data_2021.csv'
+CONSENSUS_PATH = './data/processed/player_consensus_rankings.csv'
+
+# Per-source rank columns of the rankings sheet (its 'Avg' columns are derived, so they're not treated as sources)
+SHEET_SOURCES = ['ESPN Roto Rank', 'ESPN H2H-9Cat Rank', 'RotoBaller H2H-Cat Rankings', 'GameDay H2H-Cat Rankings',
+                 'FantasyPros Roto Rankings']
+
+def logger_setup():
+    """Standardized logging set up with custom handlers & formatters. Implements logging for all submodules executed."""
+    logger = logging.getLogger()
+    sh, fh = logging.StreamHandler(), logging.FileHandler('../logs_nba3k.log', 'a')
+    sh.setFormatter(logging.Formatter('%(message)s'))
+    fh.setFormatter(logging.Formatter('%(module)s (%(lineno)d): %(asctime)s | %(levelname)s | %(message)s'))
+    logger.setLevel(logging.DEBUG), sh.setLevel(logging.INFO), logger.addHandler(fh), logger.addHandler(sh)
+    return logger
+
+class RankingsAggregator:
+    """Aggregates any number of ranking sources into consensus ranks (mean, median & Borda count).
+    Each source is a column of a players x sources rank matrix; running sums keep mean & Borda updates incremental."""
+
+    def __init__(self, registry):
+        """Instantiates class attributes for the registry, rank matrix & running sums."""
+        self.registry = registry
+        self.player_ids = []
+        self.index = {}  # player_id -> row of the rank matrix
+        self.sources = {}  # source name -> column of the rank matrix
+        self.ranks = np.full((0, 0), np.nan)
+        self.rank_sums = np.zeros(0)
+        self.rank_counts = np.zeros(0)
+        self.borda_sums = np.zeros(0)
+
+    def _grow(self, new_players=0, new_sources=0):
+        """Adds empty rows (players) and/or columns (sources) to the rank matrix & running sums."""
+        n_players, n_sources = self.ranks.shape
+        ranks = np.full((n_players + new_players, n_sources + new_sources), np.nan)
+        ranks[:n_players, :n_sources] = self.ranks
+        self.ranks = ranks
+        self.rank_sums, self.rank_counts, self.borda_sums = (
+            np.concatenate([values, np.zeros(new_players)])
+            for values in (self.rank_sums, self.rank_counts, self.borda_sums)
+        )
+
+    def _column_contributions(self, column):
+        """Returns the (rank, ranked-count, Borda points) contributions of a source column to the running sums.
+        Borda points are n - position + 1 for the n players a source ranks (0 for players it doesn't rank)."""
+        ranked = ~np.isnan(column)
+        positions = np.zeros(len(column))
+        positions[ranked] = pd.Series(column[ranked]).rank(method='average').to_numpy()
+        borda = np.where(ranked, ranked.sum() - positions + 1, 0)
+        return np.where(ranked, column, 0), ranked.astype(np.float64), borda
+
+    def update_source(self, name, players, ranks):
+        """Adds a ranking source or replaces it, re-ranking incrementally (only this source's column is touched).
+
+        Args:
+            name (str): Name of the ranking source
+            players (pd.Series): Player names (resolved through the registry) or player IDs (ints)
+            ranks (pd.Series): Rank of each player within the source
+        """
+
+        players = pd.Series(players).reset_index(drop=True)
+        ranks = pd.to_numeric(pd.Series(ranks).reset_index(drop=True), errors='coerce')
+        player_ids = players.astype('Int64') if pd.api.types.is_integer_dtype(players) else \
+            self.registry.resolve(players)
+        if player_ids.isna().any():
+            logging.info(f'{name}: {int(player_ids.isna().sum())} players could not be matched to a player ID.')
+
+        # Keep the best rank of players listed more than once & register any players seen for the first time
+        source_df = pd.DataFrame({'player_id': player_ids, 'rank': ranks}).dropna()
+        source_df = source_df.groupby('player_id', sort=False)['rank'].min()
+        new_players = [pid for pid in source_df.index if pid not in self.index]
+        for player_id in new_players:
+            self.index[player_id] = len(self.player_ids)
+            self.player_ids.append(player_id)
+        if name not in self.sources:
+            self.sources[name] = len(self.sources)
+            self._grow(len(new_players), 1)
+        else:
+            self._grow(len(new_players), 0)
+
+        # Swap the source's old contributions for the new ones in the running sums
+        col = self.sources[name]
+        old = self._column_contributions(self.ranks[:, col])
+        self.ranks[:, col] = np.nan
+        self.ranks[[self.index[pid] for pid in source_df.index], col] = source_df.to_numpy(dtype=np.float64)
+        new = self._column_contributions(self.ranks[:, col])
+        for sums, old_values, new_values in zip((self.rank_sums, self.rank_counts, self.borda_sums), old, new):
+            sums += new_values - old_values
+
+        logging.debug(f'Updated {name} source with {len(source_df)} ranked players ({len(new_players)} new).')
+
+    def consensus(self):
+        """Returns the consensus rankings of every player (mean, median & Borda), ordered by Borda rank."""
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_rank = self.rank_sums / self.rank_counts
+        median_rank = np.full(len(self.player_ids), np.nan)
+        has_rank = self.rank_counts > 0
+        median_rank[has_rank] = np.nanmedian(self.ranks[has_rank], axis=1)
+
+        consensus_df = pd.DataFrame({
+            'player_id': self.player_ids,
+            'player_name': [self.registry.name(pid) for pid in self.player_ids],
+            'sources_ranked': self.rank_counts.astype(np.int64),
+            'mean_rank': np.round(mean_rank, 2),
+            'median_rank': median_rank,
+            'borda_points': self.borda_sums
+        })
+        consensus_df['consensus_mean'] = consensus_df['mean_rank'].rank(method='min')
+        consensus_df['consensus_median'] = consensus_df['median_rank'].rank(method='min')
+        consensus_df['consensus_borda'] = consensus_df['borda_points'].rank(method='min', ascending=False)
+        return consensus_df.sort_values(by=['consensus_borda', 'mean_rank']).reset_index(drop=True)
+
+def load_rankings_sheet(path=RANKINGS_SHEET_PATH):
+    """Loads the rankings sheet into a dict of source name -> (player names, ranks)."""
+    sheet_df = pd.read_csv(path, sep=',', header=0, encoding='utf-8')
+    return {source: (sheet_df['Name'], sheet_df[source]) for source in SHEET_SOURCES}
+
+def load_rotoballer_ranks(path=ROTOBALLER_RANKS_PATH):
+    """Loads the header-less RotoBaller ranks CSV (rank, name, team, positions) into (player names, ranks)."""
+    rotoballer_df = pd.read_csv(path, sep=',', header=None, names=['rank', 'Name', 'Team', 'Pos'], encoding='utf-8')
+    return rotoballer_df['Name'], rotoballer_df['rank']
+
+def main():
+    """Aggregates the rankings sheet sources, refreshes RotoBaller from its raw ranks & exports the consensus."""
+    logger = logger_setup()
+
+    parser = argparse.ArgumentParser(description='Build consensus player rankings from several ranking sources.')
+    parser.add_argument('--registry', default=REGISTRY_PATH, help='intermediate player data CSV used to resolve names')
+    args = parser.parse_args()
+
+    aggregator = RankingsAggregator(PlayerRegistry.from_csv(args.registry))
+    for source, (players, ranks) in load_rankings_sheet().items():
+        aggregator.update_source(source, players, ranks)
+
+    # The raw RotoBaller ranks supersede the RotoBaller column of the sheet (incremental single-source refresh)
+    aggregator.update_source('RotoBaller H2H-Cat Rankings', *load_rotoballer_ranks())
+
+    consensus_df = aggregator.consensus()
+    consensus_df.to_csv(path_or_buf=CONSENSUS_PATH, index=False)
+    logging.info(consensus_df.head(20).to_string(index=False))
+    logging.info(f'\nExported consensus rankings of {len(consensus_df)} players to {CONSENSUS_PATH}.')
+
+if __name__ == '__main__':
+    main()
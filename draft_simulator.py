@@ -0,0 +1,160 @@
+import os
+import math
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from utils.fantasy_categories import TOTALS, CATEGORIES
+
+# Defining the path for the CSV file containing the player clusters (output of cluster_analysis.py)
+CLUSTERS_PATH = './data/processed/player_cluster.csv'
+
+# Draft steps as (team drafting, archetype pool, eligible positions, number of picks); 'both' adds picks to each team.
+# Both strategies share a high-usage starting five & 6th man, then the late rounds lean on guards/wings (smalls)
+# or on interior players (bigs), as in the Rmd simulation.
+DRAFT_STEPS = [
+    ('both', 'high-usage', ['PG'], 1), ('both', 'high-usage', ['SG'], 1), ('both', 'high-usage', ['SF'], 1),
+    ('both', 'high-usage', ['PF'], 1), ('both', 'high-usage', ['C'], 1),
+    ('smalls', 'high-usage', ['SF', 'PF'], 1),
+    ('bigs', 'high-usage', ['PG', 'SG'], 1),
+    ('smalls', 'guard-wing', ['PG', 'SG', 'SF'], 4),
+    ('bigs', 'interior', ['PG', 'SG', 'SF', 'PF'], 1),
+    ('bigs', 'interior', ['SF', 'PF', 'C'], 3)
+]
+
+def logger_setup():
+    """Standardized logging set up with custom handlers & formatters. Implements logging for all submodules executed."""
+    logger = logging.getLogger()
+    sh, fh = logging.StreamHandler(), logging.FileHandler('../logs_nba3k.log', 'a')
+    sh.setFormatter(logging.Formatter('%(message)s'))
+    fh.setFormatter(logging.Formatter('%(module)s (%(lineno)d): %(asctime)s | %(levelname)s | %(message)s'))
+    logger.setLevel(logging.DEBUG), sh.setLevel(logging.INFO), logger.addHandler(fh), logger.addHandler(sh)
+    return logger
+
+def draft_batch(rng, pools, n_players, batch_size):
+    """Drafts a batch of rosters for both strategies at once; returns (smalls, bigs) player index arrays.
+
+    Each step draws its picks for every simulation in one shot: players get random keys, already drafted players
+    are pushed to the back, and the k smallest keys of each row are taken (sampling without replacement)."""
+
+    taken = np.zeros((batch_size, n_players), dtype=bool)
+    rows = np.arange(batch_size)[:, None]
+    rosters = {'smalls': [], 'bigs': []}
+
+    for (team, archetype, positions, picks), pool in zip(DRAFT_STEPS, pools):
+        keys = rng.random((batch_size, len(pool)))
+        keys[taken[:, pool]] = 2
+        chosen_idx = np.argpartition(keys, picks - 1, axis=1)[:, :picks]
+        if (np.take_along_axis(keys, chosen_idx, axis=1) >= 2).any():
+            raise ValueError(f'Not enough {archetype} players left at {positions} to draft {picks}')
+
+        chosen = pool[chosen_idx]
+        taken[rows, chosen] = True
+        for name in (['smalls', 'bigs'] if team == 'both' else [team]):
+            rosters[name].append(chosen)
+
+    return np.hstack(rosters['smalls']), np.hstack(rosters['bigs'])
+
+def score_matchups(stats, smalls, bigs):
+    """Scores the 9-cat head-to-head of every simulated matchup; returns the boolean (n, 9) category wins of smalls.
+
+    Ties count as wins for neither team & lower turnovers win the turnover category."""
+
+    def _categories(roster):
+        totals = stats[roster].sum(axis=1)
+        fgm, fga, tpm, ftm, fta, reb, ast, stl, blk, pts, tov = totals.T
+        return np.column_stack([fgm / fga, tpm, ftm / fta, reb, ast, stl, blk, pts, tov])
+
+    diff = _categories(smalls) - _categories(bigs)
+    diff[:, -1] = -diff[:, -1]
+    return diff > 0
+
+def _simulate_batch(args):
+    """Simulates & scores one batch of drafts (process pool worker); returns matchups won & category wins."""
+    stats, pools, seed_sequence, batch_size = args
+    rng = np.random.default_rng(seed_sequence)
+    smalls, bigs = draft_batch(rng, pools, len(stats), batch_size)
+    category_wins = score_matchups(stats, smalls, bigs)
+    return int((category_wins.sum(axis=1) >= 5).sum()), category_wins.sum(axis=0)
+
+class DraftSimulator:
+    """Runs Monte Carlo draft simulations comparing guard/wing-heavy & interior-heavy late-round strategies."""
+
+    def __init__(self, clusters_df):
+        """Instantiates class attributes for the stats matrix, draft pools & simulation results."""
+        self.stats = clusters_df[TOTALS].to_numpy(dtype=np.float64)
+        self.pools = [
+            np.flatnonzero((clusters_df['archetype'] == archetype) & clusters_df['position'].isin(positions))
+            for _, archetype, positions, _ in DRAFT_STEPS
+        ]
+        self.n_simulations = 0
+        self.wins = 0
+        self.category_wins = np.zeros(len(CATEGORIES))
+
+    def simulate(self, n_simulations, batch_size=50000, workers=None, seed=None):
+        """Runs n simulations in vectorized batches sharded across a process pool (reproducible for a given seed)."""
+
+        sizes = [batch_size] * (n_simulations // batch_size) + ([n_simulations % batch_size]
+                                                                 if n_simulations % batch_size else [])
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        tasks = [(self.stats, self.pools, seed_sequence, size) for seed_sequence, size in zip(seeds, sizes)]
+
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(tasks) == 1:
+            results = list(map(_simulate_batch, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_simulate_batch, tasks))
+
+        self.n_simulations = n_simulations
+        self.wins = sum(wins for wins, _ in results)
+        self.category_wins = np.sum([cats for _, cats in results], axis=0)
+
+    def win_rate(self, confidence=0.95):
+        """Returns the smalls win rate with its Wilson score confidence interval & z-score against a 50% null."""
+
+        if self.n_simulations == 0:
+            raise ValueError('No simulations to compute a win rate from (run simulate with n_simulations >= 1)')
+        n, p = self.n_simulations, self.wins / self.n_simulations
+        z = _normal_quantile(0.5 + confidence / 2)
+        center = (p + z ** 2 / (2 * n)) / (1 + z ** 2 / n)
+        margin = z * math.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / (1 + z ** 2 / n)
+        z_score = (self.wins - 0.5 * n) / math.sqrt(0.25 * n)
+        return p, (center - margin, center + margin), z_score
+
+def _normal_quantile(q):
+    """Returns the standard normal quantile (inverse CDF) by bisection on math.erf."""
+    low, high = -10.0, 10.0
+    for _ in range(100):
+        mid = (low + high) / 2
+        if 0.5 * (1 + math.erf(mid / math.sqrt(2))) < q:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+def main():
+    """Loads the player clusters, runs the draft simulations & reports the win rate of the guard/wing strategy."""
+    logger = logger_setup()
+
+    parser = argparse.ArgumentParser(description='Simulate fantasy drafts to compare late-round draft strategies.')
+    parser.add_argument('--n', dest='n_simulations', type=int, default=1000000, help='number of simulated drafts')
+    parser.add_argument('--batch-size', dest='batch_size', type=int, default=50000, help='simulations per batch')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes (defaults to CPU count)')
+    parser.add_argument('--seed', type=int, default=123456, help='random seed for reproducible simulations')
+    args = parser.parse_args()
+    if args.n_simulations < 1 or args.batch_size < 1:
+        parser.error('--n & --batch-size must be at least 1')
+
+    simulator = DraftSimulator(pd.read_csv(CLUSTERS_PATH, sep=',', header=0, encoding='utf-8'))
+    simulator.simulate(args.n_simulations, args.batch_size, args.workers, args.seed)
+
+    p, (low, high), z_score = simulator.win_rate()
+    logging.info(f'Guard/wing-heavy (smalls) strategy won {simulator.wins:,} of {args.n_simulations:,} matchups.')
+    logging.info(f'Win rate: {p:.4f} (95% CI {low:.4f} - {high:.4f}); z-score vs. 50% null: {z_score:.2f}')
+    for cat, wins in zip(CATEGORIES, simulator.category_wins):
+        logging.info(f'  {cat}: won {wins / args.n_simulations:.3f} of matchups')
+
+if __name__ == '__main__':
+    main()
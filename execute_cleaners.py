@@ -11,16 +11,23 @@ import cleaners.generate_player_position
 import cleaners.generate_player_team
 import cleaners.generate_fixture
 import cleaners.generate_player_statistic
+import cleaners.generate_player_season_aggregate
+import cleaners.generate_availability_timeline
 import cleaners.comprehensive_compiler
+import utils.sqlite_mirror
+import utils.instrumentation
 
 # Defining the file paths for the necessary raw data csv files that will be utilized for, or to perform cleansing on
+RAW_PATH = './data/raw/'  # Swap for a synthetic data set (utils/generate_raw_data.py) with --raw
 TEAMS_DATA_PATH = './data/raw/teams.csv'  # Raw CSV contains detailed NBA teams info from Kaggle, with desired IDs
 NBA_TEAMS_DATA_PATH = './data/raw/nba_teams.csv'  # Raw CSV contains concise NBA teams info from BM, without IDs
 PLAYER_DATA_PATH = './data/raw/player_data.csv'  # Raw CSV contains 2020 players with team, pos, age, draft info
 GAMES_DETAILS_PATH = './data/raw/games_details.csv'  # Raw CSV containing player stats for games since 2003
 GAMES_DATA_PATH = './data/raw/games.csv'  # Raw CSV containing games info since 2003
+SEASON_CALENDAR_PATH = './data/raw/season_calendar.csv'  # CSV containing start, all-star break & end dates by season
 INTERMEDIATE_PATH = './data/intermediate/'
 PROCESSED_PATH = './data/processed/'
+SQLITE_MIRROR_PATH = f'{PROCESSED_PATH}nba3k.sqlite'  # Optional single-file database of the processed tables
 
 def logger_setup():
     """Standardized logging set up with custom handlers & formatters. Implements logging for all submodules executed."""
@@ -34,16 +41,18 @@ def logger_setup():
 class ExecuteCleaners:
     """Implements the raw data loads, calls appropriate cleaner, & exports processed CSVs."""
 
-    def __init__(self, from_season=2020):
+    def __init__(self, from_season=2020, raw_path=RAW_PATH):
         """Instantiates class attributes to be used for storing raw, intermediate, and processed dataframes."""
 
         self.from_season = int(from_season)
+        self.raw_path = raw_path
 
         self.raw_teams = None
         self.raw_nba_teams = None
         self.raw_player_data = None
         self.raw_games_details = None
         self.raw_games = None
+        self.raw_season_calendar = None
 
         self.intermediate_player_data = None
 
@@ -53,6 +62,8 @@ class ExecuteCleaners:
         self.processed_player_position = None
         self.processed_player_statistic = None
         self.processed_fixture = None
+        self.processed_player_season_aggregate = None
+        self.processed_player_availability = None
 
         self.comprehensive_player_statistic = None
 
@@ -63,20 +74,20 @@ class ExecuteCleaners:
 
         try:
             logging.debug('Loading raw teams.csv (from Kaggle) into raw_teams_kaggle dataframe...')
-            self.raw_teams = pd.read_csv(TEAMS_DATA_PATH, sep=',', header=0, encoding='utf-8')
+            self.raw_teams = pd.read_csv(self.raw_file(TEAMS_DATA_PATH), sep=',', header=0, encoding='utf-8')
 
             logging.debug('Loading raw nba_teams.csv (from Basketball Monster) into raw_teams_bm dataframe...')
-            self.raw_nba_teams = pd.read_csv(NBA_TEAMS_DATA_PATH, sep=',', header=0, encoding='utf-8')
+            self.raw_nba_teams = pd.read_csv(self.raw_file(NBA_TEAMS_DATA_PATH), sep=',', header=0, encoding='utf-8')
 
             logging.debug('Loading raw player_data.csv (from Kaggle) into raw_player_data_2020 dataframe...')
-            self.raw_player_data = pd.read_csv(PLAYER_DATA_PATH, sep=',', header=0, encoding='utf-8')
+            self.raw_player_data = pd.read_csv(self.raw_file(PLAYER_DATA_PATH), sep=',', header=0, encoding='utf-8')
 
             logging.debug('Loading raw games_details.csv (from Kaggle) into raw_games_details dataframe...')
-            self.raw_games_details = pd.read_csv(GAMES_DETAILS_PATH, sep=',', header=0, encoding='utf-8')
+            self.raw_games_details = pd.read_csv(self.raw_file(GAMES_DETAILS_PATH), sep=',', header=0, encoding='utf-8')
 
             logging.debug('Loading games.csv (from Kaggle) into raw_games_data dataframe...')
             self.raw_games = pd.read_csv(
-                GAMES_DATA_PATH,
+                self.raw_file(GAMES_DATA_PATH),
                 sep=',',
                 header=0,
                 encoding='utf-8',
@@ -87,11 +98,31 @@ class ExecuteCleaners:
                 skip_blank_lines=True
             )
 
+            logging.debug('Loading season_calendar.csv into raw_season_calendar dataframe...')
+            self.raw_season_calendar = cleaners.generate_fixture.load_season_calendar(
+                self.raw_file(SEASON_CALENDAR_PATH))
+
             logging.info('Loading complete.')
 
         except FileNotFoundError as e:
             logging.error(f'File not found error: {e}')
 
+    def raw_frames(self):
+        """Returns the raw dataframes loaded for this run."""
+        return [self.raw_teams, self.raw_nba_teams, self.raw_player_data, self.raw_games_details, self.raw_games,
+                self.raw_season_calendar]
+
+    def processed_frames(self):
+        """Returns the processed (& intermediate) dataframes exported by this run."""
+        return [self.processed_team, self.intermediate_player_data, self.processed_player,
+                self.processed_player_position, self.processed_player_team, self.processed_fixture,
+                self.processed_player_statistic, self.processed_player_season_aggregate,
+                self.processed_player_availability, self.comprehensive_player_statistic]
+
+    def raw_file(self, path):
+        """Resolves one of the raw CSV paths against the raw data directory of this run."""
+        return os.path.join(self.raw_path, os.path.basename(path))
+
     def call_cleaner(self):
         """Calls on cleaner sub-modules in appropriate order, passing in the corresponding raw dataframe to clean."""
 
@@ -113,15 +144,24 @@ class ExecuteCleaners:
             self.intermediate_player_data, self.processed_team)
 
         logging.info('Executing generate_fixture.py cleaner module...')
-        self.processed_fixture, filtered_fixtures = cleaners.generate_fixture.main(self.from_season, self.raw_games)
+        self.processed_fixture, filtered_fixtures = cleaners.generate_fixture.main(
+            self.from_season, self.raw_games, self.raw_season_calendar)
 
         logging.info('Executing generate_player_statistic.py cleaner module...')
         self.processed_player_statistic = cleaners.generate_player_statistic.main(
             self.intermediate_player_data, self.raw_games, self.raw_games_details, filtered_fixtures)
 
-        # logging.info('Executing comprehensive_compiler.py module...')
-        # self.comprehensive_player_statistic = cleaners.comprehensive_compiler.main(
-        #     self.processed_player_statistic, self.processed_fixture, self.intermediate_player_data)
+        logging.info('Executing generate_player_season_aggregate.py cleaner module...')
+        self.processed_player_season_aggregate = cleaners.generate_player_season_aggregate.main(
+            self.processed_player_statistic)
+
+        logging.info('Executing generate_availability_timeline.py cleaner module...')
+        self.processed_player_availability = cleaners.generate_availability_timeline.main(
+            self.processed_player_statistic, self.processed_fixture)
+
+        logging.info('Executing comprehensive_compiler.py module...')
+        self.comprehensive_player_statistic = cleaners.comprehensive_compiler.main(
+            self.processed_player_statistic, self.processed_fixture, self.intermediate_player_data)
 
         logging.info('Cleaning complete.')
 
@@ -166,10 +206,20 @@ class ExecuteCleaners:
             logging.info('Exporting processed_player_statistic dataframe into player_statistic.csv file...')
             self.processed_player_statistic.to_csv(path_or_buf=f'{PROCESSED_PATH}player_statistic.csv', index=False)
 
-            # logging.info('Exporting compiled player stats dataframe into comprehensive_player_statistic.csv file...')
-            # self.comprehensive_player_statistic.to_csv(
-            #     path_or_buf=f'{INTERMEDIATE_PATH}comprehensive_player_statistic.csv', index=False
-            # )
+            logging.info('Exporting processed_player_season_aggregate dataframe into player_season_aggregate.csv file...')
+            self.processed_player_season_aggregate.to_csv(
+                path_or_buf=f'{PROCESSED_PATH}player_season_aggregate.csv', index=False
+            )
+
+            logging.info('Exporting processed_player_availability dataframe into player_availability.csv file...')
+            self.processed_player_availability.to_csv(
+                path_or_buf=f'{PROCESSED_PATH}player_availability.csv', index=False
+            )
+
+            logging.info('Exporting compiled player stats dataframe into comprehensive_player_statistic.csv file...')
+            self.comprehensive_player_statistic.to_csv(
+                path_or_buf=f'{INTERMEDIATE_PATH}comprehensive_player_statistic.csv', index=False
+            )
 
             logging.info('Exporting complete.')
 
@@ -180,6 +230,23 @@ class ExecuteCleaners:
         except AttributeError as e:
             logging.error(f'Attribute error occurred: {e}')
 
+    def export_sqlite_mirror(self):
+        """Exports the processed dataframes into a single-file SQLite database (with the comprehensive view)."""
+
+        logging.info('Exporting processed dataframes into the SQLite mirror...')
+        try:
+            utils.sqlite_mirror.build_mirror(SQLITE_MIRROR_PATH, {
+                'team': self.processed_team,
+                'player': self.processed_player,
+                'player_position': self.processed_player_position,
+                'player_team': self.processed_player_team,
+                'fixture': self.processed_fixture,
+                'player_statistic': self.processed_player_statistic,
+                'player_season_aggregate': self.processed_player_season_aggregate
+            })
+        except OSError as e:
+            logging.error(f'OS error occurred: {e}')
+
 def main():
     """Calls on cleaner sub-modules in appropriate order to output CSV files with pertinent info that matches schema."""
 
@@ -195,16 +262,55 @@ def main():
         default=2020,
         help='input oldest season/year of interest to filter API results from -- 2 or 4 digit'
     )
+    parser.add_argument(
+        '--sqlite',
+        dest='sqlite',
+        action='store_true',
+        help='also export the processed tables into a single-file SQLite database (data/processed/nba3k.sqlite)'
+    )
+    parser.add_argument(
+        '--raw',
+        dest='raw_path',
+        metavar='<directory>',
+        default=RAW_PATH,
+        help='directory of the raw CSVs, e.g. a synthetic data set written by utils/generate_raw_data.py'
+    )
+    parser.add_argument(
+        '--report',
+        dest='report',
+        metavar='<path>',
+        help='write the time, rows & memory of every stage to a run report (JSON, or Prometheus text for .prom)'
+    )
+    parser.add_argument(
+        '--trace-memory',
+        dest='trace_memory',
+        action='store_true',
+        help='also record tracemalloc deltas in the run report (slows the pure-Python stages down several times)'
+    )
     args = parser.parse_args()
     if len(str(args.season)) == 2:
         from_season = int('20'+str(args.season))
     else:
         from_season = args.season
 
-    compiler = ExecuteCleaners(from_season)
-    compiler.load_raw_csv()
-    compiler.call_cleaner()
-    compiler.export_processed_csv()
+    # Every phase (& each cleaner's main within call_cleaner) is recorded as a stage of the run report
+    if args.report:
+        utils.instrumentation.start_report(args.trace_memory)
+    compiler = ExecuteCleaners(from_season, args.raw_path)
+    with utils.instrumentation.stage('load_raw_csv') as record:
+        compiler.load_raw_csv()
+        record['rows_out'] = utils.instrumentation.count_rows(compiler.raw_frames())
+    with utils.instrumentation.stage('call_cleaner', record['rows_out']) as record:
+        compiler.call_cleaner()
+        record['rows_out'] = utils.instrumentation.count_rows(compiler.processed_frames())
+    with utils.instrumentation.stage('export_processed_csv', record['rows_out']) as record:
+        compiler.export_processed_csv()
+        record['rows_out'] = record['rows_in']
+    if args.sqlite:
+        with utils.instrumentation.stage('export_sqlite_mirror', record['rows_in']):
+            compiler.export_sqlite_mirror()
+    if args.report:
+        utils.instrumentation.write_report(args.report)
 
     logging.info(f'Execution complete; game-info and player-stats were filtered to {from_season} season & onwards.')
 
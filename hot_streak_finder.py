@@ -1,10 +1,19 @@
 import logging
+import argparse
+import numpy as np
 import pandas as pd
 from utils.max_sum_dac_algorithm import MSSDAC
+from utils.window_index import StatWindowIndex
+from utils import generate_game_id
+from utils.data_source import CSVSource, PostgresSource, SOURCES, open_source
 
 # Defining the paths for CSV file containing comprehensive player/game statistical information needed (from 2016)
 DATA_PATH = './data/intermediate/comprehensive_player_statistic.csv'
 
+# Fantasy categories a stretch can be searched for & the only columns read from the data source
+CATEGORIES = ['points', 'rebounds', 'assists', 'steals', 'blocks', 'fg%', 'ft%', '3pt%']
+COLUMNS = ['player_id', 'player_name', 'fixture_id', 'played_on'] + CATEGORIES
+
 def logger_setup():
     """Standardized logging set up with custom handlers & formatters. Implements logging for all submodules executed."""
     logger = logging.getLogger()
@@ -17,19 +26,39 @@ def logger_setup():
 class StreakFinder:
     """Implements DAC to find players' best statistical stretch of a season for any particular fantasy category."""
 
-    def __init__(self):
-        """Instantiates class attributes for storing input parameters & the processed dataframes to be used."""
+    def __init__(self, source=None, seasons=None):
+        """Instantiates class attributes for storing input parameters & the processed dataframes to be used.
+
+        Args:
+            source (DataSource): Where the comprehensive stats are read from (the comprehensive CSV if None)
+            seasons (list): Only load these seasons (all if None)
+        """
         self.player = None
         self.category = None
         self.dates = None
-        self.comprehensive_stats_df = None
-        self.load_csv()
-
-    def load_csv(self):
-        """Loads data from CSV files into dataframe attribute for local reading & analysis."""
+        self.source = source if source is not None else CSVSource(DATA_PATH)
+        self.seasons = seasons
+        # With a database source, deviations are computed in SQL & only those vectors are pulled into Python
+        self.in_database = isinstance(self.source, PostgresSource)
+        self._comprehensive_stats_df = None
+        self.window_index = None
+
+    @property
+    def comprehensive_stats_df(self):
+        """Comprehensive stats dataframe, loaded from the data source on first use (unless assigned beforehand)."""
+        if self._comprehensive_stats_df is None:
+            self.load_data()
+        return self._comprehensive_stats_df
+
+    @comprehensive_stats_df.setter
+    def comprehensive_stats_df(self, stats_df):
+        self._comprehensive_stats_df = stats_df
+
+    def load_data(self):
+        """Loads the needed columns (& seasons) from the data source into the dataframe attribute for analysis."""
         try:
             logging.info('\nLOG: Loading player statistical data since 2016...')
-            self.comprehensive_stats_df = pd.read_csv(DATA_PATH, sep=',', header=0, encoding='utf-8', low_memory=False)
+            self._comprehensive_stats_df = self.source.load(COLUMNS, self.seasons)
 
         except FileNotFoundError as e:
             logging.error(f'File not found error: {e}')
@@ -49,26 +78,24 @@ class StreakFinder:
         stats_df = stats_df[stats_df.fixture_id != 0]
 
         # Filter out rows of game records that aren't regular-season games
-        stats_df = stats_df[
-            (stats_df['fixture_id'] >= 16200000) & (stats_df['fixture_id'] < 16400000) |
-            (stats_df['fixture_id'] >= 17200000) & (stats_df['fixture_id'] < 17400000) |
-            (stats_df['fixture_id'] >= 18200000) & (stats_df['fixture_id'] < 18400000) |
-            (stats_df['fixture_id'] >= 19200000) & (stats_df['fixture_id'] < 19400000) |
-            (stats_df['fixture_id'] >= 20200000) & (stats_df['fixture_id'] < 20400000)
-            ]
+        stats_df = stats_df[generate_game_id.is_regular_season(stats_df['fixture_id'])]
         stats_df.reset_index(drop=True, inplace=True)
 
         # Fill in na values with empty strings for statistical categories (won't count during mssdac)
         stats_df.fillna(value='', inplace=True)
 
         self.comprehensive_stats_df = stats_df
+        self.window_index = None
         logging.info('LOG: Datasets loaded. Please provide information below to get started...')
 
     def input_validation(self):
         """Gathers input (player/category) from console, validates parameters (using df), and reacts accordingly."""
 
         logging.debug('Creating dict to link player names & IDs to use for input validation...')
-        player_id_dict = dict(zip(self.comprehensive_stats_df.player_name, self.comprehensive_stats_df.player_id))
+        if self.in_database:
+            player_id_dict = self.source.player_ids()
+        else:
+            player_id_dict = dict(zip(self.comprehensive_stats_df.player_name, self.comprehensive_stats_df.player_id))
 
         # Gather player of interest from console & check if player exists within dictionary keys
         while self.player is None:
@@ -82,7 +109,7 @@ class StreakFinder:
                 logging.info('INVALID INPUT: Unable to find player. Try again or enter "quit" to exit.')
 
         # Gather category of interest from console & validate the input
-        cat_list = ['points', 'rebounds', 'assists', 'steals', 'blocks', 'fg%', 'ft%', '3pt%']
+        cat_list = CATEGORIES
         while self.category is None:
             cat_input = input(f'Select a category{cat_list} or enter "all": ')
             if cat_input in cat_list:
@@ -97,46 +124,64 @@ class StreakFinder:
     def execute_MSSDAC(self):
         """Prepares dataset based on input parameters and executes MSSDAC algorithm for each season & category."""
 
-        # Assign local dataframe with filtered out stats to only keep records of the player of interest
-        stats_df = self.comprehensive_stats_df[self.comprehensive_stats_df.player_id == self.player]
-        stats_df.reset_index(drop=True, inplace=True)
+        if self.in_database:
+            self.execute_sql_MSSDAC()
+            return
+
+        # Build the window index once & share it across searches, rather than re-filtering the dataframe each season
+        if self.window_index is None:
+            stats = [cat for cat in CATEGORIES if cat in self.comprehensive_stats_df.columns]
+            self.window_index = StatWindowIndex(self.comprehensive_stats_df, stats)
+        index = self.window_index
         logging.info('LOG: Preparing data to feed into MSSDAC algorithm...\n')
 
-        # Set up for loops that execute MSSDAC for each season from 2016:2020, and for each category of interest
+        # Set up for loops that execute MSSDAC for each season of the player's records, and for each category of interest
         for cat in self.category:
-            cat_stats_df = stats_df[['fixture_id', 'played_on', cat]]
+            col = index.stats.index(cat)
             logging.info(f'\n---------------------------------------{cat}---------------------------------------')
 
-            for season in [16, 17, 18, 19, 20]:
-                season_stats_df = cat_stats_df[
-                    (cat_stats_df['fixture_id'] >= (season * 1000000)) &
-                    (cat_stats_df['fixture_id'] < ((season + 1) * 1000000))
-                    ]
+            for season in index.seasons(self.player):
+                _, lo, hi = index.bounds(self.player, season=season)
 
-                # Set up if-conditional to only execute for seasons for which there is a record of the player
-                if not season_stats_df.empty:
+                # Removing records with NA values (empty strings)
+                season_values = index.values[lo[0]:hi[0], col]
+                has_value = ~np.isnan(season_values)
 
-                    # Removing records with NA values (empty strings)
-                    season_stats_df = season_stats_df[season_stats_df[cat] != '']
+                # Set up if-conditional to only execute for seasons for which there is a record of the player
+                if has_value.any():
 
-                    # Get mean of the stat category
-                    avg_stat = round(season_stats_df[cat].mean(), 1)
+                    # Get mean of the stat category (from the window prefix sums)
+                    avg_stat = round(index.averages(self.player, season=season)[cat].iloc[0], 1)
 
                     # Build necessary lists needed to implement MSSDAC
-                    dates_list = season_stats_df.played_on.values.tolist()
-                    stat_list = season_stats_df[cat].values.tolist()
+                    dates_list = index.played_on[lo[0]:hi[0]][has_value].tolist()
+                    stat_list = season_values[has_value].tolist()
                     stat_deviation_list = [round(stat_list[i] - avg_stat, 1) for i in range(len(stat_list))]
                     # stat_deviation_list = [round(i - avg_stat, 1) for i in stat_list]
+                    self.find_stretch(cat, season, dates_list, stat_deviation_list)
 
-                    # Instantiate MSSDAC imported class & pass in stat_deviation_list
-                    dac = MSSDAC()
-                    max_value = dac.max_subarray(input_list=stat_deviation_list)
-                    self.dates = [dates_list[dac.left_index], dates_list[dac.right_index]]
-                    time_frame_stats = stat_list[dac.left_index:dac.right_index]
-                    logging.info(f'Best stretch for [{cat}] for [{season+2000}-{season+2001}] season is between: '
-                                 f'{self.dates[0]} & {self.dates[1]}')
-                    # print(f'sum: {sum(time_frame_stats)}')
-                    # print(f'average: {round(sum(time_frame_stats) / len(time_frame_stats),1)}')
+    def execute_sql_MSSDAC(self):
+        """Executes MSSDAC over the per-season deviation vectors computed by the database (window functions)."""
+
+        logging.info('LOG: Querying season deviations to feed into MSSDAC algorithm...\n')
+        deviations_df = self.source.deviations(self.player, self.category, self.seasons)
+
+        for cat in self.category:
+            logging.info(f'\n---------------------------------------{cat}---------------------------------------')
+            for season, season_df in deviations_df.groupby('season', sort=True):
+                season_df = season_df[season_df[cat].notna()]
+                if len(season_df):
+                    self.find_stretch(cat, season, season_df.played_on.tolist(), season_df[cat].tolist())
+
+    def find_stretch(self, cat, season, dates_list, stat_deviation_list):
+        """Runs MSSDAC over a season's deviations from the player's mean & logs the dates of the best stretch."""
+
+        # Instantiate MSSDAC imported class & pass in stat_deviation_list
+        dac = MSSDAC()
+        max_value = dac.max_subarray(input_list=stat_deviation_list)
+        self.dates = [dates_list[dac.left_index], dates_list[dac.right_index]]
+        logging.info(f'Best stretch for [{cat}] for [{season}-{season+1}] season is between: '
+                     f'{self.dates[0]} & {self.dates[1]}')
 
 def main():
     """Instantiates StreakFinder class & sets up loop to keep conducting searches till told otherwise."""
@@ -144,8 +189,15 @@ def main():
     logging.info('\nThis tool will help look for players\' hot stretches (relative to their season average),'
                  ' in particular stat categories, over the last few seasons.')
 
-    finder = StreakFinder()
-    finder.pre_processing()
+    parser = argparse.ArgumentParser(description='Find players\' best statistical stretches of each season.')
+    parser.add_argument('--source', choices=list(SOURCES), default='csv', help='backend to read the stats from')
+    parser.add_argument('--path', help='file read by csv/parquet/sqlite sources (default path of each if omitted)')
+    parser.add_argument('--seasons', nargs='*', type=int, help='only load these seasons, e.g. 2018 2019')
+    args = parser.parse_args()
+
+    finder = StreakFinder(open_source(args.source, args.path), args.seasons)
+    if not finder.in_database:
+        finder.pre_processing()
 
     again_input = 'Yes'
     while again_input == 'Yes':
@@ -1,15 +1,17 @@
 import argparse
+import asyncio
 import logging
 import os
-import sys
 import pandas as pd
 import numpy as np
 import psycopg2
 from datetime import datetime
+from functools import partial
 from psycopg2 import Error
 from psycopg2.extensions import register_adapter, AsIs
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
-from progress.bar import Bar
+from utils import db_schema, db_loader, async_ingest, instrumentation
 
 # Register adapter for int64 data types
 psycopg2.extensions.register_adapter(np.int64, psycopg2._psycopg.AsIs)
@@ -25,12 +27,52 @@ DATASETS = {
 	'fixture': PROCESSED_PATH + '/fixture.csv',
 	'player_statistic': PROCESSED_PATH + '/player_statistic.csv'
 }
+# Rows that fail to insert are quarantined here (table, error, record) rather than aborting the load
+REJECTS_PATH = '../rejects_nba3k.csv'
+
+# Columns inserted for each table (created_at is added) & the tables they reference, which must be loaded first
+LOAD_PLAN = {
+	'team': (['team_id', 'league_id', 'name', 'shortname', 'city', 'state', 'conference', 'division'], ()),
+	'player': (['player_id', 'first_name', 'last_name', 'birth_year', 'draft_year', 'draft_pick'], ()),
+	'player_position': (
+		['player_id', 'season', 'position_primary', 'position_secondary', 'position_tertiary'], ('player',)),
+	'player_team': (['team_id', 'player_id'], ('player', 'team')),
+	'fixture': ([
+		'fixture_id', 'home_team_id', 'away_team_id', 'season', 'played_on', 'game_type', 'home_team_score',
+		'away_team_score', 'home_team_win', 'away_team_win'
+	], ('team',)),
+	'player_statistic': ([
+		'player_id', 'fixture_id', 'player_status', 'is_starter', 'seconds_played', 'points', 'threes_attempted',
+		'threes_made', 'field_goals_attempted', 'field_goals_made', 'free_throws_attempted', 'free_throws_made',
+		'offensive_rebounds', 'defensive_rebounds', 'assists', 'steals', 'blocks', 'turnovers'
+	], ('player', 'fixture'))
+}
+
+def prepare_dataset(dataset, df):
+	"""Handle any breaking Pandas behavior for a dataset (whole, or a chunk of it when streaming).
+		* Fill empty player positions (typically secondary and teriary ) with an empty string
+		* Fill empty team_id row data with None to facilitate insert into a nullable numeric field
+		* Fill empty player & player statistic data with None
+	"""
+
+	if dataset == 'player_position':
+		# Fill empty strings
+		return df.fillna('')
+	if dataset in ('player', 'player_statistic'):
+		# Fill emtpy numerics
+		return df.where(pd.notnull(df), None)
+	if dataset == 'player_team':
+		return df.replace(0, None)
+	return df
 
 class DBClient:
 	"""Creates a database client for handling all database operations."""
 
-	def __init__(self, mode):
+	def __init__(self, mode, workers=4, load_datasets=True):
+		self.pool = None
 		self.connection = None
+		self.workers = workers
+		self.rejects = db_loader.RejectLog()
 		self.team = None
 		self.player = None
 		self.player_team = None
@@ -43,8 +85,11 @@ class DBClient:
 		else: self.dev_mode = False
 
 		self._create_connection()
-		self._load_datasets()
+		# Streamed loads (see stream_database) read the datasets chunk by chunk instead
+		if load_datasets:
+			self._load_datasets()
 
+	@instrumentation.instrumented('load_datasets')
 	def _load_datasets(self):
 		"""Loads all processed datasets from the corresponding processed directory and loads each into a Pandas
 			dataframe. Invokes the _processed_datasets() method for any specific data cleaning based on the default
@@ -64,11 +109,7 @@ class DBClient:
 		self._process_datasets()
 
 	def _process_datasets(self):
-		"""Handle any breaking Pandas behavior for the datasets.
-			* Fill empty player positions (typically secondary and teriary ) with an empty string
-			* Fill empty team_id row data with None to facilitate insert into a nullable numeric field
-			* Fill empty player statistic data with 'N/A'
-		"""
+		"""Handle any breaking Pandas behavior for the datasets (see prepare_dataset)."""
 
 		logging.error('Pre-processing datasets...')
 		try:
@@ -78,13 +119,8 @@ class DBClient:
 			#TODO: Add this to clean module
 			self.fixture.drop_duplicates(subset=['fixture_id'], keep='first', inplace=True)
 
-			# Fill empty strings
-			self.player_position = self.player_position.fillna('')
-			# Fill emtpy numerics
-			self.player = self.player.where(pd.notnull(self.player), None)
-			# self.player_team = self.player_team.where(pd.notnull(self.player_team), None)
-			self.player_team.replace(0, None, inplace=True)
-			self.player_statistic = self.player_statistic.where(pd.notnull(self.player_statistic), None)
+			for dataset in DATASETS:
+				setattr(self, dataset, prepare_dataset(dataset, getattr(self, dataset)))
 			self.player_team.team_id.values.astype(int)
 		except (Exception, AttributeError) as e:
 			self.close_connection()
@@ -105,125 +141,122 @@ class DBClient:
 		logging.info('Database cleared.')
 
 	def build_database(self):
-		"""Builds and seeds the initial database."""
+		"""Builds and seeds the initial database: the league first, then every other table as soon as the tables
+			it references are loaded (independent tables & player_statistic shards load in parallel)."""
 
 		if self.is_data:
 			logging.error('Missing datasets; bailing')
 		else:
 			logging.info('Building & seeding the initial database...')
 
+			# Drop secondary indexes, so they are built once after the bulk load
+			db_schema.drop_indexes(self.connection)
+
 			# Insert league
 			league_id = self._insert_league()
 			self.connection.commit()
 
-			# Insert teams
-			logging.info('Inserting teams...')
-			bar = Bar('Inserting teams', max= len(self.team))
-			for idx, row in self.team.iterrows():
-				self._insert_team((
-					row['team_id'],
-					league_id,
-					row['name'],
-					row['shortname'],
-					row['city'],
-					row['state'],
-					row['conference'],
-					row['division']
-				))
-				bar.next()
-			bar.finish()
-			self.connection.commit()
+			# Split player_statistic into fixture ID range shards, loaded over separate pooled connections
+			tasks = {}
+			for table in LOAD_PLAN:
+				rows = self._table_rows(table, getattr(self, table), league_id)
+				if table == 'player_statistic':
+					labels = db_loader.shard_labels(self.player_statistic['fixture_id'].to_numpy(), self.workers)
+					shards = [[] for _ in range(self.workers)]
+					for row, label in zip(rows, labels):
+						shards[label].append(row)
+				else:
+					shards = [rows]
+				tasks[table] = [partial(self._load_shard, table, shard) for shard in shards if shard]
+
+			parents = {table: plan[1] for table, plan in LOAD_PLAN.items()}
+			rows = sum(len(getattr(self, table)) for table in LOAD_PLAN)
+			with instrumentation.stage('insert_tables', rows) as record:
+				timings = db_loader.run_plan(tasks, parents, self.workers)
+				record['rows_out'] = rows - len(self.rejects)
+			for table, seconds in timings.items():
+				logging.info(f'{table}: {len(getattr(self, table))} rows in {seconds:.2f}s')
+
+			if len(self.rejects):
+				self.rejects.write(REJECTS_PATH)
+				logging.error(f'{len(self.rejects)} rows failed to insert; see {REJECTS_PATH}')
+
+			self._finalize_load()
+
+	def stream_database(self, chunk_rows=async_ingest.CHUNK_ROWS):
+		"""Builds and seeds the database by streaming each dataset: CSV chunks are parsed while earlier chunks are
+			COPYed over pooled connections, so memory is bounded by the chunk size rather than the dataset size."""
+
+		logging.info('Streaming the processed datasets into the database...')
+		db_schema.drop_indexes(self.connection)
+		league_id = self._insert_league()
+		self.connection.commit()
+
+		tables = {}
+		for table, (columns, _) in LOAD_PLAN.items():
+			write = partial(async_ingest.copy_rows, self.pool, table, columns + ['created_at'], self.rejects)
+			tables[table] = (self._stream_rows(table, league_id, chunk_rows), write)
+
+		parents = {table: plan[1] for table, plan in LOAD_PLAN.items()}
+		with instrumentation.stage('stream_tables') as record:
+			results = asyncio.run(async_ingest.ingest(tables, parents, writers=self.workers))
+			record['rows_out'] = sum(rows for rows, _ in results.values())
+		for table, (rows, seconds) in results.items():
+			logging.info(f'{table}: {rows} rows in {seconds:.2f}s')
+
+		if len(self.rejects):
+			self.rejects.write(REJECTS_PATH)
+			logging.error(f'{len(self.rejects)} rows failed to insert; see {REJECTS_PATH}')
+
+		self._finalize_load()
+
+	def _stream_rows(self, table, league_id, chunk_rows):
+		"""Yields the insert tuples of a dataset one CSV chunk at a time (fixtures de-duplicated across chunks)."""
+
+		seen_fixtures = set()
+		for chunk in pd.read_csv(filepath_or_buffer=DATASETS[table], header=0, doublequote=False, chunksize=chunk_rows):
+			if table == 'fixture':
+				chunk = chunk.drop_duplicates(subset=['fixture_id'], keep='first')
+				chunk = chunk[~chunk['fixture_id'].isin(seen_fixtures)]
+				seen_fixtures.update(chunk['fixture_id'].tolist())
+			yield self._table_rows(table, prepare_dataset(table, chunk), league_id)
+
+	def _table_rows(self, table, dataset, league_id):
+		"""Returns the insert tuples of a table's dataset (LOAD_PLAN columns, stamped with one created_at)."""
+
+		if table == 'team':
+			dataset = dataset.assign(league_id=league_id)
+		if table == 'fixture':
+			dataset = dataset.assign(game_type=dataset['game_type'].astype(str))
+		created_at = datetime.now()
+		return [row + (created_at,) for row in dataset[LOAD_PLAN[table][0]].itertuples(index=False, name=None)]
+
+	def _load_shard(self, table, rows):
+		"""Inserts rows of a table over a pooled connection (failing rows go to the reject log)."""
+
+		connection = self.pool.getconn()
+		try:
+			return db_loader.insert_rows(connection, table, LOAD_PLAN[table][0] + ['created_at'], rows, self.rejects)
+		finally:
+			self.pool.putconn(connection)
 
-			# Insert players
-			logging.info('Inserting players...')
-			bar = Bar('Inserting players', max= len(self.player))
-			for idx, row in self.player.iterrows():
-				self._insert_player((
-					int(row['player_id']),
-					row['first_name'],
-					row['last_name'],
-					row['birth_year'],
-					row['draft_year'],
-					row['draft_pick']
-				))
-				bar.next()
-			bar.finish()
-			self.connection.commit()
+	@instrumentation.instrumented('migrate')
+	def migrate(self):
+		"""Applies any pending versioned schema migrations (tables, foreign keys, materialized views)."""
 
-			# Insert player positions
-			logging.info('Inserting player_position...')
-			bar = Bar('Inserting player positions', max= len(self.player_position))
-			for idx, row in self.player_position.iterrows():
-				self._insert_player_position((
-					int(row['player_id']),
-					row['season'],
-					row['position_primary'],
-					row['position_secondary'],
-					row['position_tertiary']
-				))
-				bar.next()
-			bar.finish()
-			self.connection.commit()
+		applied = db_schema.migrate(self.connection)
+		logging.info(f'Schema migrations applied: {applied}' if applied else 'Schema is up to date.')
 
-			# Insert player teams
-			logging.info('Inserting player teams...')
-			bar = Bar('Inserting player teams', max= len(self.player_team))
-			for idx, row in self.player_team.iterrows():
-				self._insert_player_team((
-					row['team_id'],
-					int(row['player_id'])
-				))
-				bar.next()
-			bar.finish()
-			self.connection.commit()
+	@instrumentation.instrumented('finalize_load')
+	def _finalize_load(self):
+		"""Builds the deferred indexes (e.g. behind the streak finder's per-season window functions) once the rows are
+			in, then refreshes the materialized views (concurrently, so readers aren't blocked)."""
 
-			# Insert fixtures
-			logging.info('Inserting fixtures...')
-			bar = Bar('Inserting fixtures', max= len(self.fixture))
-			for idx, row in self.fixture.iterrows():
-				self._insert_fixture((
-					row['fixture_id'],
-					row['home_team_id'],
-					row['away_team_id'],
-					row['season'],
-					row['played_on'],
-					row['game_type'],
-					row['home_team_score'],
-					row['away_team_score'],
-					row['home_team_win'],
-					row['away_team_win'],
-				))
-				bar.next()
-			bar.finish()
-			self.connection.commit()
-
-			# Insert player_statistic
-			logging.info('Inserting player statistics...')
-			bar = Bar('Inserting player statistics', max= len(self.player_statistic))
-			for idx, row in self.player_statistic.iterrows():
-				self._insert_player_statistic((
-					row['player_id'],
-					row['fixture_id'],
-					row['player_status'],
-					row['is_starter'],
-					row['seconds_played'],
-					row['points'],
-					row['threes_attempted'],
-					row['threes_made'],
-					row['field_goals_attempted'],
-					row['field_goals_made'],
-					row['free_throws_attempted'],
-					row['free_throws_made'],
-					row['offensive_rebounds'],
-					row['defensive_rebounds'],
-					row['assists'],
-					row['steals'],
-					row['blocks'],
-					row['turnovers']
-				))
-				bar.next()
-			bar.finish()
-			self.connection.commit()
+		logging.info('Creating indexes...')
+		db_schema.create_indexes(self.connection)
+		logging.info('Refreshing materialized views...')
+		db_schema.refresh_views(self.connection)
+		logging.info('Indexes & views are up to date.')
 
 	def _insert_league(self):
 		"""Inserts a new league into the database."""
@@ -248,175 +281,12 @@ class DBClient:
 			except (Exception, Error) as e:
 				logging.error(f'The error \'{e}\' occurred')
 
-	def _insert_team(self, data):
-		"""Inserts teams into the database."""
-		query = 'INSERT INTO nba3k.team VALUES (%s, %s, %s, %s, %s, %s ,%s, %s, %s)'
-
-		with self.connection.cursor() as cursor:
-			try:
-				cursor.execute(
-					query,
-					(
-						data[0],
-						data[1],
-						data[2],
-						data[3],
-						data[4],
-						data[5],
-						data[6],
-						data[7],
-						datetime.now())
-				)
-			except (Exception, Error) as e:
-				logging.error(f'The error \'{str(e).strip()}\' occurred; bailing')
-				logging.debug(f'Record was \'{data}\'')
-				sys.exit(1)
-
-	def _insert_player(self, data):
-		"""Inserts teams into the database."""
-		query = 'INSERT INTO nba3k.player VALUES (%s, %s, %s, %s, %s, %s, %s)'
-
-		with self.connection.cursor() as cursor:
-			try:
-				cursor.execute(
-					query,
-					(
-						data[0],
-						data[1],
-						data[2],
-						data[3],
-						data[4],
-						data[5],
-						datetime.now())
-				)
-			except (Exception, Error) as e:
-				logging.error(f'The error \'{str(e).strip()}\' occurred; bailing')
-				logging.debug(f'Record was \'{data}\'')
-				sys.exit(1)
-
-	def _insert_player_position(self, data):
-		"""Inserts teams into the database."""
-		query = 'INSERT INTO nba3k.player_position VALUES (%s, %s, %s, %s, %s, %s)'
-
-		with self.connection.cursor() as cursor:
-			try:
-				cursor.execute(
-					query,
-					(
-						data[0],
-						data[1],
-						data[2],
-						data[3],
-						data[4],
-						datetime.now())
-				)
-			except (Exception, Error) as e:
-				logging.error(f'The error \'{e}\' occurred')
-
-	def _insert_player_team(self, data):
-		"""Inserts player teams into the database."""
-		query = 'INSERT INTO nba3k.player_team (team_id, player_id, created_at) VALUES (%s, %s, %s)'
-
-		with self.connection.cursor() as cursor:
-			try:
-				cursor.execute(
-					query,
-					(	data[0],
-						data[1],
-						datetime.now())
-				)
-			except (Exception, Error) as e:
-				logging.error(f'The error \'{str(e).strip()}\' occurred; bailing')
-				logging.debug(f'Record was \'{data}\'')
-				sys.exit(1)
-
-	def _insert_fixture(self, data):
-		"""Inserts fixtures into the database."""
-		query = 'INSERT INTO nba3k.fixture VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)'
-
-		with self.connection.cursor() as cursor:
-			try:
-				cursor.execute(
-					query,
-					(
-						data[0],
-						data[1],
-						data[2],
-						data[3],
-						data[4],
-						str(data[5]),
-						data[6],
-						data[7],
-						data[8],
-						data[9],
-						datetime.now())
-				)
-			except (Exception, Error) as e:
-				logging.error(f'The error \'{str(e).strip()}\' occurred; bailing')
-				logging.debug(f'Record was \'{data}\'')
-				sys.exit(1)
-
-	def _insert_player_statistic(self, data):
-		"""Inserts player statistics into the database."""
-		query = '''INSERT INTO nba3k.player_statistic (
-			player_id,
-			fixture_id,
-			player_status,
-			is_starter,
-			seconds_played,
-			points,
-			threes_attempted,
-			threes_made,
-			field_goals_attempted,
-			field_goals_made,
-			free_throws_attempted,
-			free_throws_made,
-			offensive_rebounds,
-			defensive_rebounds,
-			assists,
-			steals,
-			blocks,
-			turnovers,
-			created_at
-		)
-			VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)'''
-
-		with self.connection.cursor() as cursor:
-			try:
-				cursor.execute(
-					query,
-					(
-						data[0],
-						data[1],
-						data[2],
-						data[3],
-						data[4],
-						data[5],
-						data[6],
-						data[7],
-						data[8],
-						data[9],
-						data[10],
-						data[11],
-						data[12],
-						data[13],
-						data[14],
-						data[15],
-						data[16],
-						data[17],
-						datetime.now())
-				)
-			except (Exception, Error) as e:
-				logging.error(f'The error \'{str(e).strip()}\' occurred; bailing')
-				logging.debug(f'Record was \'{data}\'')
-				sys.exit(1)
-
 	def _create_connection(self):
-		connection = None
-		logging.info('Creating connection...')
+		"""Creates a thread-safe connection pool (one connection per loading worker, plus the client's own)."""
+		logging.info('Creating connection pool...')
 		try:
 			if self.dev_mode:
-				connection = psycopg2.connect(
+				params = dict(
 					database='nba3k',
 					user='postgres',
 					password='#Adm1nistr@t0r',
@@ -424,23 +294,25 @@ class DBClient:
 					port=5432
 				)
 			else:
-				connection = psycopg2.connect(
+				params = dict(
 					database= os.getenv('RDS_DB_NAME'),
 					user= os.getenv('RDS_USERNAME'),
 					password= os.getenv('RDS_PASSWORD'),
 					host= os.getenv('RDS_HOSTNAME'),
 					port= os.getenv('RDS_PORT')
 				)
+			self.pool = ThreadedConnectionPool(1, self.workers + 1, **params)
 			print('Connection to PostgreSQL database created')
-			self.connection = connection
+			self.connection = self.pool.getconn()
 		except (Exception, Error) as e:
 			logging.error(f'The error \'{e}\' occurred during connection creation')
 
 	def close_connection(self):
-		"""Closes a database connection."""
+		"""Returns the client's connection to the pool & closes every pooled connection."""
 		try:
 			logging.info('Closing connection...')
-			self.connection.close()
+			self.pool.putconn(self.connection)
+			self.pool.closeall()
 			logging.info('Connection to PostgreSQL database closed.')
 		except Error as e:
 			logging.error(f'The error \'{e}\' occurred')
@@ -458,22 +330,41 @@ def main():
 	parser = argparse.ArgumentParser(description='Handle all database transactions for NBA3K')
 	parser.add_argument('-d', '--dev-mode', action='store_true', dest='dev_mode')
 	parser.add_argument('-c', '--clear', action='store_true', dest='clear_db')
+	parser.add_argument('-m', '--migrate-only', action='store_true', dest='migrate_only')
+	parser.add_argument('-w', '--workers', type=int, default=4, dest='workers')
+	parser.add_argument('-s', '--stream', action='store_true', dest='stream')
+	parser.add_argument('-r', '--report', dest='report', help='run report path (JSON, or Prometheus text for .prom)')
+	parser.add_argument('--trace-memory', action='store_true', dest='trace_memory')
 	args = parser.parse_args()
 
 	logger = logger_setup()
+	if args.report:
+		instrumentation.start_report(args.trace_memory)
 
 	# Handle dev-mode
 	if args.dev_mode:
-		client = DBClient(mode='dev')
+		client = DBClient(mode='dev', workers=args.workers, load_datasets=not args.stream)
 	else:
-		client = DBClient(mode='aws')
+		client = DBClient(mode='aws', workers=args.workers, load_datasets=not args.stream)
+
+	# Bring the schema up to date (& stop there for schema-only runs)
+	client.migrate()
+	if args.migrate_only:
+		client.close_connection()
+		return
 
 	# Handle clear
 	if args.clear_db:
 		client._clear_tables()
 
-	client.build_database()
+	if args.stream:
+		client.stream_database()
+	else:
+		client.build_database()
 	client.close_connection()
 
+	if args.report:
+		instrumentation.write_report(args.report)
+
 if __name__ == '__main__':
 	main()
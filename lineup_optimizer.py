@@ -0,0 +1,179 @@
+import time
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+from player_valuation import z_scores, RAW_STATS
+from matchup_projector import rates_from_totals, snake_draft
+
+# Defining the paths for the schedule, player teams & positions, per-game rates & the demo league rankings
+FIXTURE_PATH = './data/processed/fixture.csv'
+PLAYER_TEAM_PATH = './data/processed/player_team.csv'
+PLAYER_POSITION_PATH = './data/processed/player_position.csv'
+CLUSTERS_PATH = './data/processed/player_cluster.csv'
+CONSENSUS_PATH = './data/processed/player_consensus_rankings.csv'
+
+# Daily lineup slots & the positions eligible for each (a player is eligible through any of his listed positions)
+SLOTS = ['PG', 'SG', 'G', 'SF', 'PF', 'F', 'C', 'UTIL']
+SLOT_POSITIONS = {
+    'PG': {'PG'}, 'SG': {'SG'}, 'G': {'PG', 'SG'}, 'SF': {'SF'}, 'PF': {'PF'}, 'F': {'SF', 'PF'}, 'C': {'C'},
+    'UTIL': {'PG', 'SG', 'SF', 'PF', 'C'}
+}
+
+def logger_setup():
+    """Standardized logging set up with custom handlers & formatters. Implements logging for all submodules executed."""
+    logger = logging.getLogger()
+    sh, fh = logging.StreamHandler(), logging.FileHandler('../logs_nba3k.log', 'a')
+    sh.setFormatter(logging.Formatter('%(message)s'))
+    fh.setFormatter(logging.Formatter('%(module)s (%(lineno)d): %(asctime)s | %(levelname)s | %(message)s'))
+    logger.setLevel(logging.DEBUG), sh.setLevel(logging.INFO), logger.addHandler(fh), logger.addHandler(sh)
+    return logger
+
+def eligibility_matrix(player_ids, player_position_df):
+    """Returns the (players x SLOTS) boolean slot eligibility of players from their primary/secondary/tertiary positions.
+
+    Players without listed positions are only eligible for UTIL."""
+
+    position_df = player_position_df.sort_values(by='season').drop_duplicates(subset=['player_id'], keep='last')
+    positions = position_df.set_index('player_id')[['position_primary', 'position_secondary', 'position_tertiary']]
+    eligible = np.zeros((len(player_ids), len(SLOTS)), dtype=bool)
+    for row, player_id in enumerate(player_ids):
+        listed = set(positions.loc[player_id].dropna()) if player_id in positions.index else set()
+        eligible[row] = [bool(listed & SLOT_POSITIONS[slot]) or slot == 'UTIL' for slot in SLOTS]
+    return eligible
+
+def optimal_lineups(values, eligible):
+    """Finds the lineups maximizing the value of started players, for every day at once (exact bitmask DP).
+
+    Players are added one at a time to a (days x 2^slots) table of the best value for each set of filled slots; a
+    player is either benched or fills one free eligible slot. Backtracking the stored choices gives the lineups.
+
+    Args:
+        values (np.ndarray): (days x players) value of starting each player (<= 0 or NaN for players without a game)
+        eligible (np.ndarray): (players x slots) boolean slot eligibility
+
+    Returns:
+        tuple: ((days x slots) player index in each slot, -1 if empty; (days,) lineup values)
+    """
+
+    n_days, n_players = values.shape
+    n_slots = eligible.shape[1]
+    masks = np.arange(2 ** n_slots)
+    gains = np.where(np.nan_to_num(values, nan=0) > 0, np.nan_to_num(values, nan=0), -np.inf)
+
+    best = np.full((n_days, len(masks)), -np.inf)
+    best[:, 0] = 0
+    choices = np.full((n_players, n_days, len(masks)), -1, dtype=np.int8)
+    for player in range(n_players):
+        updated = best.copy()
+        for slot in np.flatnonzero(eligible[player]):
+            with_slot = masks[(masks >> slot) & 1 == 1]
+            candidate = best[:, with_slot ^ (1 << slot)] + gains[:, player:player + 1]
+            improves = candidate > updated[:, with_slot]
+            updated[:, with_slot] = np.where(improves, candidate, updated[:, with_slot])
+            choices[player][:, with_slot] = np.where(improves, slot, choices[player][:, with_slot])
+        best = updated
+
+    # Backtrack from the best final slot set of every day
+    days = np.arange(n_days)
+    state = best.argmax(axis=1)
+    totals = best[days, state]
+    lineups = np.full((n_days, n_slots), -1, dtype=np.int64)
+    for player in range(n_players - 1, -1, -1):
+        slot = choices[player, days, state].astype(np.int64)
+        started = slot >= 0
+        lineups[days[started], slot[started]] = player
+        state = np.where(started, state ^ (1 << np.maximum(slot, 0)), state)
+    return lineups, totals
+
+class LineupOptimizer:
+    """Sets the daily lineups of a fantasy roster (PG/SG/G/SF/PF/F/C/UTIL) over any run of days of the NBA schedule.
+    All days are optimized in one batched call, so a week or a whole season costs about the same as a day."""
+
+    def __init__(self, fixture_df, player_team_df, player_position_df):
+        """Instantiates class attributes for the schedule (NBA teams playing each day) & position data."""
+        games_df = fixture_df[fixture_df['game_type'] == 'regular-season']
+        self.game_days = pd.to_datetime(games_df['played_on']).to_numpy(dtype='datetime64[D]')
+        self.home_teams = games_df['home_team_id'].to_numpy()
+        self.away_teams = games_df['away_team_id'].to_numpy()
+        self.teams = dict(zip(player_team_df['player_id'], player_team_df['team_id']))
+        self.player_position_df = player_position_df
+
+    def schedule(self, roster, days):
+        """Returns the (days x players) boolean matrix of roster players whose NBA team plays each day."""
+        days = np.asarray(days, dtype='datetime64[D]')
+        plays = np.zeros((len(days), len(roster)), dtype=bool)
+        for column, player_id in enumerate(roster):
+            team = self.teams.get(player_id)
+            team_days = self.game_days[(self.home_teams == team) | (self.away_teams == team)]
+            plays[:, column] = np.isin(days, team_days)
+        return plays
+
+    def optimize(self, roster, values, start, end=None):
+        """Sets the optimal lineup of each day from start to end (inclusive) for the roster.
+
+        Args:
+            roster (list): Player IDs of the fantasy roster
+            values (dict, pd.Series): Projected value of a game of each player (e.g. 9-cat z-score above replacement)
+            start, end: First & last day to set lineups for (a single day if end is None)
+
+        Returns:
+            pd.DataFrame: One row per day & slot with the player started (NaN if the slot stays empty) & his value
+        """
+
+        days = np.arange(np.datetime64(pd.Timestamp(start).date(), 'D'),
+                         np.datetime64(pd.Timestamp(end if end is not None else start).date(), 'D') + 1)
+        values = pd.Series(values, dtype=np.float64).reindex(roster).fillna(0).to_numpy()
+        day_values = np.where(self.schedule(roster, days), values, 0)
+        lineups, _ = optimal_lineups(day_values, eligibility_matrix(roster, self.player_position_df))
+
+        started = lineups >= 0
+        player_ids = np.where(started, np.asarray(roster)[np.maximum(lineups, 0)], -1)
+        lineup_df = pd.DataFrame({
+            'day': np.repeat(days, len(SLOTS)),
+            'slot': np.tile(SLOTS, len(days)),
+            'player_id': pd.Series(player_ids.ravel()).where(started.ravel()).astype('Int64'),
+            'value': np.where(started, np.take_along_axis(day_values, np.maximum(lineups, 0), axis=1), 0).ravel()
+        })
+        return lineup_df
+
+def main():
+    """Sets a week of lineups for a team of a league snake-drafted from the consensus rankings."""
+    logger = logger_setup()
+
+    parser = argparse.ArgumentParser(description='Set optimal daily fantasy lineups over a run of days.')
+    parser.add_argument('--start', default='2021-01-04', help='first day (YYYY-MM-DD)')
+    parser.add_argument('--end', default='2021-01-10', help='last day (YYYY-MM-DD)')
+    parser.add_argument('--team', type=int, default=1, help='team of the 12-team demo league')
+    args = parser.parse_args()
+
+    try:
+        fixture_df = pd.read_csv(FIXTURE_PATH, sep=',', header=0, encoding='utf-8')
+        player_team_df = pd.read_csv(PLAYER_TEAM_PATH, sep=',', header=0, encoding='utf-8')
+        player_position_df = pd.read_csv(PLAYER_POSITION_PATH, sep=',', header=0, encoding='utf-8')
+        clusters_df = pd.read_csv(CLUSTERS_PATH, sep=',', header=0, encoding='utf-8')
+        consensus_df = pd.read_csv(CONSENSUS_PATH, sep=',', header=0, encoding='utf-8')
+    except FileNotFoundError as e:
+        logging.error(f'File not found error: {e}')
+        return
+
+    # Value of a game: 9-cat z-score sum above the lowest-valued player of the pool (replacement level)
+    rates_df = rates_from_totals(clusters_df)
+    z_sum = z_scores(np.ones(len(rates_df)), rates_df[RAW_STATS].to_numpy()).sum(axis=1)
+    values = pd.Series(z_sum - z_sum.min(), index=rates_df.index)
+    rosters = snake_draft(consensus_df.loc[consensus_df['player_id'].isin(rates_df.index), 'player_id'], 12, 13)
+    roster = rosters[f'Team {args.team}']
+
+    start = time.perf_counter()
+    lineup_df = LineupOptimizer(fixture_df, player_team_df, player_position_df).optimize(
+        roster, values, args.start, args.end)
+    elapsed = time.perf_counter() - start
+
+    names = dict(zip(clusters_df['player_id'], clusters_df['player_name']))
+    lineup_df['player_name'] = lineup_df['player_id'].map(lambda player_id: names.get(player_id, ''))
+    logging.info(lineup_df.pivot(index='slot', columns='day', values='player_name').reindex(SLOTS).to_string())
+    logging.info(f'\nSet {lineup_df["day"].nunique()} daily lineups ({lineup_df["value"].sum():.1f} value, '
+                 f'{lineup_df["player_id"].notna().sum()} games started) in {elapsed:.3f}s.')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+import time
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+from utils import generate_game_id
+from utils.window_index import StatWindowIndex
+from utils.fantasy_categories import TOTALS, CATEGORIES
+
+# Defining the paths for the schedule, player teams, per-game rate sources & the rankings used to draft a demo league
+FIXTURE_PATH = './data/processed/fixture.csv'
+PLAYER_TEAM_PATH = './data/processed/player_team.csv'
+CLUSTERS_PATH = './data/processed/player_cluster.csv'
+STATS_PATH = './data/intermediate/comprehensive_player_statistic.csv'
+CONSENSUS_PATH = './data/processed/player_consensus_rankings.csv'
+
+def logger_setup():
+    """Standardized logging set up with custom handlers & formatters. Implements logging for all submodules executed."""
+    logger = logging.getLogger()
+    sh, fh = logging.StreamHandler(), logging.FileHandler('../logs_nba3k.log', 'a')
+    sh.setFormatter(logging.Formatter('%(message)s'))
+    fh.setFormatter(logging.Formatter('%(module)s (%(lineno)d): %(asctime)s | %(levelname)s | %(message)s'))
+    logger.setLevel(logging.DEBUG), sh.setLevel(logging.INFO), logger.addHandler(fh), logger.addHandler(sh)
+    return logger
+
+def rates_from_stats(comprehensive_stats_df, season, **window):
+    """Per-game means & variances of TOTALS by player from game logs (window filters as in StatWindowIndex.bounds)."""
+
+    stats_df = comprehensive_stats_df[comprehensive_stats_df['fixture_id'].notna()]
+    stats_df = stats_df[
+        generate_game_id.is_regular_season(stats_df['fixture_id'].astype(np.int64)) &
+        (stats_df['seconds_played'].fillna(0) > 0)
+    ]
+    stats_df = stats_df[['player_id', 'fixture_id', 'played_on'] + TOTALS].copy()
+    stats_df[TOTALS] = stats_df[TOTALS].fillna(0).astype(np.float64)
+    for stat in TOTALS:
+        stats_df[f'{stat}_sq'] = stats_df[stat] ** 2
+
+    totals_df = StatWindowIndex(stats_df, TOTALS + [f'{stat}_sq' for stat in TOTALS]).totals(season=season, **window)
+    totals_df = totals_df[totals_df['games'] > 0]
+    games = totals_df['games'].to_numpy(dtype=np.float64)[:, None]
+    means = totals_df[TOTALS].to_numpy() / games
+    variances = np.maximum(totals_df[[f'{stat}_sq' for stat in TOTALS]].to_numpy() / games - means ** 2, 0)
+    return pd.concat([
+        pd.DataFrame(means, columns=TOTALS, index=totals_df.index),
+        pd.DataFrame(variances, columns=[f'{stat}_var' for stat in TOTALS], index=totals_df.index)
+    ], axis=1)
+
+def rates_from_totals(totals_df, games_column='games_played'):
+    """Per-game means of TOTALS by player from season totals (e.g. player clusters), with Poisson variances."""
+    means = totals_df[TOTALS].to_numpy(dtype=np.float64) / totals_df[[games_column]].to_numpy(dtype=np.float64)
+    index = pd.Index(totals_df['player_id'].to_numpy(), name='player_id')
+    return pd.concat([
+        pd.DataFrame(means, columns=TOTALS, index=index),
+        pd.DataFrame(means, columns=[f'{stat}_var' for stat in TOTALS], index=index)
+    ], axis=1)
+
+def round_robin(teams, week):
+    """Returns the (home, away) fantasy team pairs of a week of a round-robin schedule (circle method)."""
+    teams = list(teams)
+    if len(teams) % 2:
+        teams.append(None)
+    rotation = (week - 1) % (len(teams) - 1)
+    rest = teams[1:]
+    order = [teams[0]] + rest[-rotation:] + rest[:-rotation] if rotation else teams
+    half = len(order) // 2
+    return [(a, b) for a, b in zip(order[:half], order[::-1][:half]) if a is not None and b is not None]
+
+class MatchupProjector:
+    """Projects weekly 9-cat totals of fantasy rosters from the NBA schedule & per-game rates, and simulates matchups.
+    Fantasy weeks run Monday to Sunday, numbered from 1 (the week of the season's first regular-season game)."""
+
+    def __init__(self, fixture_df, player_team_df, rates_df, season):
+        """Builds the games per team & week matrix of the season, then each player's games per week.
+
+        Args:
+            fixture_df (pd.DataFrame): Processed fixtures (fixture_id, home/away_team_id, season, played_on, game_type)
+            player_team_df (pd.DataFrame): Processed player teams (team_id, player_id); FA/0 teams play no games
+            rates_df (pd.DataFrame): player_id-indexed per-game means (TOTALS) & variances ({stat}_var)
+            season (int): 4-digit starting year of the season
+        """
+
+        games_df = fixture_df[(fixture_df['season'] == season) & (fixture_df['game_type'] == 'regular-season')]
+        if games_df.empty:
+            raise ValueError(f'No regular-season fixtures for the {season} season')
+        days = pd.to_datetime(games_df['played_on']).to_numpy(dtype='datetime64[D]')
+
+        # Weeks start on Mondays (day 0 of the epoch was a Thursday)
+        first_monday = days.min() - (days.min().astype(np.int64) + 3) % 7
+        weeks = (days - first_monday).astype(np.int64) // 7
+        self.week_starts = first_monday + 7 * np.arange(weeks.max() + 1)
+
+        # Games per team & week (the extra last row, for players without an NBA team, stays at zero)
+        home, away = games_df['home_team_id'].to_numpy(), games_df['away_team_id'].to_numpy()
+        self.team_ids = np.unique(np.concatenate([home, away]))
+        self.team_games = np.zeros((len(self.team_ids) + 1, len(self.week_starts)), dtype=np.int64)
+        np.add.at(self.team_games, (np.searchsorted(self.team_ids, home), weeks), 1)
+        np.add.at(self.team_games, (np.searchsorted(self.team_ids, away), weeks), 1)
+
+        # Games per player & week through each player's team
+        self.player_ids = rates_df.index.to_numpy()
+        self.positions = {player_id: pos for pos, player_id in enumerate(self.player_ids.tolist())}
+        teams = pd.Series(player_team_df['team_id'].to_numpy(), index=player_team_df['player_id'].to_numpy())
+        team_rows = pd.Series(np.arange(len(self.team_ids)), index=self.team_ids).reindex(
+            teams[~teams.index.duplicated()].reindex(self.player_ids).to_numpy()
+        ).fillna(len(self.team_ids)).to_numpy(dtype=np.int64)
+        self.player_games = self.team_games[team_rows]
+
+        self.means = rates_df[TOTALS].to_numpy(dtype=np.float64)
+        self.variances = rates_df[[f'{stat}_var' for stat in TOTALS]].to_numpy(dtype=np.float64)
+
+    def week_of(self, date):
+        """Returns the fantasy week number (from 1) a date falls in."""
+        day = np.datetime64(pd.Timestamp(date).date(), 'D')
+        return int((day - self.week_starts[0]).astype(np.int64) // 7) + 1
+
+    def roster_matrix(self, rosters):
+        """Returns the (fantasy teams x players) 0/1 incidence matrix of the rosters (dict of team -> player IDs)."""
+        incidence = np.zeros((len(rosters), len(self.player_ids)))
+        for row, player_ids in enumerate(rosters.values()):
+            missing = [player_id for player_id in player_ids if player_id not in self.positions]
+            if missing:
+                logging.debug(f'Players without per-game rates (projected for 0): {missing}')
+            incidence[row, [self.positions[player_id] for player_id in player_ids if player_id in self.positions]] = 1
+        return incidence
+
+    def check_week(self, week):
+        """Raises a ValueError unless the fantasy week number is within the season (1 to the number of weeks)."""
+        if not 1 <= week <= len(self.week_starts):
+            raise ValueError(f'Week {week} is outside the season (weeks 1 to {len(self.week_starts)})')
+
+    def weekly_moments(self, incidence, week):
+        """Returns (games, means, variances) of roster totals for a week: (teams,), (teams x TOTALS) arrays."""
+        self.check_week(week)
+        games = self.player_games[:, week - 1].astype(np.float64)
+        return (incidence @ games, incidence @ (games[:, None] * self.means),
+                incidence @ (games[:, None] * self.variances))
+
+    def project(self, rosters, week):
+        """Returns the projected games, TOTALS & 9-cat values of each fantasy roster for a week."""
+
+        games, means, _ = self.weekly_moments(self.roster_matrix(rosters), week)
+        projection_df = pd.DataFrame(means.round(1), columns=TOTALS, index=pd.Index(list(rosters), name='team'))
+        projection_df.insert(0, 'games', games.astype(np.int64))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            projection_df['fg%'] = (means[:, 0] / means[:, 1]).round(3)
+            projection_df['ft%'] = (means[:, 3] / means[:, 4]).round(3)
+        return projection_df
+
+    def simulate(self, rosters, matchups, week, n_sims=10000, seed=None):
+        """Simulates every matchup of a week at once from normal approximations of the weekly roster totals.
+
+        Args:
+            rosters (dict): Fantasy team -> list of player IDs
+            matchups (list): (team, opponent) pairs of fantasy teams
+            week (int): Fantasy week number
+            n_sims (int): Number of simulated weeks
+            seed (int): Seed of the random generator
+
+        Returns:
+            pd.DataFrame: Win/tie/loss probabilities & per-category win probabilities of the first team of each pair
+        """
+
+        incidence = self.roster_matrix(rosters)
+        _, means, variances = self.weekly_moments(incidence, week)
+        rng = np.random.default_rng(seed)
+        totals = np.maximum(means + np.sqrt(variances) * rng.standard_normal((n_sims,) + means.shape), 0)
+
+        # Category values of every simulated roster week, then all matchups compared in one broadcast
+        fgm, fga, tpm, ftm, fta, reb, ast, stl, blk, pts, tov = np.moveaxis(totals, -1, 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            categories = np.stack([np.nan_to_num(fgm / fga), tpm, np.nan_to_num(ftm / fta), reb, ast, stl, blk, pts,
+                                   tov], axis=-1)
+        teams = list(rosters)
+        first = np.array([teams.index(team) for team, _ in matchups])
+        second = np.array([teams.index(opponent) for _, opponent in matchups])
+        diff = categories[:, first] - categories[:, second]
+        diff[..., -1] = -diff[..., -1]
+        won, lost = (diff > 0).sum(axis=-1), (diff < 0).sum(axis=-1)
+
+        results_df = pd.DataFrame({
+            'team': [team for team, _ in matchups],
+            'opponent': [opponent for _, opponent in matchups],
+            'win': (won > lost).mean(axis=0),
+            'tie': (won == lost).mean(axis=0),
+            'loss': (won < lost).mean(axis=0),
+            'expected_categories': won.mean(axis=0)
+        })
+        category_df = pd.DataFrame((diff > 0).mean(axis=0), columns=[f'p_{category}' for category in CATEGORIES])
+        return pd.concat([results_df, category_df], axis=1)
+
+def snake_draft(player_ids, n_teams, roster_size):
+    """Drafts rosters (dict of 'Team N' -> player IDs) from players in draft order with snake ordering."""
+    rosters = {f'Team {team + 1}': [] for team in range(n_teams)}
+    names = list(rosters)
+    for pick, player_id in enumerate(list(player_ids)[:n_teams * roster_size]):
+        round_number, slot = divmod(pick, n_teams)
+        rosters[names[slot if round_number % 2 == 0 else n_teams - 1 - slot]].append(player_id)
+    return rosters
+
+def main():
+    """Projects & simulates a fantasy week of a 12-team league snake-drafted from the consensus rankings."""
+    logger = logger_setup()
+
+    parser = argparse.ArgumentParser(description='Project weekly fantasy matchups from the NBA schedule.')
+    parser.add_argument('--season', type=int, default=2020, help='starting year of the season, e.g. 2020')
+    parser.add_argument('--week', type=int, default=1, help='fantasy week number (from 1)')
+    parser.add_argument('--rates', choices=['clusters', 'stats'], default='clusters',
+                        help='per-game rates from the season totals of the player clusters or from game logs')
+    parser.add_argument('--teams', type=int, default=12, help='number of fantasy teams')
+    parser.add_argument('--roster-size', type=int, default=13, help='players per fantasy team')
+    parser.add_argument('--sims', type=int, default=10000, help='number of simulated weeks')
+    parser.add_argument('--seed', type=int, default=None, help='seed of the random generator')
+    args = parser.parse_args()
+
+    try:
+        fixture_df = pd.read_csv(FIXTURE_PATH, sep=',', header=0, encoding='utf-8')
+        player_team_df = pd.read_csv(PLAYER_TEAM_PATH, sep=',', header=0, encoding='utf-8')
+        consensus_df = pd.read_csv(CONSENSUS_PATH, sep=',', header=0, encoding='utf-8')
+        if args.rates == 'clusters':
+            rates_df = rates_from_totals(pd.read_csv(CLUSTERS_PATH, sep=',', header=0, encoding='utf-8'))
+        else:
+            stats_df = pd.read_csv(STATS_PATH, sep=',', header=0, encoding='utf-8', low_memory=False)
+            rates_df = rates_from_stats(stats_df, args.season)
+    except FileNotFoundError as e:
+        logging.error(f'File not found error: {e}')
+        return
+
+    start = time.perf_counter()
+    projector = MatchupProjector(fixture_df, player_team_df, rates_df, args.season)
+    draft_order = consensus_df.loc[consensus_df['player_id'].isin(rates_df.index), 'player_id']
+    rosters = snake_draft(draft_order, args.teams, args.roster_size)
+    matchups = round_robin(rosters, args.week)
+    projection_df = projector.project(rosters, args.week)
+    results_df = projector.simulate(rosters, matchups, args.week, args.sims, args.seed)
+    elapsed = time.perf_counter() - start
+
+    logging.info(f'\nWeek {args.week} (starting {projector.week_starts[args.week - 1]}) projections:')
+    logging.info(projection_df.to_string())
+    logging.info(f'\nMatchups ({args.sims:,} simulations):')
+    logging.info(results_df.round(3).to_string(index=False))
+    logging.info(f'\nProjected & simulated {len(matchups)} matchups in {elapsed:.3f}s.')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+import os
+import time
+import hashlib
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+from utils import generate_game_id
+from utils.window_index import StatWindowIndex, SEASON_PHASES
+from utils.fantasy_categories import TOTALS
+
+# Defining the paths for the processed game logs & schedule, the fitted weights cache & the exported projections
+PLAYER_STATISTIC_PATH = './data/processed/player_statistic.csv'
+FIXTURE_PATH = './data/processed/fixture.csv'
+PLAYER_TEAM_PATH = './data/processed/player_team.csv'
+WEIGHTS_CACHE_PATH = './data/intermediate/projection_weights.npz'
+PROJECTIONS_PATH = './data/processed/player_projections.csv'
+
+# Regression features of each stat: intercept, season-to-date rate, rate shrunk to the league mean, prior-season rate
+# (league mean without one) & rate over the last RECENT_GAMES games
+FEATURES = ['intercept', 'to_date', 'shrunk', 'prior', 'recent']
+RECENT_GAMES = 10
+SHRINKAGE_GAMES = 15
+# Points in each season where the model learns how the rest of the season played out from the games before
+TRAINING_CUTOFFS = (0.25, 0.5, 0.75)
+MIN_REST_GAMES = 5
+RIDGE = 1e-6
+
+def logger_setup():
+    """Standardized logging set up with custom handlers & formatters. Implements logging for all submodules executed."""
+    logger = logging.getLogger()
+    sh, fh = logging.StreamHandler(), logging.FileHandler('../logs_nba3k.log', 'a')
+    sh.setFormatter(logging.Formatter('%(message)s'))
+    fh.setFormatter(logging.Formatter('%(module)s (%(lineno)d): %(asctime)s | %(levelname)s | %(message)s'))
+    logger.setLevel(logging.DEBUG), sh.setLevel(logging.INFO), logger.addHandler(fh), logger.addHandler(sh)
+    return logger
+
+def fit_weights(features, targets, sample_weights):
+    """Fits one weighted least-squares model per stat in a single batched solve of the stacked normal equations.
+
+    Args:
+        features (np.ndarray): Feature tensor (stats x samples x FEATURES)
+        targets (np.ndarray): Rest-of-season per-game rates (stats x samples)
+        sample_weights (np.ndarray): Weight of each sample (samples,), e.g. its rest-of-season games
+
+    Returns:
+        np.ndarray: Weights by stat & feature (stats x FEATURES)
+    """
+
+    gram = np.einsum('snf,n,sng->sfg', features, sample_weights, features)
+    moments = np.einsum('snf,n,sn->sf', features, sample_weights, targets)
+    # A tiny ridge keeps the system solvable when features are collinear (e.g. no player has a prior season)
+    gram += RIDGE * np.trace(gram, axis1=1, axis2=2)[:, None, None] * np.eye(features.shape[2])
+    return np.linalg.solve(gram, moments[..., None])[..., 0]
+
+class ProjectionModel:
+    """Projects every player's per-game rates for the rest of a season by blending season-to-date, prior-season &
+    recent rates. Blend weights are fit across all players & seasons at once, and cached per data version."""
+
+    def __init__(self, player_statistic_df, fixture_df, season_calendar=None, cache_path=WEIGHTS_CACHE_PATH):
+        """Instantiates class attributes for the window index of regular-season games played & the caches.
+
+        Args:
+            player_statistic_df (pd.DataFrame): Processed player_statistic game logs
+            fixture_df (pd.DataFrame): Processed fixtures (fixture_id, played_on, ...)
+            season_calendar (pd.DataFrame): Season calendar, to split seasons at the all-star break (optional)
+            cache_path (str): Where fitted weights are cached with their data version (no disk cache if None)
+        """
+        self.season_calendar = season_calendar
+        self.cache_path = cache_path
+        self.window_index = None
+        self.version = None
+        self.weights = None
+        self.cache = {}
+        self.pre_processing(player_statistic_df, fixture_df)
+
+    def pre_processing(self, player_statistic_df, fixture_df):
+        """Index the regular-season games players took the floor in & fingerprint the data (its version)."""
+
+        stats_df = player_statistic_df[player_statistic_df['fixture_id'].notna()]
+        stats_df = stats_df[
+            generate_game_id.is_regular_season(stats_df['fixture_id'].astype(np.int64)) &
+            (stats_df['seconds_played'].fillna(0) > 0)
+        ].copy()
+        stats_df['rebounds'] = stats_df['offensive_rebounds'].fillna(0) + stats_df['defensive_rebounds'].fillna(0)
+        stats_df = stats_df[['player_id', 'fixture_id'] + TOTALS]
+        stats_df[TOTALS] = stats_df[TOTALS].fillna(0).astype(np.float64)
+
+        # Game dates through a fixture lookup (only needs the 2 fixture columns)
+        played_on = pd.Series(fixture_df['played_on'].to_numpy(), index=fixture_df['fixture_id'].to_numpy())
+        stats_df.insert(2, 'played_on', played_on[~played_on.index.duplicated()].reindex(
+            stats_df['fixture_id'].to_numpy()).to_numpy())
+
+        self.version = hashlib.sha1(pd.util.hash_pandas_object(stats_df, index=False).to_numpy()).hexdigest()
+        self.window_index = StatWindowIndex(stats_df, TOTALS, self.season_calendar)
+        self.weights = None
+        self.cache.clear()
+
+    def season_days(self, season):
+        """Returns the first & last indexed (regular-season) game day of a season, as days since the epoch."""
+        days = self.window_index.days[self.window_index.keys // len(SEASON_PHASES) == season]
+        if not len(days):
+            raise ValueError(f'No regular-season games indexed for the {season} season')
+        return int(days.min()), int(days.max())
+
+    def window(self, **window):
+        """Returns (games, totals) arrays of every indexed player over a window (see StatWindowIndex.bounds)."""
+        _, lo, hi = self.window_index.bounds(**window)
+        return (hi - lo).astype(np.float64), self.window_index.prefix[hi] - self.window_index.prefix[lo]
+
+    def features(self, season, end):
+        """Builds the feature tensor of the players with games in a season up to (and including) a day.
+
+        Returns:
+            tuple: (mask of indexed players with games to date, stats x players x FEATURES tensor, games to date)
+        """
+
+        end = np.datetime64(int(end), 'D') if isinstance(end, (int, np.integer)) else end
+        games, totals = self.window(season=season, end=end)
+        mask = games > 0
+        games, totals = games[mask], totals[mask]
+        to_date = totals / games[:, None]
+        league = totals.sum(axis=0) / max(games.sum(), 1)
+
+        recent_games, recent_totals = self.window(season=season, end=end, last_n=RECENT_GAMES)
+        prior_games, prior_totals = self.window(season=season - 1)
+        recent_games, recent_totals = recent_games[mask], recent_totals[mask]
+        prior_games, prior_totals = prior_games[mask], prior_totals[mask]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            prior = np.where(prior_games[:, None] > 0, prior_totals / prior_games[:, None], league)
+
+        shrink = (games / (games + SHRINKAGE_GAMES))[:, None]
+        features = np.stack([
+            np.ones_like(to_date),
+            to_date,
+            shrink * to_date + (1 - shrink) * league,
+            prior,
+            recent_totals / recent_games[:, None]
+        ], axis=-1)
+        return mask, features.transpose(1, 0, 2), games
+
+    def training_set(self):
+        """Stacks (features, rest-of-season rates, rest-of-season games) over every season & TRAINING_CUTOFFS."""
+
+        seasons = np.unique(self.window_index.keys // len(SEASON_PHASES)).tolist()
+        features, targets, weights = [], [], []
+        for season in seasons:
+            season_games, season_totals = self.window(season=season)
+            first, last = self.season_days(season)
+            for cutoff in TRAINING_CUTOFFS:
+                mask, season_features, games = self.features(season, first + int(cutoff * (last - first)))
+                rest_games = season_games[mask] - games
+                rest_totals = season_totals[mask] - (season_features[:, :, FEATURES.index('to_date')].T *
+                                                     games[:, None])
+                sample = rest_games >= MIN_REST_GAMES
+                features.append(season_features[:, sample])
+                targets.append((rest_totals[sample] / rest_games[sample, None]).T)
+                weights.append(rest_games[sample])
+
+        return np.concatenate(features, axis=1), np.concatenate(targets, axis=1), np.concatenate(weights)
+
+    def fit(self):
+        """Fits the blend weights of every stat (or loads them from cache if the data version is unchanged)."""
+
+        cache_path = self.cache_path
+        if self.weights is not None:
+            return self.weights
+        if cache_path and os.path.exists(cache_path):
+            cache = np.load(cache_path)
+            if str(cache['version']) == self.version:
+                logging.debug('Loaded projection weights from cache.')
+                self.weights = cache['weights']
+                return self.weights
+
+        features, targets, sample_weights = self.training_set()
+        if not len(sample_weights):
+            raise ValueError(f'No player-seasons with {MIN_REST_GAMES}+ games after a training cutoff')
+        self.weights = fit_weights(features, targets, sample_weights)
+        logging.debug(f'Fit projection weights on {len(sample_weights)} player-season samples.')
+
+        if cache_path:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            np.savez(cache_path, weights=self.weights, version=self.version)
+        return self.weights
+
+    def project(self, season, as_of=None):
+        """Projects per-game rates of TOTALS (and the shooting percentages they imply) for the rest of a season.
+
+        Args:
+            season (int): 4-digit starting year of the season
+            as_of: Last date of games known (all indexed games of the season if None)
+
+        Returns:
+            pd.DataFrame: player_id-indexed games to date, projected TOTALS per game, fg% & ft%; a copy of the cached
+                projection, so callers may modify it
+        """
+
+        end = self.season_days(season)[1] if as_of is None else pd.Timestamp(as_of).to_datetime64()
+        key = (self.version, season, None if as_of is None else str(as_of))
+        if key not in self.cache:
+            weights = self.fit()
+            mask, features, games = self.features(season, end)
+            if not mask.any():
+                raise ValueError(f'No games played in the {season} season as of {as_of}')
+            rates = np.maximum(np.einsum('snf,sf->ns', features, weights), 0)
+
+            projection_df = pd.DataFrame(rates, columns=TOTALS,
+                                         index=pd.Index(self.window_index.player_ids[mask], name='player_id'))
+            projection_df.insert(0, 'games', games.astype(np.int64))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                projection_df['fg%'] = rates[:, 0] / rates[:, 1]
+                projection_df['ft%'] = rates[:, 3] / rates[:, 4]
+            self.cache[key] = projection_df
+            logging.debug(f'Projected {len(projection_df)} players for {key[1:]}.')
+        return self.cache[key].copy()
+
+    def rates(self, season, as_of=None):
+        """Returns projected rates in the per-game means & Poisson variances layout of the matchup/trade tools."""
+        means = self.project(season, as_of)[TOTALS]
+        return pd.concat([means, means.rename(columns={stat: f'{stat}_var' for stat in TOTALS})], axis=1)
+
+def remaining_games(fixture_df, player_team_df, season, as_of):
+    """Returns each rostered player's regular-season team games left after a date, indexed by player_id."""
+
+    games_df = fixture_df[(fixture_df['season'] == season) & (fixture_df['game_type'] == 'regular-season') &
+                          (pd.to_datetime(fixture_df['played_on']) > pd.Timestamp(as_of))]
+    team_games = pd.concat([games_df['home_team_id'], games_df['away_team_id']]).value_counts()
+    teams = player_team_df.drop_duplicates(subset='player_id').set_index('player_id')['team_id']
+    return teams.map(team_games).fillna(0).astype(np.int64).rename('remaining_games')
+
+def main():
+    """Projects rest-of-season rates of every player & exports them with projected totals over remaining games."""
+    logger = logger_setup()
+
+    parser = argparse.ArgumentParser(description='Rest-of-season per-game projections of the whole player pool.')
+    parser.add_argument('season', type=int, help='starting year of the season, e.g. 2019')
+    parser.add_argument('--as-of', help='last date of games known (YYYY-MM-DD), defaults to the last game played')
+    parser.add_argument('--top', type=int, default=25, help='number of players to display')
+    args = parser.parse_args()
+
+    try:
+        logging.info('\nLOG: Loading player game logs & fixtures...')
+        player_statistic_df = pd.read_csv(PLAYER_STATISTIC_PATH, sep=',', header=0, encoding='utf-8', low_memory=False)
+        fixture_df = pd.read_csv(FIXTURE_PATH, sep=',', header=0, encoding='utf-8')
+        player_team_df = pd.read_csv(PLAYER_TEAM_PATH, sep=',', header=0, encoding='utf-8')
+    except FileNotFoundError as e:
+        logging.error(f'File not found error: {e}')
+        return
+
+    start = time.perf_counter()
+    model = ProjectionModel(player_statistic_df, fixture_df)
+    projection_df = model.project(args.season, args.as_of)
+    logging.info(f'Projected {len(projection_df)} players in {time.perf_counter() - start:.2f}s '
+                 f'(data version {model.version[:10]}).')
+
+    as_of = args.as_of or str(np.datetime64(model.season_days(args.season)[1], 'D'))
+    games_left = remaining_games(fixture_df, player_team_df, args.season, as_of).reindex(projection_df.index)
+    projection_df = projection_df.round(3)
+    projection_df['remaining_games'] = games_left.fillna(0).astype(np.int64)
+    projection_df['ros_points'] = (projection_df['points'] * projection_df['remaining_games']).round(1)
+    projection_df.insert(0, 'data_version', model.version)
+
+    projection_df.to_csv(PROJECTIONS_PATH, index=True)
+    logging.info(projection_df.sort_values(by='points', ascending=False).head(args.top).to_string())
+
+if __name__ == '__main__':
+    main()
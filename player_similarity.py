@@ -0,0 +1,185 @@
+import time
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+from utils.player_registry import PlayerRegistry
+
+# Defining the paths for the per-player season aggregates (output of generate_player_season_aggregate.py)
+AGGREGATE_PATH = './data/processed/player_season_aggregate.csv'
+
+# Per-36 production & shooting features of a player-season (percentages from the season made/attempted totals)
+FEATURES = [
+    'points_per_36', 'rebounds_per_36', 'assists_per_36', 'steals_per_36', 'blocks_per_36', 'turnovers_per_36',
+    'threes_made_per_36', 'field_goals_attempted_per_36', 'free_throws_attempted_per_36', 'fg%', 'ft%'
+]
+METRICS = ('cosine', 'euclidean')
+
+def logger_setup():
+    """Standardized logging set up with custom handlers & formatters. Implements logging for all submodules executed."""
+    logger = logging.getLogger()
+    sh, fh = logging.StreamHandler(), logging.FileHandler('../logs_nba3k.log', 'a')
+    sh.setFormatter(logging.Formatter('%(message)s'))
+    fh.setFormatter(logging.Formatter('%(module)s (%(lineno)d): %(asctime)s | %(levelname)s | %(message)s'))
+    logger.setLevel(logging.DEBUG), sh.setLevel(logging.INFO), logger.addHandler(fh), logger.addHandler(sh)
+    return logger
+
+class SimilarityIndex:
+    """Finds the player-seasons producing most like a given player-season (top-K cosine or Euclidean search).
+    Raw features live in a contiguous float32 matrix; the standardized (& unit-length) copies are rebuilt lazily
+    after updates, and each query is one matrix-vector product plus a partial sort."""
+
+    def __init__(self, registry=None, min_minutes=500):
+        """Instantiates class attributes for the player-season keys, feature matrices & the name registry."""
+        self.registry = registry
+        self.min_minutes = min_minutes
+        self.keys = []  # (player_id, season) of each feature row, in insertion order
+        self.index = {}  # (player_id, season) -> row position
+        self.player_seasons = {}  # player_id -> indexed seasons
+        self.features = np.zeros((0, len(FEATURES)), dtype=np.float32)
+        self.player_ids = None
+        self.scaled = None
+        self.normalized = None
+        self.squared_norms = None
+
+    def update(self, aggregate_df):
+        """Adds new player-seasons & overwrites changed ones from season aggregates. Rows below min_minutes are skipped,
+        evicting their player-season if an earlier aggregate indexed it."""
+
+        all_keys = list(zip(aggregate_df['player_id'].tolist(), aggregate_df['season'].tolist()))
+        passing = (aggregate_df['minutes'] >= self.min_minutes).to_numpy()
+        keys = [key for key, passed in zip(all_keys, passing) if passed]
+        self.evict({key for key, passed in zip(all_keys, passing) if not passed} - set(keys))
+
+        features = aggregate_df.loc[passing, FEATURES].to_numpy(dtype=np.float32)
+
+        new_keys = [key for key in dict.fromkeys(keys) if key not in self.index]
+        for key in new_keys:
+            self.index[key] = len(self.keys)
+            self.keys.append(key)
+            self.player_seasons.setdefault(key[0], set()).add(key[1])
+        self.features = np.vstack([self.features, np.zeros((len(new_keys), len(FEATURES)), dtype=np.float32)])
+        self.features[[self.index[key] for key in keys]] = features
+        self.scaled = self.normalized = None
+
+        logging.debug(f'Indexed {len(keys)} player-seasons ({len(new_keys)} new) for similarity search.')
+
+    def evict(self, keys):
+        """Removes indexed player-seasons (unknown keys ignored), compacting the feature matrix & row positions."""
+
+        evicted = {key for key in keys if key in self.index}
+        if not evicted:
+            return
+        keep = np.array([key not in evicted for key in self.keys], dtype=bool)
+        self.features = self.features[keep]
+        self.keys = [key for key in self.keys if key not in evicted]
+        self.index = {key: position for position, key in enumerate(self.keys)}
+        for player_id, season in evicted:
+            self.player_seasons[player_id].discard(season)
+            if not self.player_seasons[player_id]:
+                del self.player_seasons[player_id]
+        self.scaled = self.normalized = None
+
+        logging.debug(f'Evicted {len(evicted)} player-seasons below {self.min_minutes} minutes from similarity search.')
+
+    def build(self):
+        """Standardizes the features (missing percentages at the pool mean) & the unit-length copy for cosine."""
+
+        mean = np.nanmean(self.features, axis=0)
+        std = np.nanstd(self.features, axis=0)
+        scaled = (self.features - mean) / np.where(std > 0, std, 1)
+        self.scaled = np.ascontiguousarray(np.nan_to_num(scaled), dtype=np.float32)
+        norms = np.linalg.norm(self.scaled, axis=1, keepdims=True)
+        self.normalized = self.scaled / np.where(norms > 0, norms, 1)
+        self.squared_norms = (self.scaled ** 2).sum(axis=1)
+        self.player_ids = np.array([player_id for player_id, _ in self.keys], dtype=np.int64)
+
+    def resolve(self, player, season=None):
+        """Returns the (player_id, season) key of a player (name or ID) & season (latest indexed season if None)."""
+
+        player_id = player
+        if isinstance(player, str):
+            if self.registry is None:
+                raise ValueError('A player registry is needed to query by name')
+            player_id = self.registry.resolve([player]).iloc[0]
+            if pd.isna(player_id):
+                raise KeyError(f'Unknown player: {player}')
+            player_id = int(player_id)
+        seasons = self.player_seasons.get(player_id, set()) if season is None else {season}
+        if not seasons or (player_id, max(seasons)) not in self.index:
+            raise KeyError(f'No indexed season for player {player} ({season or "any season"})')
+        return player_id, max(seasons)
+
+    def similar(self, player, season=None, k=10, metric='cosine', exclude_player=True):
+        """Returns the k player-seasons most similar to a player's season.
+
+        Args:
+            player (str, int): Player name (resolved through the registry) or player ID
+            season (int): Season of the player to compare (latest indexed season if None)
+            k (int): Number of player-seasons to return
+            metric (str): 'cosine' (similarity, higher is closer) or 'euclidean' (distance, lower is closer)
+            exclude_player (bool): Leave out every season of the queried player
+
+        Returns:
+            pd.DataFrame: player_id, player_name, season & score of the k closest player-seasons
+        """
+
+        if metric not in METRICS:
+            raise ValueError(f'Unknown metric {metric}, expected one of {METRICS}')
+        if self.scaled is None:
+            self.build()
+        key = self.resolve(player, season)
+        row = self.index[key]
+
+        if metric == 'cosine':
+            scores = self.normalized @ self.normalized[row]
+            order_scores = -scores
+        else:
+            scores = np.sqrt(np.maximum(self.squared_norms - 2 * self.scaled @ self.scaled[row] +
+                                        self.squared_norms[row], 0))
+            order_scores = scores.copy()
+
+        player_ids = self.player_ids
+        order_scores[player_ids == key[0] if exclude_player else row] = np.inf
+        k = min(k, int(np.isfinite(order_scores).sum()))
+        top = np.argpartition(order_scores, k - 1)[:k] if k else np.zeros(0, dtype=np.int64)
+        top = top[np.argsort(order_scores[top], kind='stable')]
+
+        return pd.DataFrame({
+            'player_id': player_ids[top],
+            'player_name': [self.registry.name(player_id) if self.registry else None for player_id in player_ids[top]],
+            'season': [self.keys[i][1] for i in top],
+            metric: scores[top].round(4)
+        })
+
+def main():
+    """Loads the season aggregates & prints the player-seasons most similar to a given player."""
+    logger = logger_setup()
+
+    parser = argparse.ArgumentParser(description='Find the player-seasons most similar to a player.')
+    parser.add_argument('player', help='player name, e.g. "Jrue Holiday"')
+    parser.add_argument('--season', type=int, help='season of the player (latest if omitted)')
+    parser.add_argument('-k', type=int, default=10, help='number of similar player-seasons')
+    parser.add_argument('--metric', choices=METRICS, default='cosine', help='similarity metric')
+    parser.add_argument('--min-minutes', type=int, default=500, help='minutes needed for a season to be indexed')
+    args = parser.parse_args()
+
+    try:
+        aggregate_df = pd.read_csv(AGGREGATE_PATH, sep=',', header=0, encoding='utf-8')
+        registry = PlayerRegistry.from_csv()
+    except FileNotFoundError as e:
+        logging.error(f'File not found error: {e}')
+        return
+
+    index = SimilarityIndex(registry, args.min_minutes)
+    index.update(aggregate_df)
+    index.build()
+    start = time.perf_counter()
+    similar_df = index.similar(args.player, args.season, args.k, args.metric)
+    elapsed = time.perf_counter() - start
+
+    logging.info(similar_df.to_string(index=False))
+    logging.info(f'\nSearched {len(index.keys)} player-seasons in {elapsed * 1000:.1f}ms.')
+
+if __name__ == '__main__':
+    main()
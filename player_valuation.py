@@ -0,0 +1,189 @@
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+from utils import generate_game_id
+from utils.window_index import StatWindowIndex, SEASON_PHASES
+from utils.fantasy_categories import CATEGORIES
+from cleaners.generate_fixture import load_season_calendar
+
+# Defining the paths for CSV file containing comprehensive player/game statistical information needed (from 2016)
+DATA_PATH = './data/intermediate/comprehensive_player_statistic.csv'
+
+# The z-score matrix columns follow the shared 9-cat CATEGORIES order (turnovers count against a player)
+COUNTING_CATEGORIES = ['threes_made', 'points', 'rebounds', 'assists', 'steals', 'blocks', 'turnovers']
+# Shooting categories valued by volume impact: made shots above/below what the pool's percentage implies
+IMPACT_CATEGORIES = {
+    'fg%': ('field_goals_made', 'field_goals_attempted'),
+    'ft%': ('free_throws_made', 'free_throws_attempted')
+}
+RAW_STATS = COUNTING_CATEGORIES + [stat for pair in IMPACT_CATEGORIES.values() for stat in pair]
+
+# Punt variant matrix: row b counts the categories whose bit isn't set in b (bit i punts CATEGORIES[i])
+PUNT_MASKS = 1 - ((np.arange(2 ** len(CATEGORIES))[:, None] >> np.arange(len(CATEGORIES))) & 1)
+
+def logger_setup():
+    """Standardized logging set up with custom handlers & formatters. Implements logging for all submodules executed."""
+    logger = logging.getLogger()
+    sh, fh = logging.StreamHandler(), logging.FileHandler('../logs_nba3k.log', 'a')
+    sh.setFormatter(logging.Formatter('%(message)s'))
+    fh.setFormatter(logging.Formatter('%(module)s (%(lineno)d): %(asctime)s | %(levelname)s | %(message)s'))
+    logger.setLevel(logging.DEBUG), sh.setLevel(logging.INFO), logger.addHandler(fh), logger.addHandler(sh)
+    return logger
+
+def punt_variant(punts=()):
+    """Returns the row of PUNT_MASKS (& column of the punt value matrix) that punts the given categories."""
+    for category in punts:
+        if category not in CATEGORIES:
+            raise ValueError(f'Unknown category {category}, expected one of {CATEGORIES}')
+    return sum(1 << CATEGORIES.index(category) for category in set(punts))
+
+def category_values(games, totals, pool_pcts=None):
+    """Computes per-game category values (players x CATEGORIES) from game counts & RAW_STATS totals.
+
+    Args:
+        games (np.ndarray): Games played by each player
+        totals (np.ndarray): Totals of RAW_STATS by player, in column order
+        pool_pcts (dict): Shooting percentage of each IMPACT_CATEGORIES category (from these totals if None)
+
+    Returns:
+        tuple: (per-game category values, pool shooting percentages used for the volume impact)
+    """
+
+    per_game = totals / games[:, None]
+    columns = {stat: per_game[:, i] for i, stat in enumerate(RAW_STATS)}
+    if pool_pcts is None:
+        pool_pcts = {
+            category: totals[:, RAW_STATS.index(made)].sum() / max(totals[:, RAW_STATS.index(attempted)].sum(), 1)
+            for category, (made, attempted) in IMPACT_CATEGORIES.items()
+        }
+
+    # Volume impact: extra makes per game relative to a pool-average shooter taking the same attempts
+    for category, (made, attempted) in IMPACT_CATEGORIES.items():
+        columns[category] = columns[made] - pool_pcts[category] * columns[attempted]
+
+    return np.column_stack([columns[category] for category in CATEGORIES]), pool_pcts
+
+def standardize(values, mean, std):
+    """Turns category values into z-scores against a pool's mean & std (turnovers negated, so higher is better)."""
+    z = (values - mean) / np.where(std > 0, std, 1)
+    z[:, CATEGORIES.index('turnovers')] *= -1
+    return z
+
+def z_scores(games, totals):
+    """Computes per-game 9-cat z-scores (players x CATEGORIES) from game counts & RAW_STATS totals (players x stats).
+
+    Args:
+        games (np.ndarray): Games played by each player of the pool
+        totals (np.ndarray): Totals of RAW_STATS by player, in column order
+
+    Returns:
+        np.ndarray: Z-scores by player & category (turnovers negated, so a higher z is always better)
+    """
+    values, _ = category_values(games, totals)
+    return standardize(values, values.mean(axis=0), values.std(axis=0))
+
+class LeagueValuation:
+    """Values the whole player pool in the 9 fantasy categories (z-scores) & in every punt variant at once.
+    Valuations are cached per season & filter (phase, date range, last-N games), so repeated queries are free."""
+
+    def __init__(self, comprehensive_stats_df, season_calendar=None):
+        """Instantiates class attributes for the window index of regular-season games played, player names & the
+        valuation cache."""
+        self.season_calendar = season_calendar if season_calendar is not None else load_season_calendar()
+        self.window_index = None
+        self.player_names = {}
+        self.cache = {}
+        self.pre_processing(comprehensive_stats_df)
+
+    def pre_processing(self, comprehensive_stats_df):
+        """Index the regular-season games players took the floor in, for the valued stats."""
+
+        stats_df = comprehensive_stats_df[comprehensive_stats_df['fixture_id'].notna()]
+        stats_df = stats_df[
+            generate_game_id.is_regular_season(stats_df['fixture_id'].astype(np.int64)) &
+            (stats_df['seconds_played'].fillna(0) > 0)
+        ]
+        stats_df = stats_df[['player_id', 'player_name', 'fixture_id', 'played_on'] + RAW_STATS].copy()
+        stats_df[RAW_STATS] = stats_df[RAW_STATS].fillna(0).astype(np.float64)
+        self.window_index = StatWindowIndex(stats_df, RAW_STATS, self.season_calendar)
+        self.player_names = dict(zip(stats_df['player_id'], stats_df['player_name']))
+        self.cache.clear()
+
+    def window_totals(self, season, start=None, end=None, last_n=None, phase=None):
+        """Returns (player IDs, games, RAW_STATS totals) of a season/phase, optionally within dates & last N games."""
+
+        totals_df = self.window_index.totals(season=season, phase=phase, start=start, end=end, last_n=last_n)
+        totals_df = totals_df[totals_df['games'] > 0]
+        games = totals_df['games'].to_numpy(dtype=np.float64)
+        return totals_df.index.to_numpy(), games, totals_df[RAW_STATS].to_numpy()
+
+    def valuate(self, season, start=None, end=None, last_n=None, min_games=1, phase=None):
+        """Values the season's pool (players with at least min_games in the window) in every punt variant.
+
+        Returns:
+            dict: player_ids, games, z (players x CATEGORIES) & punt_values (players x punt variants) arrays; the
+                arrays are shared with the cache & read-only (copy them to modify), the dict is a fresh copy
+        """
+
+        key = (season, start, end, last_n, min_games, phase)
+        if key not in self.cache:
+            player_ids, games, totals = self.window_totals(season, start, end, last_n, phase)
+            pool = games >= min_games
+            player_ids, games, totals = player_ids[pool], games[pool], totals[pool]
+            if not len(player_ids):
+                raise ValueError(f'No players with {min_games}+ games in the {season} window {key[1:4] + key[5:]}')
+
+            z = z_scores(games, totals)
+            self.cache[key] = {
+                'player_ids': player_ids,
+                'games': games,
+                'z': z,
+                'punt_values': z @ PUNT_MASKS.T
+            }
+            for values in self.cache[key].values():
+                values.setflags(write=False)
+            logging.debug(f'Valued {len(player_ids)} players in {len(PUNT_MASKS)} punt variants for {key}.')
+        return dict(self.cache[key])
+
+    def rankings(self, season, punts=(), start=None, end=None, last_n=None, min_games=1, phase=None):
+        """Returns the season's player rankings (per-category z-scores & total value) for a punt variant."""
+
+        valuation = self.valuate(season, start, end, last_n, min_games, phase)
+        rankings_df = pd.DataFrame(valuation['z'].round(3), columns=[f'z_{category}' for category in CATEGORIES])
+        rankings_df.insert(0, 'player_id', valuation['player_ids'])
+        rankings_df.insert(1, 'player_name', [self.player_names.get(pid) for pid in valuation['player_ids']])
+        rankings_df.insert(2, 'games', valuation['games'].astype(np.int64))
+        rankings_df['value'] = valuation['punt_values'][:, punt_variant(punts)].round(3)
+        rankings_df['rank'] = rankings_df['value'].rank(method='min', ascending=False).astype(np.int64)
+        return rankings_df.sort_values(by='rank').reset_index(drop=True)
+
+def main():
+    """Loads the comprehensive player statistics & prints the top players of a season for the requested punt."""
+    logger = logger_setup()
+
+    parser = argparse.ArgumentParser(description='9-cat z-score valuation of the player pool, with punt variants.')
+    parser.add_argument('season', type=int, help='starting year of the season, e.g. 2019')
+    parser.add_argument('--punt', nargs='*', default=[], choices=CATEGORIES, help='categories to punt')
+    parser.add_argument('--start', help='first date of the window (YYYY-MM-DD)')
+    parser.add_argument('--end', help='last date of the window (YYYY-MM-DD)')
+    parser.add_argument('--last-n', type=int, help="only value each player's last N games of the window")
+    parser.add_argument('--phase', choices=SEASON_PHASES[1:3], help='only value games before/after the all-star break')
+    parser.add_argument('--min-games', type=int, default=10, help='games needed to be part of the pool')
+    parser.add_argument('--top', type=int, default=25, help='number of players to display')
+    args = parser.parse_args()
+
+    try:
+        logging.info('\nLOG: Loading player statistical data since 2016...')
+        comprehensive_stats_df = pd.read_csv(DATA_PATH, sep=',', header=0, encoding='utf-8', low_memory=False)
+    except FileNotFoundError as e:
+        logging.error(f'File not found error: {e}')
+        return
+
+    valuation = LeagueValuation(comprehensive_stats_df)
+    rankings_df = valuation.rankings(args.season, args.punt, args.start, args.end, args.last_n, args.min_games,
+                                     args.phase)
+    logging.info(rankings_df.head(args.top).to_string(index=False))
+
+if __name__ == '__main__':
+    main()
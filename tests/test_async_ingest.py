@@ -0,0 +1,59 @@
+import sys
+import time
+import asyncio
+import logging
+import threading
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, '..')
+from utils.async_ingest import copy_text, ingest
+sys.path.remove('..')
+
+class TestAsyncIngest(unittest.TestCase):
+    """Carries out unittests for COPY payloads & the bounded, dependency-ordered streaming ingest."""
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def test_copy_text(self):
+        """Tests NULLs, booleans, integral floats (for integer columns) & special characters in COPY text format."""
+
+        rows = [(1, None, True, 12.0, 0.5, 'a\tb\\c', datetime(2020, 1, 2, 3, 4, 5))]
+        self.assertEqual(copy_text(rows), '1\t\\N\ttrue\t12\t0.5\ta\\tb\\\\c\t2020-01-02 03:04:05\n')
+
+    def test_ingest(self):
+        """Tests chunks are written in order after their parents, with parsing held back by the bounded queue."""
+
+        lock, state = threading.Lock(), {'parsed': 0, 'written': 0, 'ahead': 0}
+        written, order = {'player': [], 'player_team': []}, []
+
+        def chunks(table, count):
+            for i in range(count):
+                with lock:
+                    state['parsed'] += 1
+                    state['ahead'] = max(state['ahead'], state['parsed'] - state['written'])
+                yield [(table, i)] * 10
+
+        def write(table, chunk):
+            time.sleep(0.01)
+            with lock:
+                state['written'] += 1
+                written[table].append(chunk[0][1])
+                order.append(table)
+            return len(chunk)
+
+        tables = {'player_team': (chunks('player_team', 3), lambda chunk: write('player_team', chunk)),
+                  'player': (chunks('player', 20), lambda chunk: write('player', chunk))}
+        results = asyncio.run(ingest(tables, {'player_team': ('player', 'team')}, writers=2, consumers=2,
+                                     queue_chunks=2))
+
+        self.assertEqual({table: rows for table, (rows, _) in results.items()}, {'player': 200, 'player_team': 30})
+        self.assertEqual(sorted(written['player']), list(range(20)))
+        self.assertEqual(order, ['player'] * 20 + ['player_team'] * 3)
+        # Parsing never runs further ahead than the queue, the chunk being queued & those being written
+        self.assertLessEqual(state['ahead'], 2 + 1 + 2)
+        self.assertEqual(state['written'], 23)
+
+if __name__ == '__main__':
+    unittest.main()
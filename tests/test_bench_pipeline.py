@@ -0,0 +1,48 @@
+import sys
+import logging
+import unittest
+
+sys.path.insert(0, '..')
+from benchmarks.bench_pipeline import find_regressions, run_stage
+sys.path.remove('..')
+
+class TestBenchPipeline(unittest.TestCase):
+    """Carries out unittests for the stage timing & regression tracking of the benchmark suite."""
+
+    def setUp(self):
+        """Set up a baseline of two stages at the small scale."""
+        logging.disable(logging.CRITICAL)
+        self.baseline = {'results': [
+            {'stage': 'player_statistic', 'scale': 'small', 'seconds': 1.0, 'peak_mb': 20.0},
+            {'stage': 'dates_parser', 'scale': 'small', 'seconds': 0.001, 'peak_mb': 0.4}
+        ]}
+
+    def test_run_stage(self):
+        """Tests every timed run gets freshly prepared input & rows/sec follows the best time."""
+
+        prepared = []
+        result = run_stage(lambda: prepared.append(1) or list(range(100000, 0, -1)), sorted, 100000, repeat=2)
+        self.assertEqual(len(prepared), 3)
+        self.assertEqual(result['rows'], 100000)
+        self.assertGreater(result['peak_mb'], 0)
+        self.assertAlmostEqual(result['rows_per_sec'], 100000 / result['seconds'], delta=result['rows_per_sec'] / 100)
+
+    def test_find_regressions(self):
+        """Tests slow-downs & memory growth beyond the tolerance are flagged, but not noise or unknown stages."""
+
+        results = [
+            {'stage': 'player_statistic', 'scale': 'small', 'seconds': 1.2, 'peak_mb': 20.5},
+            {'stage': 'dates_parser', 'scale': 'small', 'seconds': 0.003, 'peak_mb': 0.4},
+            {'stage': 'player_statistic', 'scale': 'large', 'seconds': 60.0, 'peak_mb': 900.0}
+        ]
+        self.assertEqual(find_regressions(results, self.baseline), [])
+
+        results[0].update(seconds=1.5, peak_mb=40.0)
+        regressions = find_regressions(results, self.baseline)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('player_statistic [small]: seconds 1.0s -> 1.5s (x1.50)'))
+        self.assertEqual(find_regressions(results, self.baseline, tolerance=1.0), [])
+        self.assertEqual(find_regressions(results, {}), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,6 +12,8 @@ from cleaners.generate_player_position import PositionCleanser
 from cleaners.generate_player_team import PlayerTeamCleanser
 from cleaners.generate_fixture import GamesCleanser
 from cleaners.generate_player_statistic import PlayerStatsCleanser
+from cleaners.generate_player_season_aggregate import SeasonAggregator
+from cleaners.generate_availability_timeline import AvailabilityTimeline
 from cleaners.comprehensive_compiler import Compiler
 sys.path.remove('..')
 
@@ -201,6 +203,35 @@ class TestCleaners(unittest.TestCase):
         ret_win_bool = output_df.away_team_win.values.tolist()
         self.assertEqual(ret_win_bool, [True for i in range(8)])
 
+    def test_generate_fixture_dates_parser(self):
+        """Tests that games are classified against their own season's calendar dates (not any other season's)."""
+
+        season_calendar = pd.DataFrame({
+            'season': [2019, 2018],
+            'regular_season_start': pd.to_datetime(['2019-10-22', '2018-10-16']),
+            'all_star_break': pd.to_datetime(['2020-02-16', '2019-02-17']),
+            'regular_season_end': pd.to_datetime(['2020-08-14', '2019-04-10'])
+        })
+        games_df = pd.DataFrame({
+            'game_date_est': pd.to_datetime(['2019-05-01', '2019-10-01', '2019-10-22', '2020-03-11',
+                                             '2020-08-15', '2019-01-07']),
+            'season': [2018, 2019, 2019, 2019, 2019, 2020]
+        })
+        test_cleaner = GamesCleanser(2018, None, season_calendar)
+        output_df = test_cleaner.dates_parser(games_df)
+
+        # 2018 playoff game falls within 2019 calendar dates range, but must still be classified by the 2018 calendar
+        ret_game_type = output_df.game_type.values.tolist()
+        self.assertEqual(ret_game_type, ['post-season', 'pre-season', 'regular-season', 'regular-season',
+                                         'post-season', None])
+        ret_phase = output_df.season_phase.values.tolist()
+        self.assertEqual(ret_phase, ['na', 'na', 'before-asb', 'after-asb', 'na', 'na'])
+
+        # An empty calendar can't classify any game
+        test_cleaner = GamesCleanser(2018, None, season_calendar.iloc[:0])
+        with self.assertRaisesRegex(ValueError, 'season calendar is empty'):
+            test_cleaner.dates_parser(games_df)
+
     def test_generate_player_statistic(self):
         """Set up appropriate dataframes needed to instantiate cleaner object & test the cleaning methods."""
 
@@ -251,6 +282,85 @@ class TestCleaners(unittest.TestCase):
         ret_player_id = output_df.player_id.values.tolist()
         self.assertEqual(ret_player_id, [5, 6, 7, 8])
 
+    def test_generate_player_season_aggregate(self):
+        """Set up processed player statistics, aggregate them in two batches & test the season aggregates."""
+
+        # SeasonAggregator requires dataframes in the format of the processed files: player_statistic.csv
+        statistic_df = pd.DataFrame({
+            'player_id': [1, 1, 1, 1, 2, 1],
+            'fixture_id': [18200001, 18200002, 18200003, 18400001, 18200001, 19200001],
+            'seconds_played': [1800, 2160, 0, 2000, 600, 1000],
+            'points': [10, 20, None, 40, 3, 7],
+            'field_goals_made': [4, 8, None, 15, 1, 3], 'field_goals_attempted': [10, 10, None, 30, 4, 6],
+            'offensive_rebounds': [1, 2, None, 3, 0, 0], 'defensive_rebounds': [2, 4, None, 6, 1, 1]
+        })
+        test_aggregator = SeasonAggregator()
+        test_aggregator.update(statistic_df.iloc[[0]])
+        test_aggregator.update(statistic_df)  # Late rows of an aggregated fixture count, aggregated rows don't
+        test_aggregator.update(statistic_df.assign(points=100))  # Corrected rows of aggregated pairs are dropped
+
+        # Test the O(1) look-up of a player's season (post-season & unplayed games excluded)
+        ret_season = test_aggregator.get(1, 2018)
+        self.assertEqual(ret_season['games'], 2)
+        self.assertEqual(ret_season['minutes'], 66)
+        self.assertEqual(ret_season['points'], 30)
+        self.assertEqual(ret_season['points_per_game'], 15)
+        self.assertEqual(ret_season['points_per_36'], 16.36)
+        self.assertEqual(ret_season['rebounds_per_game'], 4.5)
+        self.assertEqual(ret_season['points_var'], 50)
+        self.assertEqual(ret_season['fg%'], 60)
+        self.assertIsNone(test_aggregator.get(3, 2018))
+
+        # Test the aggregates table contains each player-season
+        output_df = test_aggregator.to_frame()
+        self.assertEqual(output_df[['player_id', 'season']].values.tolist(), [[1, 2018], [1, 2019], [2, 2018]])
+        self.assertEqual(output_df.games.values.tolist(), [2, 1, 1])
+
+    def test_generate_availability_timeline(self):
+        """Set up processed player statistics & fixtures, build timelines in two batches & test the queries."""
+
+        # AvailabilityTimeline requires dataframes in the format of the processed files: player_statistic & fixture
+        fixture_df = pd.DataFrame({
+            'fixture_id': [18200001 + i for i in range(8)],
+            'played_on': ['2018-11-01', '2018-11-03', '2018-11-05', '2018-11-07', '2018-11-09', '2018-11-11',
+                          '2018-11-13', '2018-11-15']
+        })
+        statistic_df = pd.DataFrame({
+            'player_id': [1] * 8 + [2],
+            'fixture_id': [18200001 + i for i in range(8)] + [18200001],
+            'player_status': ['N/A', 'N/A', 'INJ', 'INJ', 'INJ', 'N/A', 'DNP-REST', 'INJ', 'N/A'],
+            'seconds_played': [1800, 1700, 0, 0, 0, 1500, 0, 0, 900]
+        })
+        test_timeline = AvailabilityTimeline()
+        test_timeline.update(statistic_df[statistic_df['fixture_id'] >= 18200005], fixture_df)
+        test_timeline.update(statistic_df, fixture_df)  # Earlier fixtures are merged in chronological order
+
+        # Test the run-length encoding of player 1 (played x2, INJ x3, played, DNP-REST, INJ)
+        output_df = test_timeline.to_frame()
+        ret_runs = output_df[output_df.player_id == 1][['status', 'games']].values.tolist()
+        self.assertEqual(ret_runs, [['PLAYED', 2], ['INJ', 3], ['PLAYED', 1], ['DNP-REST', 1], ['INJ', 1]])
+
+        # Test interval queries (partial runs are counted game by game)
+        ret_games = test_timeline.games_by_status(1, '2018-11-04', '2018-11-13')
+        self.assertEqual((ret_games['INJ'], ret_games['PLAYED'], ret_games['DNP-REST']), (3, 1, 1))
+        self.assertEqual(test_timeline.games_missed(1, days=30), 4)
+        self.assertEqual(test_timeline.games_missed(1, days=4, as_of='2018-11-09'), 2)
+
+        # Test the ongoing absence (status, games missed, first day missed)
+        self.assertEqual(test_timeline.current_absence(1)[:2], ('INJ', 1))
+        ret_absence = test_timeline.current_absence(1, as_of='2018-11-10')
+        self.assertEqual(ret_absence, ('INJ', 3, np.datetime64('2018-11-05')))
+        self.assertIsNone(test_timeline.current_absence(2))
+        self.assertIsNone(test_timeline.current_absence(3))
+
+        # Late rows of an already listed fixture are added, re-fed rows of a listed player & fixture are not
+        test_timeline = AvailabilityTimeline()
+        test_timeline.update(statistic_df.iloc[[0]], fixture_df)
+        test_timeline.update(statistic_df.iloc[[0, 8]].assign(player_status='INJ', seconds_played=0), fixture_df)
+        self.assertEqual(sorted(test_timeline.timelines), [1, 2])
+        self.assertEqual(test_timeline.games_by_status(1)['PLAYED'], 1)
+        self.assertEqual(test_timeline.games_by_status(2)['INJ'], 1)
+
     def test_comprehensive_compiler(self):
         """Set up appropriate dataframes needed to instantiate cleaner object & test the cleaning methods."""
 
@@ -299,6 +409,42 @@ class TestCleaners(unittest.TestCase):
         ret_3pt = output_df['3pt%'].values.tolist()
         self.assertEqual(ret_3pt, [25, 0])
 
+    def test_comprehensive_compiler_lookups(self):
+        """Tests that ID lookups leave the inputs untouched, keep only stats rows & emit sorted, typed columns."""
+
+        intermediate_df = pd.DataFrame({'player_id': [1, 2, 3], 'Name': ['A B', 'C D', 'E F']})
+        fixture_df = pd.DataFrame({
+            'fixture_id': [18200002, 18200001, 18200001],  # Duplicated fixture rows shouldn't duplicate stats rows
+            'played_on': pd.to_datetime(['2018-12-02', '2018-12-01', '2018-12-01'])
+        })
+        statistic_df = pd.DataFrame({
+            'fixture_id': [18200002, 18200001, 18200002], 'player_id': [2, 1, 1],
+            'player_status': ['N/A', 'INJ', 'N/A'], 'is_starter': [True, False, True],
+            'seconds_played': [600, 0, 900], 'points': [10, None, 4]
+        })
+        for col in ['threes_attempted', 'threes_made', 'field_goals_attempted', 'field_goals_made',
+                    'free_throws_attempted', 'free_throws_made', 'offensive_rebounds', 'defensive_rebounds',
+                    'assists', 'steals', 'blocks', 'turnovers']:
+            statistic_df[col] = [1, None, 2]
+        input_cols = statistic_df.columns.values.tolist()
+
+        test_compiler = Compiler(statistic_df, fixture_df, intermediate_df)
+        test_compiler.compile_data()
+        test_compiler.clean_compiled_data()
+        output_df = test_compiler.comprehensive_player_statistic
+
+        # Test to check the processed statistics weren't modified & only its rows are kept (no unplayed player rows)
+        self.assertEqual(statistic_df.columns.values.tolist(), input_cols)
+        self.assertEqual(output_df.fixture_id.values.tolist(), [18200001, 18200002, 18200002])
+        self.assertEqual(output_df.player_name.values.tolist(), ['A B', 'C D', 'A B'])
+        self.assertEqual(output_df.played_on.dt.day.values.tolist(), [1, 2, 2])
+
+        # Test to check the output columns are compactly typed
+        self.assertEqual(output_df.player_id.dtype, np.int32)
+        self.assertEqual(output_df.fixture_id.dtype, np.int32)
+        self.assertEqual(output_df.points.dtype, np.float32)
+        self.assertEqual(output_df.player_status.dtype, 'category')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,56 @@
+import sys
+import logging
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, '..')
+from consensus_rankings import RankingsAggregator
+from utils.player_registry import PlayerRegistry
+sys.path.remove('..')
+
+class TestConsensusRankings(unittest.TestCase):
+    """Carries out unittests for the consensus rankings aggregation & incremental source updates."""
+
+    def setUp(self):
+        """Set up a small player registry & two ranking sources."""
+        logging.disable(logging.CRITICAL)
+        self.registry = PlayerRegistry(pd.DataFrame({
+            'player_id': [1, 2, 3, 4],
+            'Name': ['Nikola Jokić', 'Stephen Curry', 'Jaren Jackson Jr.', 'Luka Doncic']
+        }))
+        self.aggregator = RankingsAggregator(self.registry)
+        self.aggregator.update_source('A', pd.Series(['Nikola Jokic', 'Stephen Curry', 'Jaren Jackson', 'Unknown']),
+                                      pd.Series([1, 2, 3, 4]))
+        self.aggregator.update_source('B', pd.Series(['Stephen Curry', 'Nikola Jokic', 'Luka Doncic']),
+                                      pd.Series([1, 2, 3]))
+
+    def test_consensus(self):
+        """Tests mean, median & Borda consensus ranks across sources (unresolved names are dropped)."""
+
+        consensus_df = self.aggregator.consensus().set_index('player_id')
+
+        self.assertEqual(len(consensus_df), 4)
+        self.assertEqual(consensus_df.loc[1, 'player_name'], 'Nikola Jokić')
+        np.testing.assert_array_equal(consensus_df.loc[[1, 2, 3, 4], 'mean_rank'], [1.5, 1.5, 3.0, 3.0])
+        np.testing.assert_array_equal(consensus_df.loc[[1, 2, 3, 4], 'median_rank'], [1.5, 1.5, 3.0, 3.0])
+        np.testing.assert_array_equal(consensus_df.loc[[1, 2, 3, 4], 'borda_points'], [5, 5, 1, 1])
+        np.testing.assert_array_equal(consensus_df.loc[[1, 2, 3, 4], 'sources_ranked'], [2, 2, 1, 1])
+        self.assertEqual(consensus_df.loc[1, 'consensus_borda'], 1)
+
+    def test_update_source(self):
+        """Tests that replacing a source gives the same consensus as building all sources from scratch."""
+
+        self.aggregator.update_source('A', pd.Series(['Luka Doncic', 'Jaren Jackson']), pd.Series([1, 2]))
+        rebuilt = RankingsAggregator(self.registry)
+        rebuilt.update_source('B', pd.Series(['Stephen Curry', 'Nikola Jokic', 'Luka Doncic']), pd.Series([1, 2, 3]))
+        rebuilt.update_source('A', pd.Series(['Luka Doncic', 'Jaren Jackson']), pd.Series([1, 2]))
+
+        updated_df = self.aggregator.consensus().set_index('player_id').sort_index()
+        rebuilt_df = rebuilt.consensus().set_index('player_id').sort_index()
+        cols = ['mean_rank', 'median_rank', 'borda_points', 'sources_ranked', 'consensus_borda']
+        pd.testing.assert_frame_equal(updated_df[cols], rebuilt_df[cols])
+        self.assertEqual(updated_df.loc[4, 'mean_rank'], 2.0)
+
+if __name__ == '__main__':
+    unittest.main()
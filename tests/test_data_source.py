@@ -0,0 +1,84 @@
+import os
+import sys
+import logging
+import tempfile
+import unittest
+import pandas as pd
+
+sys.path.insert(0, '..')
+from utils.data_source import DataSource, DataFrameSource, CSVSource, ParquetSource, PostgresSource
+from utils.data_source import fixture_range, open_source
+sys.path.remove('..')
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+class TestDataSource(unittest.TestCase):
+    """Carries out unittests for reading column & season projections of the comprehensive data from each backend."""
+
+    def setUp(self):
+        """Set up comprehensive rows over 3 seasons (& a row without a fixture) written to a temporary CSV."""
+        logging.disable(logging.CRITICAL)
+        self.stats_df = pd.DataFrame({
+            'player_id': [1, 2, 1, 2, 3],
+            'fixture_id': [17200001, 17200001, 18100002, 19400003, None],
+            'points': [10, 20, 30, 40, None],
+            'fg%': [50.0, 40.0, None, 60.0, None]
+        })
+        self.path = os.path.join(tempfile.mkdtemp(), 'comprehensive_player_statistic.csv')
+        self.stats_df.to_csv(self.path, index=False)
+
+    def test_dataframe_source(self):
+        """Tests season filters (all phases of a season, rows without fixtures dropped) & column projections."""
+
+        loaded_df = DataFrameSource(self.stats_df).load(['player_id', 'points'], seasons=[2017, 2018])
+        self.assertEqual(loaded_df.columns.tolist(), ['player_id', 'points'])
+        self.assertEqual(loaded_df.points.tolist(), [10, 20, 30])
+        self.assertEqual(len(DataFrameSource(self.stats_df).load()), 5)
+
+    def test_csv_source(self):
+        """Tests the CSV source reads the same projections, chunk by chunk when filtering seasons."""
+
+        loaded_df = CSVSource(self.path, chunk_rows=2).load(['points', 'fg%'], seasons=[2019])
+        self.assertEqual(loaded_df.to_dict('list'), {'points': [40.0], 'fg%': [60.0]})
+        self.assertEqual(CSVSource(self.path).load(['player_id']).player_id.tolist(), [1, 2, 1, 2, 3])
+        with self.assertRaises(FileNotFoundError):
+            CSVSource(self.path + '.missing').load()
+
+    @unittest.skipUnless(HAS_PARQUET, 'pyarrow not installed')
+    def test_parquet_source(self):
+        """Tests the parquet source pushes the season filter down to fixture ID ranges."""
+
+        path = self.path.replace('.csv', '.parquet')
+        ParquetSource.write(self.stats_df, path)
+        loaded_df = ParquetSource(path).load(['player_id'], seasons=[2018, 2019])
+        self.assertEqual(loaded_df.player_id.tolist(), [1, 2])
+
+    def test_postgres_query(self):
+        """Tests the SQL built for the Postgres source (derived columns, escaped % & fixture ID range filters)."""
+
+        sql, params = PostgresSource().query(['player_id', 'fg%'], seasons=[2018])
+        self.assertIn('ps.field_goals_made / NULLIF(ps.field_goals_attempted, 0)', sql)
+        self.assertIn('AS "fg%%"', sql)
+        self.assertEqual(params, [18000000, 19000000])
+        self.assertEqual(fixture_range(2003), (3000000, 4000000))
+        self.assertEqual(PostgresSource().query(['points'])[1], [])
+
+        sql, params = PostgresSource().deviation_query(2, ['points', 'fg%'], seasons=[2018])
+        self.assertIn('ps.points)::numeric - ROUND(AVG((ps.points)::numeric) OVER seasons, 1), 1) AS "points"', sql)
+        self.assertIn('PARTITION BY ps.player_id, ps.fixture_id / 1000000', sql)
+        self.assertIn('ps.fixture_id / 100000 %% 10 = 2', sql)
+        self.assertEqual(params, [2, [2018]])
+
+        with self.assertRaises(ValueError):
+            open_source('excel')
+        self.assertEqual(open_source('csv', self.path).path, self.path)
+        self.assertTrue(open_source('parquet').path.endswith('.parquet'))
+        with self.assertRaises(TypeError):
+            DataSource()
+
+if __name__ == '__main__':
+    unittest.main()
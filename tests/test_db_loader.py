@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+import logging
+import tempfile
+import threading
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, '..')
+from utils.db_loader import shard_labels, run_plan, RejectLog
+sys.path.remove('..')
+
+class TestDBLoader(unittest.TestCase):
+    """Carries out unittests for fixture-range sharding, the dependency-ordered parallel load & the reject log."""
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def test_shard_labels(self):
+        """Tests shards cover contiguous fixture ranges of about equal size, keeping a fixture's rows together."""
+
+        fixture_ids = np.repeat([18200004, 18200001, 18200003, 18200002], 5)
+        labels = shard_labels(fixture_ids, 2)
+        self.assertEqual(labels.tolist(), [1] * 5 + [0] * 5 + [1] * 5 + [0] * 5)
+        self.assertEqual(len(set(shard_labels(np.repeat(18200001, 4), 3).tolist())), 1)
+        self.assertEqual(len(shard_labels([], 3)), 0)
+
+    def test_run_plan(self):
+        """Tests tables start only once their parents finish, while independent tables & shards overlap."""
+
+        events, lock = [], threading.Lock()
+
+        def shard(table):
+            def load():
+                with lock:
+                    events.append(('start', table))
+                time.sleep(0.05)
+                with lock:
+                    events.append(('end', table))
+            return load
+
+        tasks = {'player': [shard('player')], 'team': [shard('team')], 'empty': [],
+                 'player_team': [shard('player_team')], 'player_statistic': [shard('player_statistic')] * 3}
+        parents = {'player_team': ('player', 'team'), 'player_statistic': ('player', 'empty')}
+        timings = run_plan(tasks, parents, workers=4)
+
+        self.assertEqual(set(timings), set(tasks))
+        position = {event: i for i, event in reversed(list(enumerate(events)))}
+        self.assertLess(position[('start', 'team')], position[('end', 'player')])
+        self.assertLess(position[('end', 'player')], position[('start', 'player_statistic')])
+        self.assertLess(position[('end', 'team')], position[('start', 'player_team')])
+        self.assertEqual(events.count(('end', 'player_statistic')), 3)
+
+        with self.assertRaises(ValueError):
+            run_plan({'player_team': [shard('player_team')]}, {'player_team': ('player',)})
+
+    def test_reject_log(self):
+        """Tests failing rows are written with their table & error, and nothing is written without rejects."""
+
+        path = os.path.join(tempfile.mkdtemp(), 'rejects.csv')
+        rejects = RejectLog()
+        rejects.write(path)
+        self.assertFalse(os.path.exists(path))
+
+        rejects.add('player_team', (10, 99), 'violates foreign key constraint\n')
+        rejects.write(path)
+        rejects_df = pd.read_csv(path)
+        self.assertEqual(rejects_df.to_dict('records'),
+                         [{'table': 'player_team', 'error': 'violates foreign key constraint', 'record': '(10, 99)'}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import os
+import sys
+import logging
+import unittest
+
+sys.path.insert(0, '..')
+from utils import db_schema
+from cleaners.generate_player_season_aggregate import AGGREGATE_STATS
+sys.path.remove('..')
+
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+# Local PostgreSQL to run the migrations against, e.g. "dbname=nba3k user=postgres host=localhost"
+TEST_DSN = os.getenv('NBA3K_TEST_DSN')
+
+class RecordingConnection:
+    """DB-API connection stand-in recording executed statements (schema_version answers with the given versions)."""
+
+    def __init__(self, versions=()):
+        self.versions = list(versions)
+        self.statements = []
+        self.commits = 0
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, statement, params=None):
+        self.statements.append(' '.join(statement.split()))
+
+    def fetchall(self):
+        return [(version,) for version in self.versions]
+
+    def fetchone(self):
+        return (True,)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+class TestDBSchema(unittest.TestCase):
+    """Carries out unittests for versioned migrations, deferred indexes & materialized view refreshes."""
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def test_migrations(self):
+        """Tests migrations are ordered & that the aggregates view covers every aggregated stat."""
+
+        versions = [version for version, _, _ in db_schema.migrations()]
+        self.assertEqual(versions, sorted(set(versions)))
+        view_sql = db_schema.migrations()[2][2][0]
+        for stat in AGGREGATE_STATS:
+            self.assertIn(f'AS {stat}', view_sql)
+
+    def test_migrate(self):
+        """Tests only pending migrations run (each recorded in schema_version) up to the target version."""
+
+        connection = RecordingConnection(versions=[1])
+        self.assertEqual(db_schema.migrate(connection, target=2), [2])
+        self.assertTrue(any('FOREIGN KEY (fixture_id)' in statement for statement in connection.statements))
+        self.assertFalse(any('MATERIALIZED VIEW' in statement for statement in connection.statements))
+        self.assertEqual(db_schema.migrate(RecordingConnection(versions=[1, 2, 3])), [])
+
+    def test_idempotent_foreign_keys(self):
+        """Tests every foreign key of migration 2 is skipped when a constraint of the same name already exists."""
+
+        statements = db_schema.migrations()[1][2]
+        self.assertEqual(len(statements), 8)
+        for statement in statements:
+            statement = ' '.join(statement.split())
+            self.assertTrue(statement.startswith('DO $$ BEGIN ALTER TABLE nba3k.'))
+            self.assertIn('EXCEPTION WHEN duplicate_object THEN NULL; END $$', statement)
+
+    def test_indexes_and_views(self):
+        """Tests indexes are dropped/rebuilt by name & populated views are refreshed concurrently."""
+
+        connection = RecordingConnection()
+        db_schema.drop_indexes(connection)
+        db_schema.create_indexes(connection)
+        db_schema.refresh_views(connection)
+        self.assertIn('DROP INDEX IF EXISTS nba3k.player_statistic_player_fixture_idx', connection.statements)
+        self.assertIn('CREATE INDEX IF NOT EXISTS fixture_played_on_idx ON nba3k.fixture (played_on, fixture_id)',
+                      connection.statements)
+        self.assertIn('REFRESH MATERIALIZED VIEW CONCURRENTLY nba3k.player_season_aggregate', connection.statements)
+
+    @unittest.skipUnless(psycopg2 is not None and TEST_DSN, 'needs psycopg2 & a local PostgreSQL (NBA3K_TEST_DSN)')
+    def test_migrate_database(self):
+        """Tests the migrations, index builds & view refreshes (plain, then concurrent) on a throwaway schema."""
+
+        connection = psycopg2.connect(TEST_DSN)
+        try:
+            self.assertEqual(db_schema.migrate(connection, schema='nba3k_test'), [1, 2, 3])
+            self.assertEqual(db_schema.migrate(connection, schema='nba3k_test'), [])
+            db_schema.create_indexes(connection, schema='nba3k_test')
+            db_schema.refresh_views(connection, schema='nba3k_test')
+            db_schema.refresh_views(connection, schema='nba3k_test')
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('DROP SCHEMA IF EXISTS nba3k_test CASCADE')
+            connection.commit()
+            connection.close()
+
+    @unittest.skipUnless(psycopg2 is not None and TEST_DSN, 'needs psycopg2 & a local PostgreSQL (NBA3K_TEST_DSN)')
+    def test_migrate_existing_schema(self):
+        """Tests migrations 1-2 run against tables that already carry the foreign keys (schema built before
+        versioning, so without a schema_version table)."""
+
+        connection = psycopg2.connect(TEST_DSN)
+        try:
+            self.assertEqual(db_schema.migrate(connection, schema='nba3k_test', target=2), [1, 2])
+            with connection.cursor() as cursor:
+                cursor.execute('DROP TABLE nba3k_test.schema_version')
+            connection.commit()
+
+            self.assertEqual(db_schema.migrate(connection, schema='nba3k_test', target=2), [1, 2])
+            with connection.cursor() as cursor:
+                cursor.execute("""SELECT COUNT(*) FROM pg_constraint c JOIN pg_namespace n ON n.oid = c.connamespace
+                                  WHERE n.nspname = 'nba3k_test' AND c.contype = 'f'""")
+                self.assertEqual(cursor.fetchone()[0], 8)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('DROP SCHEMA IF EXISTS nba3k_test CASCADE')
+            connection.commit()
+            connection.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import sys
+import logging
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, '..')
+from draft_simulator import DraftSimulator, draft_batch, score_matchups
+from utils.fantasy_categories import TOTALS
+sys.path.remove('..')
+
+class TestDraftSimulator(unittest.TestCase):
+    """Carries out unittests for the vectorized draft simulation, scoring & reporting."""
+
+    def setUp(self):
+        """Set up a player pool with enough players in every archetype & position for the draft steps."""
+        logging.disable(logging.CRITICAL)
+        positions = ['PG', 'SG', 'SF', 'PF', 'C'] * 3
+        archetypes = ['high-usage'] * 15 + ['guard-wing'] * 15 + ['interior'] * 15
+        rng = np.random.default_rng(0)
+        self.clusters_df = pd.DataFrame({'position': positions * 3, 'archetype': archetypes})
+        for col in TOTALS:
+            self.clusters_df[col] = rng.integers(50, 500, len(self.clusters_df))
+
+    def test_draft_batch(self):
+        """Tests that both rosters share the starting five & contain 10 distinct players from the right pools."""
+
+        simulator = DraftSimulator(self.clusters_df)
+        smalls, bigs = draft_batch(np.random.default_rng(1), simulator.pools, len(self.clusters_df), 200)
+
+        self.assertEqual(smalls.shape, (200, 10))
+        np.testing.assert_array_equal(smalls[:, :5], bigs[:, :5])
+        self.assertTrue(all(len(set(row)) == 15 for row in np.hstack([smalls, bigs[:, 5:]])))
+        self.assertEqual(set(self.clusters_df.archetype.values[smalls[:, 6:]].ravel()), {'guard-wing'})
+        self.assertEqual(set(self.clusters_df.archetype.values[bigs[:, 6:]].ravel()), {'interior'})
+        self.assertNotIn('C', set(self.clusters_df.position.values[bigs[:, 6]]))
+
+    def test_score_matchups(self):
+        """Tests category wins (percentages from made/attempted totals, lower turnovers win, ties win nothing)."""
+
+        stats = np.array([
+            [5, 10, 3, 8, 10, 10, 5, 2, 1, 20, 3],
+            [4, 10, 2, 9, 10, 12, 5, 1, 2, 15, 4]
+        ], dtype=float)
+        ret_wins = score_matchups(stats, np.array([[0]]), np.array([[1]]))
+        self.assertEqual(ret_wins.tolist(), [[True, True, False, False, False, True, False, True, True]])
+
+    def test_simulate(self):
+        """Tests that simulations are reproducible across worker counts & the confidence interval covers the rate."""
+
+        serial, parallel = DraftSimulator(self.clusters_df), DraftSimulator(self.clusters_df)
+        serial.simulate(5000, batch_size=1000, workers=1, seed=42)
+        parallel.simulate(5000, batch_size=1000, workers=2, seed=42)
+        self.assertEqual(serial.wins, parallel.wins)
+
+        p, (low, high), _ = serial.win_rate()
+        self.assertEqual(p, serial.wins / 5000)
+        self.assertTrue(low < p < high)
+
+        with self.assertRaises(ValueError):
+            DraftSimulator(self.clusters_df).win_rate()
+
+if __name__ == '__main__':
+    unittest.main()
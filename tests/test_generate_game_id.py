@@ -0,0 +1,90 @@
+import sys
+import datetime
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, '..')
+from utils import generate_game_id
+sys.path.remove('..')
+
+
+class TestGenerateGameID(unittest.TestCase):
+    """Carries out unittests & randomized round-trip (fuzz) tests for the game-ID codec."""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(2021)
+
+    def test_scalar_conversion(self):
+        """Tests that single values are re-ordered & decoded as expected."""
+
+        self.assertEqual(generate_game_id.raw_to_fixture_id(21700001), 17200001)
+        self.assertEqual(generate_game_id.fixture_to_raw_id(17200001), 21700001)
+        self.assertEqual(generate_game_id.decode_fixture_id(20400123), (2020, 4, 123))
+        self.assertEqual(generate_game_id.encode_fixture_id(2020, 4, 123), 20400123)
+        self.assertTrue(generate_game_id.is_regular_season(18200011))
+        self.assertFalse(generate_game_id.is_regular_season(19400001))
+
+        game_id = generate_game_id.generate_game_id(2017, 2, datetime.date(2017, 10, 17))
+        self.assertEqual(game_id, 17229001)
+        self.assertEqual(generate_game_id.decode_game_id(game_id), (2017, 2, 290, 1))
+
+    def test_column_conversion(self):
+        """Tests that Series input keeps its index & nullable values, and matches the original string reformatting."""
+
+        raw_ids = pd.Series([11800001, 21800001, None, 41900001], index=[3, 5, 7, 9], dtype='Int64')
+        ret_ids = generate_game_id.raw_to_fixture_id(raw_ids)
+        self.assertEqual(ret_ids.index.tolist(), [3, 5, 7, 9])
+        self.assertTrue(ret_ids.isna().tolist()[2])
+        self.assertEqual(ret_ids.dropna().tolist(), [int(str(x)[1:3] + str(x)[0] + str(x)[3:])
+                                                     for x in raw_ids.dropna()])
+
+        dates = pd.Series(pd.to_datetime(['2018-10-16', '2018-10-16', '2018-10-17', '2018-10-16']))
+        ret_ids = generate_game_id.generate_game_id(pd.Series([2018] * 4), pd.Series([2] * 4), dates)
+        self.assertEqual(ret_ids.tolist(), [18228901, 18228902, 18229001, 18228903])
+
+    def test_fixture_id_round_trip(self):
+        """Fuzz tests that encoding, decoding & raw re-ordering are inverses of each other on random IDs."""
+
+        for size in [1, 10, 10000]:
+            seasons = self.rng.integers(2000, 2100, size)
+            phases = self.rng.choice(generate_game_id.PHASES, size)
+            numbers = self.rng.integers(0, 100000, size)
+
+            fixture_ids = generate_game_id.encode_fixture_id(seasons, phases, numbers)
+            ret_seasons, ret_phases, ret_numbers = generate_game_id.decode_fixture_id(fixture_ids)
+            np.testing.assert_array_equal(ret_seasons, seasons)
+            np.testing.assert_array_equal(ret_phases, phases)
+            np.testing.assert_array_equal(ret_numbers, numbers)
+
+            raw_ids = generate_game_id.fixture_to_raw_id(fixture_ids)
+            np.testing.assert_array_equal(generate_game_id.raw_to_fixture_id(raw_ids), fixture_ids)
+
+    def test_game_id_round_trip(self):
+        """Fuzz tests that schedule IDs decode back into the season, phase, day in year & game number they encode."""
+
+        size = 10000
+        seasons = self.rng.integers(2000, 2100, size)
+        phases = self.rng.choice(generate_game_id.PHASES, size)
+        dates = np.datetime64('2000-01-01') + self.rng.integers(0, 365 * 100, size).astype('timedelta64[D]')
+        numbers = self.rng.integers(0, 100, size)
+
+        game_ids = generate_game_id.generate_game_id(seasons, phases, dates, numbers)
+        ret_seasons, ret_phases, ret_days, ret_numbers = generate_game_id.decode_game_id(game_ids)
+        np.testing.assert_array_equal(ret_seasons, seasons)
+        np.testing.assert_array_equal(ret_phases, phases)
+        np.testing.assert_array_equal(ret_days, pd.DatetimeIndex(dates).dayofyear)
+        np.testing.assert_array_equal(ret_numbers, numbers)
+
+    def test_invalid_components(self):
+        """Tests that out-of-range phases & game numbers are rejected."""
+
+        with self.assertRaises(ValueError):
+            generate_game_id.encode_fixture_id(2020, 9, 1)
+        with self.assertRaises(ValueError):
+            generate_game_id.encode_fixture_id([2020, 2020], [2, 2], [1, 100000])
+        with self.assertRaises(ValueError):
+            generate_game_id.generate_game_id(2020, 2, '2021-01-01', 100)
+
+if __name__ == '__main__':
+    unittest.main()
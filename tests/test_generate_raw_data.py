@@ -0,0 +1,90 @@
+import os
+import sys
+import logging
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, '..')
+from utils.generate_raw_data import RawDataGenerator, generate, player_names
+from cleaners.generate_player_statistic import PlayerStatsCleanser
+from cleaners.generate_fixture import GamesCleanser, load_season_calendar
+sys.path.remove('..')
+
+class TestGenerateRawData(unittest.TestCase):
+    """Carries out unittests for the synthetic raw data generator."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up a small synthetic raw data set (2 seasons, 900 players) once, in a temporary directory."""
+        logging.disable(logging.CRITICAL)
+        cls.path = tempfile.mkdtemp()
+        cls.written = generate(cls.path, seasons=2, players=900, first_season=2018, seed=7)
+        cls.games_df = pd.read_csv(os.path.join(cls.path, 'games.csv'), parse_dates=[0])
+        cls.details_df = pd.read_csv(os.path.join(cls.path, 'games_details.csv'))
+
+    def test_reproducible(self):
+        """Tests the same seed writes identical files while another seed does not."""
+
+        other = tempfile.mkdtemp()
+        generate(other, seasons=2, players=900, first_season=2018, seed=7)
+        for name in self.written:
+            with open(os.path.join(self.path, name)) as f, open(os.path.join(other, name)) as g:
+                self.assertEqual(f.read(), g.read(), name)
+        generate(other, seasons=2, players=900, first_season=2018, seed=8)
+        self.assertFalse(self.details_df.equals(pd.read_csv(os.path.join(other, 'games_details.csv'))))
+
+    def test_raw_layout(self):
+        """Tests files hold the raw columns, IDs & row counts the cleaners expect, with scores matching the rows."""
+
+        self.assertEqual(self.written['games.csv'], len(self.games_df))
+        self.assertEqual(self.written['games_details.csv'], len(self.details_df))
+        self.assertEqual(sorted(self.games_df['SEASON'].unique()), [2018, 2019])
+        self.assertTrue(self.games_df['GAME_ID'].astype(str).str.match(r'^[124](18|19)\d{5}$').all())
+        self.assertTrue(self.details_df['GAME_ID'].isin(self.games_df['GAME_ID']).all())
+        self.assertEqual(self.details_df['PLAYER_NAME'].nunique(), self.details_df['PLAYER_ID'].nunique())
+
+        home_points = self.details_df[self.details_df['TEAM_ID'].values == self.details_df['GAME_ID'].map(
+            self.games_df.set_index('GAME_ID')['HOME_TEAM_ID']).values].groupby('GAME_ID')['PTS'].sum()
+        scores = self.games_df.set_index('GAME_ID')
+        self.assertTrue((home_points == scores.loc[home_points.index, 'PTS_home']).all())
+        self.assertFalse((scores['PTS_home'] == scores['PTS_away']).any())
+
+        player_df = pd.read_csv(os.path.join(self.path, 'player_data.csv'))
+        self.assertEqual(player_df.columns.tolist(), ['Name', 'Team', 'Pos', 'Age', 'Draft'])
+        self.assertTrue(player_df['Name'].isin(self.details_df['PLAYER_NAME']).all())
+
+    def test_cleaners_parse_output(self):
+        """Tests playing time, statuses & dates go through the cleaners' conversions without loss."""
+
+        played = self.details_df['MIN'].notna()
+        self.assertTrue(self.details_df.loc[played, 'MIN'].str.contains(':').any())
+        self.assertTrue((~self.details_df.loc[played, 'MIN'].str.contains(':')).any())
+        self.assertTrue(self.details_df.loc[~played, 'COMMENT'].notna().all())
+
+        cleaner = PlayerStatsCleanser(None, self.games_df, self.details_df, None)
+        converted = cleaner.time_played_conversion(self.details_df[['MIN', 'COMMENT']].copy())
+        self.assertEqual(len(converted), len(self.details_df))
+        self.assertTrue((converted.loc[~played, 'seconds_played'] == 0).all())
+        self.assertTrue(converted['seconds_played'].between(0, 2880).all())
+        statuses = set(cleaner.player_status_conversion(converted)['player_status'])
+        self.assertTrue(statuses <= {'N/A', 'DNP-CD', 'DNP-REST', 'NWT', 'SUS', 'DNP-ILL', 'INJ', 'PROTOCOL'})
+
+        calendar_df = load_season_calendar(os.path.join(self.path, 'season_calendar.csv'))
+        games_df = GamesCleanser(2018, self.games_df, calendar_df).dates_parser(
+            self.games_df.rename(columns={'GAME_DATE_EST': 'game_date_est', 'SEASON': 'season'}))
+        phase = self.games_df['GAME_ID'] // 10 ** 7
+        expected = phase.map({1: 'pre-season', 2: 'regular-season', 4: 'post-season'})
+        self.assertTrue((games_df['game_type'] == expected).all())
+
+    def test_limits(self):
+        """Tests unique names & the 2-digit season limit of the raw IDs."""
+
+        names = player_names(5000, np.random.default_rng(0))
+        self.assertEqual(len(set(names)), 5000)
+        with self.assertRaises(ValueError):
+            RawDataGenerator(seasons=10, first_season=2095)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import sys
+import json
+import logging
+import tempfile
+import unittest
+import pandas as pd
+
+sys.path.insert(0, '..')
+from utils import instrumentation
+from utils.instrumentation import count_rows, instrumented, stage, start_report, write_report
+sys.path.remove('..')
+
+@instrumented()
+def main(games_df, players_df):
+    """Stand-in cleaner main: returns a processed dataframe & a set, like the fixture cleaner."""
+    return games_df.head(2), set(players_df['player_id'])
+
+class TestInstrumentation(unittest.TestCase):
+    """Carries out unittests for the per-stage run report."""
+
+    def setUp(self):
+        """Set up a fresh run report tracing memory, & small input dataframes."""
+        logging.disable(logging.CRITICAL)
+        self.report = start_report(trace_memory=True)
+        self.games_df = pd.DataFrame({'fixture_id': range(5)})
+        self.players_df = pd.DataFrame({'player_id': range(3)})
+
+    def tearDown(self):
+        """Restore a default (untraced) run report."""
+        start_report()
+
+    def test_count_rows(self):
+        """Tests rows are counted for dataframes, Series & collections of them only."""
+
+        self.assertEqual(count_rows(self.games_df), 5)
+        self.assertEqual(count_rows([self.games_df, 'path', self.players_df['player_id']]), 8)
+        self.assertIsNone(count_rows((2020, None)))
+
+    def test_instrumented_main(self):
+        """Tests decorated mains are named after their module & record their rows, times & memory."""
+
+        processed_df, _ = main(self.games_df, self.players_df)
+        self.assertEqual(len(processed_df), 2)
+        record = self.report.stages[0]
+        self.assertEqual(record['stage'], __name__.split('.')[-1])
+        self.assertEqual((record['rows_in'], record['rows_out']), (8, 2))
+        self.assertGreaterEqual(record['wall_seconds'], 0)
+        self.assertGreaterEqual(record['cpu_seconds'], 0)
+        self.assertGreaterEqual(record['tracemalloc_peak_bytes'], record['tracemalloc_delta_bytes'])
+        self.assertIsNone(record['error'])
+
+    def test_nested_stages(self):
+        """Tests an enclosing stage keeps the memory peak of the stages it runs, & failures are recorded."""
+
+        with stage('phase', rows_in=10) as outer:
+            with stage('cleaner') as inner:
+                block = bytearray(4 * 2 ** 20)
+                del block
+            outer['rows_out'] = 4
+        self.assertEqual([record['stage'] for record in self.report.stages], ['phase', 'cleaner'])
+        self.assertGreaterEqual(inner['tracemalloc_peak_bytes'], 4 * 2 ** 20)
+        self.assertGreaterEqual(outer['tracemalloc_peak_bytes'], inner['tracemalloc_peak_bytes'])
+        self.assertLess(outer['tracemalloc_delta_bytes'], 2 ** 20)
+        self.assertEqual((outer['rows_in'], outer['rows_out']), (10, 4))
+
+        with self.assertRaises(KeyError):
+            with stage('failing'):
+                {}['missing']
+        self.assertEqual(self.report.stages[-1]['error'], 'KeyError')
+
+    def test_write_report(self):
+        """Tests the report is written as JSON, or Prometheus text for .prom files."""
+
+        main(self.games_df, self.players_df)
+        path = tempfile.mkdtemp()
+        write_report(os.path.join(path, 'run.json'))
+        with open(os.path.join(path, 'run.json')) as f:
+            self.assertEqual(json.load(f)['stages'], self.report.stages)
+
+        write_report(os.path.join(path, 'run.prom'))
+        with open(os.path.join(path, 'run.prom')) as f:
+            lines = f.read().splitlines()
+        self.assertIn('# TYPE nba3k_stage_wall_seconds gauge', lines)
+        self.assertIn(f'nba3k_stage_rows_out{{stage="{self.report.stages[0]["stage"]}",step="1"}} 2', lines)
+        self.assertEqual(instrumentation.current_report(), self.report)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, '..')
+from utils.kmeans_algorithm import KMeans, fit_many, kmeans_plus_plus
+sys.path.remove('..')
+
+class TestKMeans(unittest.TestCase):
+    """Carries out unittests for the vectorized k-means algorithm (seeding, restarts & reproducibility)."""
+
+    def setUp(self):
+        """Set up three well-separated blobs of 9-dimensional points (like scaled 9-cat stats)."""
+        rng = np.random.default_rng(0)
+        self.features = np.vstack([rng.normal(center, 0.3, (50, 9)) for center in (-3, 0, 3)])
+
+    def test_kmeans_plus_plus(self):
+        """Tests that k-means++ seeds distinct centers drawn from the data points."""
+
+        centers = kmeans_plus_plus(self.features, 3, np.random.default_rng(1))
+        self.assertEqual(centers.shape, (3, 9))
+        self.assertEqual(len(np.unique(centers.round(6), axis=0)), 3)
+        self.assertTrue(all((self.features == center).all(axis=1).any() for center in centers))
+
+    def test_fit(self):
+        """Tests that each blob is recovered as its own cluster."""
+
+        test_kmeans = KMeans(3, n_init=5, seed=123456).fit(self.features)
+        self.assertEqual(sorted(np.bincount(test_kmeans.labels)), [50, 50, 50])
+        for blob in range(3):
+            self.assertEqual(len(set(test_kmeans.labels[blob * 50:(blob + 1) * 50])), 1)
+        np.testing.assert_array_equal(test_kmeans.predict(self.features), test_kmeans.labels)
+
+    def test_fit_many(self):
+        """Tests that results are reproducible across worker counts & inertia decreases with k (elbow analysis)."""
+
+        serial = fit_many(self.features, [1, 2, 3, 4], n_init=4, seed=7, workers=1)
+        parallel = fit_many(self.features, [1, 2, 3, 4], n_init=4, seed=7, workers=2)
+        inertias = [serial[k][2] for k in [1, 2, 3, 4]]
+
+        self.assertEqual(inertias, sorted(inertias, reverse=True))
+        for k in [1, 2, 3, 4]:
+            self.assertAlmostEqual(serial[k][2], parallel[k][2])
+            np.testing.assert_array_equal(serial[k][0], parallel[k][0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import sys
+import logging
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, '..')
+from lineup_optimizer import LineupOptimizer, optimal_lineups, eligibility_matrix, SLOTS
+sys.path.remove('..')
+
+def brute_force(values, eligible):
+    """Best lineup value of one day by trying every bench/slot choice of every player."""
+    def _best(player, free):
+        if player == len(values):
+            return 0
+        best = _best(player + 1, free)
+        if values[player] > 0:
+            for slot in free:
+                if eligible[player, slot]:
+                    best = max(best, values[player] + _best(player + 1, free - {slot}))
+        return best
+    return _best(0, frozenset(range(eligible.shape[1])))
+
+class TestLineupOptimizer(unittest.TestCase):
+    """Carries out unittests for slot eligibility, the batched lineup DP & schedule-based daily lineups."""
+
+    def setUp(self):
+        """Set up positions of 4 players (1 without listed positions)."""
+        logging.disable(logging.CRITICAL)
+        self.player_position_df = pd.DataFrame({
+            'player_id': [1, 2, 3, 1], 'season': [2019, 2020, 2020, 2020],
+            'position_primary': ['C', 'PG', 'SF', 'PG'], 'position_secondary': [None, 'SG', 'PF', None],
+            'position_tertiary': [None, None, 'C', None]
+        })
+
+    def test_eligibility_matrix(self):
+        """Tests slot eligibility from the latest season's positions (UTIL only when positions are unknown)."""
+
+        eligible = eligibility_matrix([1, 2, 3, 4], self.player_position_df)
+        self.assertEqual([SLOTS[i] for i in np.flatnonzero(eligible[0])], ['PG', 'G', 'UTIL'])
+        self.assertEqual([SLOTS[i] for i in np.flatnonzero(eligible[1])], ['PG', 'SG', 'G', 'UTIL'])
+        self.assertEqual([SLOTS[i] for i in np.flatnonzero(eligible[2])], ['SF', 'PF', 'F', 'C', 'UTIL'])
+        self.assertEqual([SLOTS[i] for i in np.flatnonzero(eligible[3])], ['UTIL'])
+
+    def test_optimal_lineups(self):
+        """Tests the batched DP against brute force on random days & that lineups are valid assignments."""
+
+        rng = np.random.default_rng(3)
+        values = np.where(rng.random((6, 9)) < 0.7, rng.random((6, 9)) * 10, 0)
+        eligible = rng.random((9, len(SLOTS))) < 0.3
+        eligible[:, -1] = True
+
+        lineups, totals = optimal_lineups(values, eligible)
+        for day in range(len(values)):
+            self.assertAlmostEqual(totals[day], brute_force(values[day], eligible))
+            started = lineups[day][lineups[day] >= 0]
+            self.assertEqual(len(started), len(set(started)))
+            self.assertTrue(all(eligible[player, slot] for slot, player in enumerate(lineups[day]) if player >= 0))
+            self.assertAlmostEqual(values[day, started].sum(), totals[day])
+
+    def test_optimize(self):
+        """Tests daily lineups from the schedule: only players with a game are started."""
+
+        fixture_df = pd.DataFrame({
+            'home_team_id': [10, 20], 'away_team_id': [30, 30], 'played_on': ['2021-01-04', '2021-01-05'],
+            'game_type': ['regular-season'] * 2
+        })
+        player_team_df = pd.DataFrame({'team_id': [10, 20, 30, 0], 'player_id': [1, 2, 3, 4]})
+        optimizer = LineupOptimizer(fixture_df, player_team_df, self.player_position_df)
+        lineup_df = optimizer.optimize([1, 2, 3, 4], {1: 5.0, 2: 4.0, 3: 3.0, 4: 9.0}, '2021-01-04', '2021-01-06')
+
+        self.assertEqual(len(lineup_df), 3 * len(SLOTS))
+        started = lineup_df.dropna(subset=['player_id']).groupby('day')['player_id'].apply(set)
+        self.assertEqual(started.tolist(), [{1, 3}, {2, 3}])
+        self.assertEqual(lineup_df['value'].sum(), 5 + 3 + 4 + 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import sys
+import logging
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, '..')
+from matchup_projector import MatchupProjector, rates_from_stats, rates_from_totals, round_robin, snake_draft
+from utils.fantasy_categories import TOTALS
+sys.path.remove('..')
+
+class TestMatchupProjector(unittest.TestCase):
+    """Carries out unittests for weekly schedules, roster projections & simulated matchups."""
+
+    def setUp(self):
+        """Set up 3 NBA teams playing over 2 fantasy weeks & per-game rates for 4 players (1 free agent)."""
+        logging.disable(logging.CRITICAL)
+        self.fixture_df = pd.DataFrame({
+            'fixture_id': [18100001, 18200001, 18200002, 18200003, 18200004, 18400001],
+            'home_team_id': [10, 10, 20, 10, 30, 10],
+            'away_team_id': [20, 20, 30, 30, 20, 20],
+            'season': [2018] * 6,
+            # Wednesday 2018-10-17 starts week 1 (from Monday 10-15), Monday 10-22 starts week 2
+            'played_on': ['2018-10-01', '2018-10-17', '2018-10-21', '2018-10-22', '2018-10-24', '2019-05-01'],
+            'game_type': ['pre-season'] + ['regular-season'] * 4 + ['post-season']
+        })
+        self.player_team_df = pd.DataFrame({'team_id': [10, 20, 30, 0], 'player_id': [1, 2, 3, 4]})
+        self.rates_df = rates_from_totals(pd.DataFrame(
+            dict({'player_id': [1, 2, 3, 4], 'games_played': [10] * 4},
+                 **{stat: [10 * (i + 1)] * 4 for i, stat in enumerate(TOTALS)})
+        ))
+        self.projector = MatchupProjector(self.fixture_df, self.player_team_df, self.rates_df, 2018)
+
+    def test_weekly_games(self):
+        """Tests games per team & week (regular season only) & fantasy week numbering."""
+
+        np.testing.assert_array_equal(self.projector.team_games, [[1, 1], [2, 1], [1, 2], [0, 0]])
+        np.testing.assert_array_equal(self.projector.player_games[:, 1], [1, 1, 2, 0])
+        self.assertEqual(self.projector.week_of('2018-10-21'), 1)
+        self.assertEqual(self.projector.week_of('2018-10-22'), 2)
+
+    def test_project(self):
+        """Tests projected roster totals (games x per-game rates) for a week."""
+
+        projection_df = self.projector.project({'A': [1, 4], 'B': [2, 3]}, week=2)
+        self.assertEqual(list(projection_df['games']), [1, 3])
+        self.assertEqual(projection_df.loc['B', 'points'], 3 * TOTALS.index('points') + 3)
+        self.assertEqual(projection_df.loc['A', 'fg%'], 0.5)
+
+        for week in [0, 3]:
+            with self.assertRaisesRegex(ValueError, 'weeks 1 to 2'):
+                self.projector.project({'A': [1, 4]}, week=week)
+        with self.assertRaises(ValueError):
+            self.projector.simulate({'A': [1], 'B': [3]}, [('A', 'B')], week=-1, n_sims=10)
+
+    def test_simulate(self):
+        """Tests simulated matchups: a roster with more games is favored & mirrored matchups are complementary."""
+
+        rosters = {'A': [1], 'B': [3], 'C': [4]}
+        results_df = self.projector.simulate(rosters, [('A', 'B'), ('B', 'A')], week=2, n_sims=2000, seed=0)
+        self.assertLess(results_df.loc[0, 'win'], 0.2)
+        self.assertAlmostEqual(results_df.loc[0, 'win'], results_df.loc[1, 'loss'])
+        np.testing.assert_allclose(results_df[['win', 'tie', 'loss']].sum(axis=1), 1)
+
+        results_df = self.projector.simulate(rosters, [('A', 'C')], week=2, n_sims=100, seed=0)
+        self.assertEqual(results_df.loc[0, 'p_points'], 1)
+
+    def test_helpers(self):
+        """Tests round-robin pairings, snake drafting & per-game rates from game logs."""
+
+        weeks = [round_robin(['A', 'B', 'C', 'D'], week) for week in range(1, 4)]
+        pairs = {frozenset(pair) for week in weeks for pair in week}
+        self.assertEqual(len(pairs), 6)
+        self.assertEqual(len(round_robin(['A', 'B', 'C'], 1)), 1)
+
+        rosters = snake_draft([1, 2, 3, 4, 5, 6], n_teams=3, roster_size=2)
+        self.assertEqual(rosters, {'Team 1': [1, 6], 'Team 2': [2, 5], 'Team 3': [3, 4]})
+
+        stats_df = pd.DataFrame(dict(
+            {'player_id': [1, 1, 1], 'fixture_id': [18200001, 18200002, 18400001], 'seconds_played': [600, 600, 600],
+             'played_on': ['2018-10-17', '2018-10-19', '2019-05-01']},
+            **{stat: [2.0, 4.0, 50.0] for stat in TOTALS}
+        ))
+        rates_df = rates_from_stats(stats_df, 2018)
+        self.assertEqual(rates_df.loc[1, 'points'], 3)
+        self.assertEqual(rates_df.loc[1, 'points_var'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import sys
+import logging
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, '..')
+from player_projections import ProjectionModel, fit_weights, remaining_games, FEATURES
+from utils.fantasy_categories import TOTALS
+sys.path.remove('..')
+
+class TestPlayerProjections(unittest.TestCase):
+    """Carries out unittests for the batched blend weight fit, rest-of-season projections & their caches."""
+
+    def setUp(self):
+        """Set up 2 seasons of 20 daily regular-season games, where 4 players keep steady per-game stats."""
+        logging.disable(logging.CRITICAL)
+        rows = []
+        for season in (2017, 2018):
+            for game in range(1, 21):
+                fixture_id = (season - 2000) * 1000000 + 200000 + game
+                for player_id in range(1, 5):
+                    row = {'player_id': player_id, 'fixture_id': fixture_id, 'player_status': 'N/A',
+                           'is_starter': True, 'seconds_played': 1800}
+                    row.update({stat: float(player_id * (i + 1)) for i, stat in enumerate(TOTALS)})
+                    row['offensive_rebounds'], row['defensive_rebounds'] = row.pop('rebounds') - 1, 1.0
+                    rows.append(row)
+        self.player_statistic_df = pd.DataFrame(rows)
+        # A DNP row, which isn't part of the pool
+        self.player_statistic_df.loc[len(rows)] = dict(rows[-1], player_id=5, seconds_played=0)
+
+        fixture_ids = sorted(self.player_statistic_df['fixture_id'].unique())
+        self.fixture_df = pd.DataFrame({
+            'fixture_id': fixture_ids,
+            'home_team_id': [10] * len(fixture_ids),
+            'away_team_id': [20] * len(fixture_ids),
+            'season': [2000 + fixture_id // 1000000 for fixture_id in fixture_ids],
+            'played_on': [pd.Timestamp(f'{2000 + fixture_id // 1000000}-11-01') +
+                          pd.Timedelta(days=fixture_id % 100 - 1) for fixture_id in fixture_ids],
+            'game_type': ['regular-season'] * len(fixture_ids)
+        })
+        self.cache_path = os.path.join(tempfile.mkdtemp(), 'projection_weights.npz')
+        self.model = ProjectionModel(self.player_statistic_df, self.fixture_df, cache_path=self.cache_path)
+
+    def test_fit_weights(self):
+        """Tests the batched solve recovers each stat's own weights from exactly linear samples."""
+
+        rng = np.random.default_rng(0)
+        features = rng.random((3, 50, len(FEATURES)))
+        features[:, :, 0] = 1
+        weights = rng.random((3, len(FEATURES)))
+        targets = np.einsum('snf,sf->sn', features, weights)
+
+        np.testing.assert_allclose(fit_weights(features, targets, rng.random(50) + 1), weights, atol=1e-4)
+
+    def test_project(self):
+        """Tests steady players are projected at their per-game rates, with implied shooting percentages."""
+
+        projection_df = self.model.project(2018, '2018-11-10')
+        self.assertEqual(projection_df.index.tolist(), [1, 2, 3, 4])
+        self.assertEqual(projection_df['games'].tolist(), [10] * 4)
+        expected = np.arange(1, 5)[:, None] * np.arange(1, len(TOTALS) + 1)
+        np.testing.assert_allclose(projection_df[TOTALS].to_numpy(), expected, rtol=1e-3)
+        np.testing.assert_allclose(projection_df['fg%'], 0.5, rtol=1e-3)
+
+        rates_df = self.model.rates(2018, '2018-11-10')
+        np.testing.assert_array_equal(rates_df['points_var'], rates_df['points'])
+
+        with self.assertRaises(ValueError):
+            self.model.project(2018, '2018-10-01')
+
+    def test_caches(self):
+        """Tests projections are cached per data version & fitted weights are reloaded while the data is unchanged."""
+
+        self.model.fit()
+        projection_df = self.model.project(2018)
+        expected_df = projection_df.copy()
+        projection_df['points'] = -1.0  # Modified by the caller
+        pd.testing.assert_frame_equal(self.model.project(2018), expected_df)
+        self.assertEqual(len(self.model.cache), 1)
+
+        reloaded = ProjectionModel(self.player_statistic_df, self.fixture_df, cache_path=self.cache_path)
+        self.assertEqual(reloaded.version, self.model.version)
+        reloaded.training_set = None
+        np.testing.assert_array_equal(reloaded.fit(), self.model.weights)
+
+        changed_df = self.player_statistic_df.copy()
+        changed_df.loc[0, 'points'] += 1
+        self.assertNotEqual(ProjectionModel(changed_df, self.fixture_df, cache_path=None).version, self.model.version)
+
+    def test_remaining_games(self):
+        """Tests games left after a date come from each player's team schedule (free agents play none)."""
+
+        player_team_df = pd.DataFrame({'team_id': [10, 20, 0], 'player_id': [1, 2, 3]})
+        games_left = remaining_games(self.fixture_df, player_team_df, 2018, '2018-11-15')
+        self.assertEqual(games_left.to_dict(), {1: 5, 2: 5, 3: 0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import sys
+import logging
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, '..')
+from player_similarity import SimilarityIndex, FEATURES
+from utils.player_registry import PlayerRegistry
+sys.path.remove('..')
+
+class TestPlayerSimilarity(unittest.TestCase):
+    """Carries out unittests for the similarity index (updates, metrics, name look-ups & self exclusion)."""
+
+    def setUp(self):
+        """Set up season aggregates of 4 players: a scorer, his near copy, a rebounder & a low-minutes player."""
+        logging.disable(logging.CRITICAL)
+        base = dict(zip(FEATURES, [20, 5, 5, 1, 0.5, 2, 2, 15, 5, 45, 80]))
+        self.aggregate_df = pd.DataFrame([
+            dict(base, player_id=1, season=2018, minutes=2000),
+            dict(base, player_id=1, season=2019, minutes=2000, points_per_36=21),
+            dict(base, player_id=2, season=2019, minutes=1800, points_per_36=19, assists_per_36=5.5),
+            dict(base, player_id=3, season=2019, minutes=1500, points_per_36=10, rebounds_per_36=14,
+                 blocks_per_36=2.5, **{'fg%': 60, 'ft%': np.nan}),
+            dict(base, player_id=4, season=2019, minutes=100)
+        ])
+        self.registry = PlayerRegistry(pd.DataFrame({'player_id': [1, 2, 3, 4],
+                                                     'Name': ['Jrue Holiday', 'B B', 'C C', 'D D']}))
+        self.index = SimilarityIndex(self.registry, min_minutes=500)
+        self.index.update(self.aggregate_df)
+
+    def test_similar(self):
+        """Tests cosine & euclidean top-K (closest first), name look-ups & exclusion of the player's seasons."""
+
+        self.assertEqual(len(self.index.keys), 4)
+        self.assertEqual(self.index.features.dtype, np.float32)
+
+        similar_df = self.index.similar('jrue holiday', k=5)
+        self.assertEqual(similar_df['player_id'].tolist(), [2, 3])
+        self.assertEqual(similar_df.loc[0, 'player_name'], 'B B')
+        self.assertGreater(similar_df.loc[0, 'cosine'], similar_df.loc[1, 'cosine'])
+
+        similar_df = self.index.similar(1, season=2019, k=2, metric='euclidean', exclude_player=False)
+        self.assertEqual(list(zip(similar_df['player_id'], similar_df['season'])), [(1, 2018), (2, 2019)])
+        self.assertLess(similar_df.loc[0, 'euclidean'], similar_df.loc[1, 'euclidean'])
+
+        self.assertRaises(KeyError, self.index.similar, 4)
+        self.assertRaises(KeyError, self.index.similar, 'Nobody')
+        self.assertRaises(ValueError, self.index.similar, 1, metric='manhattan')
+
+    def test_update(self):
+        """Tests that updated seasons overwrite their row & new seasons are appended (search reflects both)."""
+
+        changed_df = self.aggregate_df.iloc[[3]].assign(points_per_36=19, rebounds_per_36=5, blocks_per_36=0.5,
+                                                        **{'fg%': 45, 'ft%': 80})
+        self.index.update(pd.concat([changed_df, self.aggregate_df.iloc[[4]].assign(minutes=900)]))
+        self.assertEqual(len(self.index.keys), 5)
+        self.assertEqual(self.index.features[self.index.index[(3, 2019)], 0], 19)
+        self.assertIn(3, self.index.similar(1, k=2, metric='euclidean')['player_id'].tolist())
+
+        # A re-fed season dropping below min_minutes is evicted (rows compacted, the player's other seasons kept)
+        self.index.update(self.aggregate_df.iloc[[0]].assign(minutes=400))
+        self.assertEqual(self.index.keys, [(1, 2019), (2, 2019), (3, 2019), (4, 2019)])
+        self.assertEqual(self.index.features.shape, (4, len(FEATURES)))
+        self.assertEqual(self.index.features[self.index.index[(3, 2019)], 0], 19)
+        self.assertEqual(self.index.player_seasons[1], {2019})
+        self.assertRaises(KeyError, self.index.similar, 1, season=2018)
+        self.assertNotIn(2018, self.index.similar(2, k=5)['season'].tolist())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import sys
+import logging
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, '..')
+from player_valuation import LeagueValuation, z_scores, punt_variant, RAW_STATS, PUNT_MASKS
+from utils.fantasy_categories import CATEGORIES
+sys.path.remove('..')
+
+class TestPlayerValuation(unittest.TestCase):
+    """Carries out unittests for the 9-cat z-scores, punt variants & valuation filters/caching."""
+
+    def setUp(self):
+        """Set up comprehensive stats for 3 players over 4 regular-season games & 1 playoff game."""
+        logging.disable(logging.CRITICAL)
+        rows = []
+        for game in range(5):
+            fixture_id = 18200001 + game if game < 4 else 18400001
+            for player_id in (1, 2, 3):
+                row = {stat: float(player_id + game) for stat in RAW_STATS}
+                row['field_goals_attempted'] = row['field_goals_made'] * player_id
+                row['free_throws_attempted'] = row['free_throws_made'] * 2
+                rows.append(dict(row, player_id=player_id, player_name=f'Player {player_id}', fixture_id=fixture_id,
+                                 played_on=f'2018-11-0{game + 1}', seconds_played=0 if player_id == 3 and game == 0
+                                 else 1200))
+        self.stats_df = pd.DataFrame(rows)
+
+    def test_z_scores(self):
+        """Tests z-scores: zero mean, negated turnovers & FG% valued by volume impact rather than raw percentage."""
+
+        games = np.array([1.0, 1.0, 1.0])
+        totals = np.zeros((3, len(RAW_STATS)))
+        totals[:, RAW_STATS.index('points')] = [10, 20, 30]
+        totals[:, RAW_STATS.index('turnovers')] = [1, 2, 3]
+        totals[:, RAW_STATS.index('field_goals_made')] = [1, 14, 5]
+        totals[:, RAW_STATS.index('field_goals_attempted')] = [1, 20, 10]
+
+        z = z_scores(games, totals)
+
+        np.testing.assert_allclose(z.mean(axis=0), 0, atol=1e-12)
+        self.assertLess(z[2, CATEGORIES.index('turnovers')], z[0, CATEGORIES.index('turnovers')])
+        # 100% on 1 shot is worth less than 70% on 20 shots when the pool shoots 20/31
+        self.assertLess(z[0, CATEGORIES.index('fg%')], z[1, CATEGORIES.index('fg%')])
+
+    def test_punt_variants(self):
+        """Tests punt variant indexing & that punt values equal the sum of the remaining categories' z-scores."""
+
+        self.assertEqual(punt_variant(), 0)
+        self.assertEqual(punt_variant(['ft%', 'turnovers']), 4 + 256)
+        self.assertRaises(ValueError, punt_variant, ['minutes'])
+
+        valuation = LeagueValuation(self.stats_df).valuate(2018)
+        z = valuation['z']
+        np.testing.assert_allclose(valuation['punt_values'][:, 0], z.sum(axis=1))
+        np.testing.assert_allclose(valuation['punt_values'][:, punt_variant(['ft%', 'turnovers'])],
+                                   z.sum(axis=1) - z[:, CATEGORIES.index('ft%')] - z[:, CATEGORIES.index('turnovers')])
+        self.assertEqual(valuation['punt_values'].shape, (3, len(PUNT_MASKS)))
+
+    def test_filters_and_cache(self):
+        """Tests that playoffs & DNPs are excluded, date/last-N windows apply & valuations are cached."""
+
+        valuation = LeagueValuation(self.stats_df)
+        player_ids, games, totals = valuation.window_totals(2018)
+        np.testing.assert_array_equal(player_ids, [1, 2, 3])
+        np.testing.assert_array_equal(games, [4, 4, 3])
+        self.assertEqual(totals[0, RAW_STATS.index('points')], 1 + 2 + 3 + 4)
+
+        _, games, totals = valuation.window_totals(2018, last_n=2)
+        np.testing.assert_array_equal(games, [2, 2, 2])
+        self.assertEqual(totals[0, RAW_STATS.index('points')], 3 + 4)
+
+        _, games, _ = valuation.window_totals(2018, start='2018-11-02', end='2018-11-03')
+        np.testing.assert_array_equal(games, [2, 2, 2])
+        self.assertEqual(len(valuation.window_totals(2018, phase='after-asb')[0]), 0)
+
+        cached = valuation.valuate(2018, last_n=2)
+        cached['z'] = None  # Replaced by the caller
+        self.assertIs(valuation.valuate(2018, last_n=2)['punt_values'], cached['punt_values'])
+        self.assertIsNotNone(valuation.valuate(2018, last_n=2)['z'])
+        with self.assertRaises(ValueError):
+            cached['punt_values'][0, 0] = 0
+        self.assertEqual(len(valuation.valuate(2018, min_games=4)['player_ids']), 2)
+        self.assertRaises(ValueError, valuation.valuate, 2017)
+
+        rankings_df = valuation.rankings(2018, punts=['turnovers'])
+        self.assertEqual(list(rankings_df['rank']), [1, 2, 3])
+        self.assertEqual(rankings_df.loc[0, 'player_id'], 3)
+
+if __name__ == '__main__':
+    unittest.main()
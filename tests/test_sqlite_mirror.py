@@ -0,0 +1,64 @@
+import os
+import sys
+import logging
+import tempfile
+import unittest
+import pandas as pd
+
+sys.path.insert(0, '..')
+from utils.sqlite_mirror import build_mirror
+from utils.data_source import SQLiteSource, open_source
+from utils import db_schema
+from cleaners.comprehensive_compiler import COMPREHENSIVE_COLUMNS
+sys.path.remove('..')
+
+class TestSQLiteMirror(unittest.TestCase):
+    """Carries out unittests for building the SQLite mirror & reading it through the SQLite data source."""
+
+    def setUp(self):
+        """Set up processed player, fixture (with a duplicate) & player_statistic tables over 2 seasons."""
+        logging.disable(logging.CRITICAL)
+        self.path = os.path.join(tempfile.mkdtemp(), 'nba3k.sqlite')
+        player_df = pd.DataFrame({'player_id': [1, 2], 'first_name': ['A', 'C'], 'last_name': ['B', 'D']})
+        fixture_df = pd.DataFrame({'fixture_id': [18200001, 18200001, 19200001],
+                                   'played_on': ['2018-10-17', '2018-10-17', '2019-10-22']})
+        player_statistic_df = pd.DataFrame({
+            'player_id': [1, 2, 1], 'fixture_id': [18200001, 18200001, 19200001],
+            'player_status': ['N/A'] * 3, 'is_starter': [True, False, True], 'seconds_played': [1800, 0, 2000]
+        })
+        for i, stat in enumerate(['points', 'offensive_rebounds', 'defensive_rebounds', 'assists', 'steals', 'blocks',
+                                  'field_goals_made', 'field_goals_attempted', 'free_throws_made',
+                                  'free_throws_attempted', 'threes_made', 'threes_attempted', 'turnovers']):
+            player_statistic_df[stat] = [i + 1.0, 0.0, i + 2.0]
+        build_mirror(self.path, {'player': player_df, 'fixture': fixture_df, 'player_statistic': player_statistic_df,
+                                 'team': None})
+
+    def test_build_mirror(self):
+        """Tests tables are de-duplicated on their keys & indexed like production, next to the comprehensive view."""
+
+        source = SQLiteSource(self.path)
+        self.assertEqual(source.read('SELECT COUNT(*) AS n FROM fixture')['n'].tolist(), [2])
+        indexes = set(source.read("SELECT name FROM sqlite_master WHERE type = 'index'")['name'])
+        self.assertIn('player_statistic_player_fixture_idx', indexes)
+        self.assertIn('fixture_key', indexes)
+        self.assertEqual({name for name, table, _ in db_schema.INDEXES if table != 'player_team'} - indexes, set())
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+
+    def test_load(self):
+        """Tests the comprehensive view's columns & derived values, read by season through the data source."""
+
+        source = open_source('sqlite', self.path)
+        stats_df = source.load()
+        self.assertEqual(stats_df.columns.tolist(), COMPREHENSIVE_COLUMNS)
+        self.assertEqual(stats_df.player_name.tolist(), ['A B', 'C D', 'A B'])
+        self.assertEqual(stats_df.rebounds.tolist(), [5.0, 0.0, 7.0])
+        self.assertAlmostEqual(stats_df['fg%'].iloc[0], round(100 * 7 / 8, 2))
+
+        season_df = source.load(['player_id', 'played_on', 'points'], seasons=[2019])
+        self.assertEqual(season_df.to_dict('records'), [{'player_id': 1, 'played_on': '2019-10-22', 'points': 2.0}])
+
+        with self.assertRaises(FileNotFoundError):
+            SQLiteSource(self.path + '.missing').load()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,22 @@
+import os
 import sys
 import logging
 import unittest
 import pandas as pd
 
 sys.path.insert(0, '..')
-from hot_streak_finder import StreakFinder
+from hot_streak_finder import StreakFinder, COLUMNS
+from utils.data_source import DataFrameSource, PostgresSource
 sys.path.remove('..')
 
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+# Local PostgreSQL to run the database streak mode against, e.g. "dbname=nba3k user=postgres host=localhost"
+TEST_DSN = os.getenv('NBA3K_TEST_DSN')
+
 class TestStreakFinder(unittest.TestCase):
     """Carries out unittests for StreakFinder primary methods (load csv & input validation not tested)."""
 
@@ -64,5 +74,61 @@ class TestStreakFinder(unittest.TestCase):
         ret_dates = test_finder.dates
         self.assertEqual(ret_dates, [8, 10])
 
+    def test_lazy_loading(self):
+        """Tests the data source is only read on first use, for the needed columns & seasons."""
+
+        test_df = pd.DataFrame(dict(
+            {col: [0, 0] for col in COLUMNS}, player_id=[2, 3], fixture_id=[18200001, 19200001], extra=[1, 1]
+        ))
+        source = DataFrameSource(test_df)
+        loads = []
+        source.load = lambda columns, seasons, load=source.load: loads.append(seasons) or load(columns, seasons)
+
+        test_finder = StreakFinder(source, seasons=[2019])
+        self.assertEqual(loads, [])
+        self.assertEqual(test_finder.comprehensive_stats_df.player_id.tolist(), [3])
+        self.assertEqual(test_finder.comprehensive_stats_df.columns.tolist(), COLUMNS)
+        self.assertEqual(loads, [[2019]])
+
+@unittest.skipUnless(psycopg2 is not None and TEST_DSN, 'needs psycopg2 & a local PostgreSQL (NBA3K_TEST_DSN)')
+class TestDatabaseStreakFinder(unittest.TestCase):
+    """Carries out unittests for the SQL window-function streak mode against a throwaway schema."""
+
+    def setUp(self):
+        """Set up the player_statistic, fixture & player tables with the records of test_execute_MSSDAC."""
+        logging.disable(logging.CRITICAL)
+        self.connection = psycopg2.connect(TEST_DSN)
+        points = [12, 10, 17, 3, None, 8, 8, 21, 8, 16, 12]
+        with self.connection.cursor() as cursor:
+            cursor.execute('DROP SCHEMA IF EXISTS nba3k_test CASCADE; CREATE SCHEMA nba3k_test')
+            cursor.execute('CREATE TABLE nba3k_test.player (player_id int, first_name text, last_name text)')
+            cursor.execute('CREATE TABLE nba3k_test.fixture (fixture_id int PRIMARY KEY, played_on date)')
+            cursor.execute('CREATE TABLE nba3k_test.player_statistic (player_id int, fixture_id int, points int)')
+            cursor.execute("INSERT INTO nba3k_test.player VALUES (2, 'A', 'B'), (3, 'C', 'D')")
+            for game, value in enumerate(points, start=1):
+                cursor.execute('INSERT INTO nba3k_test.fixture VALUES (%s, %s)',
+                               (18200000 + game, f'2018-11-{game:02d}'))
+                cursor.execute('INSERT INTO nba3k_test.player_statistic VALUES (%s, %s, %s)',
+                               (2 if game < 11 else 3, 18200000 + game, value))
+        self.connection.commit()
+
+    def tearDown(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute('DROP SCHEMA nba3k_test CASCADE')
+        self.connection.commit()
+        self.connection.close()
+
+    def test_execute_sql_MSSDAC(self):
+        """Tests the database mode finds the same stretch as the in-memory mode, without loading any game rows."""
+
+        test_finder = StreakFinder(PostgresSource(self.connection, schema='nba3k_test'))
+        self.assertEqual(test_finder.source.player_ids(), {'A B': 2, 'C D': 3})
+        test_finder.player = 2
+        test_finder.category = ['points']
+        test_finder.execute_MSSDAC()
+
+        self.assertEqual([str(date) for date in test_finder.dates], ['2018-11-08', '2018-11-10'])
+        self.assertIsNone(test_finder._comprehensive_stats_df)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,93 @@
+import sys
+import math
+import logging
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, '..')
+from trade_evaluator import TradeEvaluator, candidate_trades, roster_fingerprint, win_probability, _normal_cdf
+from player_valuation import RAW_STATS
+sys.path.remove('..')
+
+class TestTradeEvaluator(unittest.TestCase):
+    """Carries out unittests for candidate generation, batched trade scoring & caching."""
+
+    def setUp(self):
+        """Set up per-game rates for 6 players of increasing quality (player 6 is the best in every stat)."""
+        logging.disable(logging.CRITICAL)
+        means = np.outer(np.arange(1, 7), np.arange(1, len(RAW_STATS) + 1)).astype(float)
+        means[:, RAW_STATS.index('turnovers')] = 1
+        means[:, RAW_STATS.index('field_goals_attempted')] = 2 * means[:, RAW_STATS.index('field_goals_made')]
+        means[:, RAW_STATS.index('free_throws_attempted')] = 2 * means[:, RAW_STATS.index('free_throws_made')]
+        self.rates_df = pd.concat([
+            pd.DataFrame(means, columns=RAW_STATS),
+            pd.DataFrame(means, columns=[f'{stat}_var' for stat in RAW_STATS])
+        ], axis=1).set_index(pd.Index(range(1, 7), name='player_id'))
+        self.evaluator = TradeEvaluator(self.rates_df)
+
+    def test_candidates_and_fingerprint(self):
+        """Tests 1/2-for-1/2 candidate generation & order-independent roster fingerprints."""
+
+        self.assertEqual(len(candidate_trades([1, 2, 3], [4, 5, 6])), 6 * 6)
+        self.assertEqual(len(candidate_trades([1, 2, 3], [4, 5, 6], max_give=1, max_get=1)), 9)
+        self.assertEqual(roster_fingerprint([3, 1, 2]), roster_fingerprint([1, 2, 3]))
+        self.assertNotEqual(roster_fingerprint([1, 2]), roster_fingerprint([1, 2, 3]))
+
+    def test_win_probability(self):
+        """Tests that identical rosters are coin flips & that a stronger roster is favored."""
+
+        means, variances = np.full(len(RAW_STATS), 10.0), np.full(len(RAW_STATS), 4.0)
+        category_probs, win = win_probability(means, variances, means, variances)
+        np.testing.assert_allclose(category_probs, 0.5)
+        self.assertAlmostEqual(win, 0.5)
+
+        _, win = win_probability(np.stack([means * 0.5, means * 2]), np.stack([variances] * 2), means, variances)
+        self.assertLess(win[0], 0.5)
+        self.assertGreater(win[1], 0.5)
+
+    def test_evaluate(self):
+        """Tests z-score changes, roster size handling on 2-for-1 trades, ordering & caching."""
+
+        results_df = self.evaluator.evaluate([1, 2, 3], [4, 5, 6])
+        self.assertEqual(len(results_df), 36)
+        results_df['give'] = 'overwritten by the caller'
+        results_df['get'].iloc[0].append(99)
+        cached_df = self.evaluator.evaluate([3, 2, 1], [6, 5, 4])
+        self.assertEqual(len(self.evaluator.cache), 1)
+        self.assertTrue(cached_df['give'].map(lambda give: isinstance(give, list)).all())
+        self.assertNotIn(99, sum(cached_df['get'], []))
+        results_df = self.evaluator.evaluate([1, 2, 3], [4, 5, 6])
+
+        one_for_one = results_df[results_df['give'].map([1].__eq__) & results_df['get'].map([6].__eq__)]
+        z = self.evaluator.z
+        np.testing.assert_allclose(one_for_one.filter(like='delta_z_').to_numpy()[0], (z[5] - z[0]).round(3))
+        self.assertGreater(one_for_one['delta_win_a'].iloc[0], 0)
+        self.assertLess(one_for_one['delta_win_b'].iloc[0], 0)
+
+        # Getting 5 & 6 for 1 makes A drop its worst remaining player (2), so A ends up with 3, 5 & 6
+        two_for_one = results_df[results_df['give'].map([1].__eq__) & results_df['get'].map([5, 6].__eq__)]
+        expected = z[2] + z[4] + z[5] - z[0] - z[1] - z[2]
+        self.assertAlmostEqual(two_for_one['delta_value_a'].iloc[0], round(expected.sum(), 3))
+
+        self.assertEqual(list(results_df['delta_win_a']), sorted(results_df['delta_win_a'], reverse=True))
+        self.assertTrue(results_df.loc[0, 'delta_value_a'] > 0)
+
+    def test_missing_rates(self):
+        """Tests players without per-game rates or off their roster are reported by ID & the CDF matches math.erf."""
+
+        with self.assertRaisesRegex(ValueError, r'\[7, 9\]'):
+            self.evaluator.evaluate([1, 2, 7], [4, 5, 6], opponent=[9, 3])
+        with self.assertRaisesRegex(ValueError, r'\[8\]'):
+            self.evaluator.evaluate([1, 2, 3], [4, 5, 6], trades=[((1,), (8,))])
+        with self.assertRaisesRegex(ValueError, r'not on roster A: \[5\], or get player IDs not on roster B: \[\]'):
+            self.evaluator.evaluate([1, 2], [5, 6], trades=[((5,), (6,))])
+        with self.assertRaisesRegex(ValueError, r'not on roster B: \[2\]'):
+            self.evaluator.evaluate([1, 2], [5, 6], trades=[((1,), (2,))])
+
+        x = np.linspace(-6, 6, 101)
+        expected = [0.5 * (1 + math.erf(value / math.sqrt(2))) for value in x]
+        np.testing.assert_allclose(_normal_cdf(x), expected, atol=2e-7)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import sys
+import logging
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, '..')
+from waiver_recommender import WaiverRecommender, free_agents
+from player_valuation import RAW_STATS
+sys.path.remove('..')
+
+class TestWaiverRecommender(unittest.TestCase):
+    """Carries out unittests for free agent lookup, availability rates, hot-stretch lift & roster fit."""
+
+    def setUp(self):
+        """Set up 10 regular-season games of 4 players: steady, heating up, often injured & a steals specialist."""
+        logging.disable(logging.CRITICAL)
+        rows = []
+        for game in range(10):
+            for player_id in range(1, 5):
+                row = {stat: 5.0 for stat in RAW_STATS}
+                row.update(turnovers=2.0, field_goals_attempted=10.0, free_throws_attempted=10.0, steals=1.0)
+                status, seconds = 'N/A', 1800
+                if player_id == 2 and game >= 7:
+                    row['points'] = 25.0
+                if player_id == 3 and game % 2:
+                    status, seconds = 'INJ', 0
+                if player_id == 4:
+                    row['steals'] = 4.0
+                rows.append(dict(row, player_id=player_id, player_name=f'Player {player_id}',
+                                 fixture_id=18200001 + game, played_on=f'2018-11-{game + 10}',
+                                 player_status=status, seconds_played=seconds))
+        self.stats_df = pd.DataFrame(rows)
+        self.recommender = WaiverRecommender(self.stats_df, 2018)
+
+    def test_free_agents(self):
+        """Tests that players with an FA/0 team are free agents."""
+        player_team_df = pd.DataFrame({'team_id': [1610612743, 0, 1610612757, 0], 'player_id': [1, 2, 3, 4]})
+        self.assertEqual(free_agents(player_team_df), [2, 4])
+
+    def test_recommend(self):
+        """Tests availability, lift & fit scores & that the ranking only covers candidates."""
+
+        recommendations_df = self.recommender.recommend([1, 2, 3], recent_games=3, min_games=1).set_index('player_id')
+
+        self.assertEqual(sorted(recommendations_df.index), [1, 2, 3])
+        np.testing.assert_array_equal(recommendations_df.loc[[1, 3], 'availability'], [1.0, 0.5])
+        self.assertEqual(recommendations_df.loc[3, 'missed_INJ'], 5)
+        self.assertGreater(recommendations_df.loc[2, 'lift'], 0)
+        self.assertEqual(recommendations_df.loc[1, 'lift'], 0)
+        self.assertEqual(recommendations_df.index[0], 2)
+
+        # Availability is measured over the last listed games as of the given date
+        as_of_df = self.recommender.recommend([3], as_of='2018-11-12', availability_games=2, min_games=1)
+        self.assertEqual(as_of_df.loc[0, 'availability'], 0.5)
+
+    def test_roster_fit(self):
+        """Tests that a roster weak in steals favors the steals specialist over a steady player."""
+
+        no_roster_df = self.recommender.recommend([1, 4], min_games=1).set_index('player_id')
+        weak_df = self.recommender.recommend([1, 4], roster=[1], min_games=1).set_index('player_id')
+        gap = weak_df.loc[4, 'fit'] - weak_df.loc[1, 'fit']
+        self.assertGreater(gap, no_roster_df.loc[4, 'fit'] - no_roster_df.loc[1, 'fit'])
+
+        punted_df = self.recommender.recommend([1, 4], punts=['steals'], min_games=1).set_index('player_id')
+        self.assertEqual(punted_df.loc[4, 'fit'], punted_df.loc[1, 'fit'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import sys
+import logging
+import unittest
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, '..')
+from utils.window_index import StatWindowIndex
+sys.path.remove('..')
+
+class TestWindowIndex(unittest.TestCase):
+    """Carries out unittests for prefix-sum window queries against brute-force dataframe filtering."""
+
+    def setUp(self):
+        """Set up shuffled games of 20 players over 2 seasons (with some missing stat values) & their calendar."""
+        logging.disable(logging.CRITICAL)
+        rng = np.random.default_rng(7)
+        rows = 1500
+        dates = pd.Timestamp('2017-10-01') + pd.to_timedelta(rng.integers(0, 600, rows), unit='D')
+        seasons = np.where(dates < pd.Timestamp('2018-09-01'), 17, 18)
+        phases = np.where((dates.month > 4) & (dates.month < 9) | (dates.month == 4) & (dates.day > 15), 4, 2)
+        self.stats_df = pd.DataFrame({
+            'player_id': rng.integers(1, 21, rows),
+            'fixture_id': seasons * 10 ** 6 + phases * 10 ** 5 + np.arange(rows),
+            'played_on': dates.strftime('%Y-%m-%d'),
+            'points': rng.integers(0, 40, rows).astype(float),
+            'steals': np.where(rng.random(rows) < 0.1, np.nan, rng.integers(0, 5, rows))
+        }).sample(frac=1, random_state=1)
+        self.calendar_df = pd.DataFrame({
+            'season': [2017, 2018],
+            'all_star_break': pd.to_datetime(['2018-02-18', '2019-02-17'])
+        })
+        self.index = StatWindowIndex(self.stats_df, ['points', 'steals'], self.calendar_df)
+        self.stats_df['played_on'] = pd.to_datetime(self.stats_df['played_on'])
+        self.stats_df = self.stats_df.sort_values(by=['player_id', 'played_on', 'fixture_id'])
+
+    def test_date_range_and_last_n(self):
+        """Tests date-range & last-N windows (alone & combined) for all players at once."""
+
+        window_df = self.stats_df[self.stats_df['played_on'].between('2017-12-01', '2018-03-15')]
+        totals_df = self.index.totals(start='2017-12-01', end='2018-03-15')
+        expected = window_df.groupby('player_id')['points'].sum().reindex(totals_df.index, fill_value=0)
+        np.testing.assert_allclose(totals_df['points'], expected)
+
+        totals_df = self.index.totals([3, 5], end='2018-03-15', last_n=10)
+        for player_id in (3, 5):
+            player_df = self.stats_df[(self.stats_df.player_id == player_id) &
+                                      (self.stats_df.played_on <= '2018-03-15')].tail(10)
+            self.assertEqual(totals_df.loc[player_id, 'games'], len(player_df))
+            self.assertEqual(totals_df.loc[player_id, 'points'], player_df['points'].sum())
+            self.assertEqual(totals_df.loc[player_id, 'steals'], player_df['steals'].sum())
+
+    def test_season_phases(self):
+        """Tests season & season-phase windows (split at the all-star break) & averages ignoring missing values."""
+
+        season_df = self.stats_df[self.stats_df['fixture_id'] // 10 ** 6 == 17]
+        regular_df = season_df[season_df['fixture_id'] // 10 ** 5 % 10 == 2]
+        after_df = regular_df[regular_df['played_on'] >= '2018-02-18']
+
+        totals_df = self.index.totals(season=2017)
+        np.testing.assert_array_equal(totals_df['games'], season_df.groupby('player_id').size())
+
+        totals_df = self.index.totals(season=2017, phase='after-asb')
+        expected = after_df.groupby('player_id')['points'].sum().reindex(totals_df.index, fill_value=0)
+        np.testing.assert_allclose(totals_df['points'], expected)
+
+        averages_df = self.index.averages(season=2017, phase='before-asb')
+        expected = regular_df[regular_df['played_on'] < '2018-02-18'].groupby('player_id')['steals'].mean()
+        np.testing.assert_allclose(averages_df['steals'], expected.reindex(averages_df.index))
+
+        self.assertEqual(self.index.seasons(1), [2017, 2018])
+        self.assertRaises(ValueError, self.index.totals, phase='after-asb')
+        self.assertRaises(KeyError, self.index.totals, [99])
+
+    def test_all_star_and_undated_games(self):
+        """Tests date windows stay chronological around an all-star game without a calendar (which then marks the
+        break) & that games without a date are left out."""
+
+        stats_df = pd.DataFrame({
+            'player_id': [1, 1, 1, 1, 2],
+            'fixture_id': [20200001, 20200002, 20300001, 20200003, 20200004],
+            'played_on': ['2021-01-10', '2021-03-20', '2021-03-07', None, '2021-01-12'],
+            'points': [10.0, 20.0, 30.0, 40.0, 50.0]
+        })
+        index = StatWindowIndex(stats_df, ['points'])
+
+        totals_df = index.totals([1], start='2021-03-15', end='2021-03-31')
+        self.assertEqual((totals_df.loc[1, 'games'], totals_df.loc[1, 'points']), (1, 20))
+        totals_df = index.totals([1], start='2021-03-01', end='2021-03-10')
+        self.assertEqual((totals_df.loc[1, 'games'], totals_df.loc[1, 'points']), (1, 30))
+        self.assertEqual(index.totals(season=2020, phase='before-asb')['points'].tolist(), [10, 50])
+        self.assertEqual(index.totals(season=2020, phase='after-asb')['points'].tolist(), [50, 0])
+        self.assertEqual(index.totals(season=2020)['points'].tolist(), [60, 50])
+        self.assertEqual(index.totals([1], season=2020, end='2021-03-10', last_n=1).loc[1, 'points'], 30)
+
+if __name__ == '__main__':
+    unittest.main()
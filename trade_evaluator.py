@@ -0,0 +1,242 @@
+import math
+import time
+import hashlib
+import logging
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+from player_valuation import z_scores, punt_variant, RAW_STATS, PUNT_MASKS, IMPACT_CATEGORIES
+from utils.fantasy_categories import CATEGORIES
+from matchup_projector import rates_from_totals, snake_draft
+
+# Defining the paths for the per-game rate source (season totals of the player clusters) & the demo league rankings
+CLUSTERS_PATH = './data/processed/player_cluster.csv'
+CONSENSUS_PATH = './data/processed/player_consensus_rankings.csv'
+
+def logger_setup():
+    """Standardized logging set up with custom handlers & formatters. Implements logging for all submodules executed."""
+    logger = logging.getLogger()
+    sh, fh = logging.StreamHandler(), logging.FileHandler('../logs_nba3k.log', 'a')
+    sh.setFormatter(logging.Formatter('%(message)s'))
+    fh.setFormatter(logging.Formatter('%(module)s (%(lineno)d): %(asctime)s | %(levelname)s | %(message)s'))
+    logger.setLevel(logging.DEBUG), sh.setLevel(logging.INFO), logger.addHandler(fh), logger.addHandler(sh)
+    return logger
+
+def roster_fingerprint(player_ids):
+    """Returns an order-independent fingerprint (SHA-1 hex digest) of a roster's player IDs."""
+    return hashlib.sha1(','.join(str(player_id) for player_id in sorted(player_ids)).encode()).hexdigest()
+
+def candidate_trades(roster_a, roster_b, max_give=2, max_get=2):
+    """Returns every (players given by A, players given by B) trade with up to max_give/max_get players per side."""
+    gives = [combo for size in range(1, max_give + 1) for combo in itertools.combinations(roster_a, size)]
+    gets = [combo for size in range(1, max_get + 1) for combo in itertools.combinations(roster_b, size)]
+    return [(give, get) for give in gives for get in gets]
+
+def _erf(x):
+    """Error function over whole arrays (Abramowitz & Stegun 7.1.26, absolute error below 1.5e-7)."""
+    t = 1 / (1 + 0.3275911 * np.abs(x))
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    return np.sign(x) * (1 - poly * np.exp(-x ** 2))
+
+def _normal_cdf(x):
+    """Standard normal CDF, element-wise over arrays."""
+    return 0.5 * (1 + _erf(np.asarray(x, dtype=np.float64) / math.sqrt(2)))
+
+def win_probability(means, variances, opponent_means, opponent_variances):
+    """Returns the probabilities of winning each category & the matchup (5+ categories) against an opponent.
+
+    Args:
+        means, variances (np.ndarray): Weekly roster total moments (... x RAW_STATS)
+        opponent_means, opponent_variances (np.ndarray): Weekly opponent total moments (RAW_STATS,)
+
+    Returns:
+        tuple: (category win probabilities (... x CATEGORIES), matchup win probabilities (...))
+    """
+
+    def _category_moments(mu, var):
+        columns = {stat: (mu[..., i], var[..., i]) for i, stat in enumerate(RAW_STATS)}
+        # Delta method for the made/attempted ratios (made & attempted taken as independent)
+        for category, (made, attempted) in IMPACT_CATEGORIES.items():
+            (m, m_var), (a, a_var) = columns[made], columns[attempted]
+            a = np.maximum(a, 1e-9)
+            columns[category] = (m / a, m_var / a ** 2 + m ** 2 * a_var / a ** 4)
+        return (np.stack([columns[category][0] for category in CATEGORIES], axis=-1),
+                np.stack([columns[category][1] for category in CATEGORIES], axis=-1))
+
+    mu, var = _category_moments(means, variances)
+    opponent_mu, opponent_var = _category_moments(opponent_means, opponent_variances)
+    diff = mu - opponent_mu
+    diff[..., CATEGORIES.index('turnovers')] *= -1
+    category_probs = _normal_cdf(diff / np.sqrt(np.maximum(var + opponent_var, 1e-12)))
+
+    # Distribution of categories won (Poisson-binomial), built one category at a time for all rosters at once
+    won = np.zeros(category_probs.shape[:-1] + (len(CATEGORIES) + 1,))
+    won[..., 0] = 1
+    for i in range(len(CATEGORIES)):
+        p = category_probs[..., i:i + 1]
+        won[..., 1:] = won[..., 1:] * (1 - p) + won[..., :-1] * p
+        won[..., 0] *= 1 - p[..., 0]
+    return category_probs, won[..., len(CATEGORIES) // 2 + 1:].sum(axis=-1)
+
+class TradeEvaluator:
+    """Scores batches of candidate trades between two fantasy rosters (category z-score & matchup win probability).
+    Each candidate is a row of give/get incidence matrices, so all trades are evaluated with a few matrix products."""
+
+    def __init__(self, rates_df, games_per_week=3.5):
+        """Instantiates class attributes for per-game rates, per-game z-scores & the results cache.
+
+        Args:
+            rates_df (pd.DataFrame): player_id-indexed per-game means (RAW_STATS) & variances ({stat}_var)
+            games_per_week (float): Games each player is assumed to play in a fantasy week
+        """
+        self.player_ids = rates_df.index.to_numpy()
+        self.positions = {player_id: pos for pos, player_id in enumerate(self.player_ids.tolist())}
+        self.means = rates_df[RAW_STATS].to_numpy(dtype=np.float64)
+        self.variances = rates_df[[f'{stat}_var' for stat in RAW_STATS]].to_numpy(dtype=np.float64)
+        self.z = z_scores(np.ones(len(self.player_ids)), self.means)
+        self.games_per_week = games_per_week
+        self.cache = {}
+
+    def incidence(self, groups):
+        """Returns the (groups x players) 0/1 incidence matrix of groups of player IDs."""
+        matrix = np.zeros((len(groups), len(self.player_ids)))
+        for row, player_ids in enumerate(groups):
+            matrix[row, [self.positions[player_id] for player_id in player_ids]] = 1
+        return matrix
+
+    @staticmethod
+    def drop_extra_players(rosters, size, player_values):
+        """Drops the lowest-valued players of post-trade rosters (incidence matrix rows) above the roster size."""
+        rosters = rosters.copy()
+        rows = np.arange(len(rosters))
+        while (rosters.sum(axis=1) > size).any():
+            over = rosters.sum(axis=1) > size
+            lowest = np.where(rosters > 0, player_values, np.inf).argmin(axis=1)
+            rosters[rows[over], lowest[over]] = 0
+        return rosters
+
+    def evaluate(self, roster_a, roster_b, trades=None, punts=(), opponent=None):
+        """Evaluates trades between rosters A & B (all 1/2-for-1/2 trades if None), best for A first.
+
+        Args:
+            roster_a, roster_b (list): Player IDs of both rosters
+            trades (list): (players given by A, players given by B) pairs
+            punts (list): Categories left out of the z-score values
+            opponent (list): Player IDs of the reference opponent for win probabilities (if None, a roster the size
+                of A made of the average player of both rosters)
+
+        Returns:
+            pd.DataFrame: Per-trade category z-score changes for A, value & win probability changes for both teams
+                (a team receiving more players than it gives drops its lowest-valued players); a copy of the cached
+                results, so callers may modify it; a ValueError is raised if a player involved has no per-game rates,
+                or if a trade gives a player not on A or gets a player not on B
+        """
+
+        # Every player involved needs per-game rates (rookies & players with too few games have none)
+        involved = set(roster_a) | set(roster_b) | set(opponent or [])
+        if trades is not None:
+            involved |= {player_id for give, get in trades for player_id in (*give, *get)}
+        missing = sorted(involved - self.positions.keys())
+        if missing:
+            raise ValueError(f'No per-game rates for player IDs: {missing}')
+        if trades is not None:
+            not_on_a = sorted({player_id for give, _ in trades for player_id in give} - set(roster_a))
+            not_on_b = sorted({player_id for _, get in trades for player_id in get} - set(roster_b))
+            if not_on_a or not_on_b:
+                raise ValueError(f'Trades give player IDs not on roster A: {not_on_a}, or get player IDs not on '
+                                 f'roster B: {not_on_b}')
+
+        # Canonical (sorted) trades, so that the cache key doesn't depend on the order players are listed in
+        if trades is None:
+            trades = candidate_trades(sorted(roster_a), sorted(roster_b))
+        trades = [(tuple(sorted(give)), tuple(sorted(get))) for give, get in trades]
+        key = (roster_fingerprint(roster_a), roster_fingerprint(roster_b),
+               hashlib.sha1(repr(trades).encode()).hexdigest(), tuple(sorted(punts)),
+               None if opponent is None else roster_fingerprint(opponent))
+        if key in self.cache:
+            return self.cached(key)
+
+        # Trade rows: players moving from B to A count +1, players moving from A to B count -1
+        rosters = self.incidence([roster_a, roster_b])
+        moves = self.incidence([get for _, get in trades]) - self.incidence([give for give, _ in trades])
+        value_weights = PUNT_MASKS[punt_variant(punts)]
+        player_values = self.z @ value_weights
+        after_a = self.drop_extra_players(rosters[0] + moves, len(roster_a), player_values)
+        after_b = self.drop_extra_players(rosters[1] - moves, len(roster_b), player_values)
+        delta_z_a, delta_z_b = (after_a - rosters[0]) @ self.z, (after_b - rosters[1]) @ self.z
+
+        # Weekly roster total moments, before (rows 0/1) & after every trade
+        weekly_means, weekly_variances = self.games_per_week * self.means, self.games_per_week * self.variances
+        before = rosters @ weekly_means, rosters @ weekly_variances
+
+        if opponent is None:
+            scale = len(roster_a) / rosters.sum()
+            opponent_moments = scale * before[0].sum(axis=0), scale * before[1].sum(axis=0)
+        else:
+            opponent_rows = self.incidence([opponent])
+            opponent_moments = (opponent_rows @ weekly_means)[0], (opponent_rows @ weekly_variances)[0]
+        _, win_before = win_probability(*before, *opponent_moments)
+        _, win_a = win_probability(after_a @ weekly_means, after_a @ weekly_variances, *opponent_moments)
+        _, win_b = win_probability(after_b @ weekly_means, after_b @ weekly_variances, *opponent_moments)
+
+        results_df = pd.DataFrame(delta_z_a.round(3), columns=[f'delta_z_{category}' for category in CATEGORIES])
+        results_df.insert(0, 'give', [list(give) for give, _ in trades])
+        results_df.insert(1, 'get', [list(get) for _, get in trades])
+        results_df['delta_value_a'] = (delta_z_a @ value_weights).round(3)
+        results_df['delta_value_b'] = (delta_z_b @ value_weights).round(3)
+        results_df['win_prob_a'] = win_a.round(4)
+        results_df['delta_win_a'] = (win_a - win_before[0]).round(4)
+        results_df['win_prob_b'] = win_b.round(4)
+        results_df['delta_win_b'] = (win_b - win_before[1]).round(4)
+        results_df = results_df.sort_values(by=['delta_win_a', 'delta_value_a'], ascending=False)
+        self.cache[key] = results_df.reset_index(drop=True)
+
+        logging.debug(f'Evaluated {len(trades)} trades between rosters {key[0][:8]} & {key[1][:8]}.')
+        return self.cached(key)
+
+    def cached(self, key):
+        """Returns a copy of cached trade results (give & get player lists included), so callers may modify it."""
+        results_df = self.cache[key].copy()
+        results_df['give'], results_df['get'] = results_df['give'].map(list), results_df['get'].map(list)
+        return results_df
+
+def main():
+    """Evaluates every 1/2-for-1/2 trade between two teams of a league snake-drafted from the consensus rankings."""
+    logger = logger_setup()
+
+    parser = argparse.ArgumentParser(description='Evaluate candidate trades between two fantasy rosters.')
+    parser.add_argument('--teams', type=int, default=12, help='number of fantasy teams in the demo league')
+    parser.add_argument('--roster-size', type=int, default=13, help='players per fantasy team')
+    parser.add_argument('--team-a', type=int, default=1, help='team proposing the trades')
+    parser.add_argument('--team-b', type=int, default=2, help='trade partner')
+    parser.add_argument('--punt', nargs='*', default=[], choices=CATEGORIES, help='categories to punt')
+    parser.add_argument('--top', type=int, default=15, help='number of trades to display')
+    args = parser.parse_args()
+
+    try:
+        clusters_df = pd.read_csv(CLUSTERS_PATH, sep=',', header=0, encoding='utf-8')
+        consensus_df = pd.read_csv(CONSENSUS_PATH, sep=',', header=0, encoding='utf-8')
+    except FileNotFoundError as e:
+        logging.error(f'File not found error: {e}')
+        return
+
+    rates_df = rates_from_totals(clusters_df)
+    names = dict(zip(clusters_df['player_id'], clusters_df['player_name']))
+    rosters = snake_draft(consensus_df.loc[consensus_df['player_id'].isin(rates_df.index), 'player_id'],
+                          args.teams, args.roster_size)
+    roster_a, roster_b = rosters[f'Team {args.team_a}'], rosters[f'Team {args.team_b}']
+
+    evaluator = TradeEvaluator(rates_df)
+    start = time.perf_counter()
+    results_df = evaluator.evaluate(roster_a, roster_b, punts=args.punt)
+    elapsed = time.perf_counter() - start
+
+    results_df['give'] = results_df['give'].map(lambda ids: ', '.join(names[player_id] for player_id in ids))
+    results_df['get'] = results_df['get'].map(lambda ids: ', '.join(names[player_id] for player_id in ids))
+    columns = ['give', 'get', 'delta_value_a', 'win_prob_a', 'delta_win_a', 'win_prob_b', 'delta_win_b']
+    logging.info(results_df[columns].head(args.top).to_string(index=False))
+    logging.info(f'\nEvaluated {len(results_df)} candidate trades in {elapsed:.3f}s.')
+
+if __name__ == '__main__':
+    main()
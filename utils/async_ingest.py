@@ -0,0 +1,110 @@
+### HOW TO USE: Map each table to (iterable of row chunks, write callable) & call asyncio.run(ingest(tables, parents))
+### to stream them: chunks are parsed on worker threads while earlier chunks are written (bounded queue per table).
+
+import io
+import time
+import asyncio
+import logging
+from utils import db_loader
+
+CHUNK_ROWS = 50000
+# Parsed chunks waiting to be written per table; a full queue pauses the parsing (backpressure)
+QUEUE_CHUNKS = 4
+
+def _copy_value(value):
+    """Formats a value for COPY's text format (NULL as \\N, integral floats as integers, special characters escaped)."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r'))
+
+def copy_text(rows):
+    """Returns rows (tuples) as a tab-separated COPY text payload."""
+    return ''.join('\t'.join(map(_copy_value, row)) + '\n' for row in rows)
+
+def copy_rows(pool, table, columns, rejects, rows, schema='nba3k'):
+    """COPYs a chunk of rows over a pooled connection; if the chunk is rejected, it is inserted in batches instead
+    so only the failing rows are quarantined (see db_loader.insert_rows).
+
+    Returns:
+        int: Number of rows written
+    """
+
+    connection = pool.getconn()
+    try:
+        try:
+            with connection.cursor() as cursor:
+                cursor.copy_expert(f'COPY {schema}.{table} ({", ".join(columns)}) FROM STDIN',
+                                   io.StringIO(copy_text(rows)))
+            connection.commit()
+            return len(rows)
+        except Exception as e:
+            connection.rollback()
+            logging.debug(f'COPY of {len(rows)} {table} rows failed ({str(e).strip()}); inserting in batches.')
+            return db_loader.insert_rows(connection, table, columns, rows, rejects, schema)
+    finally:
+        pool.putconn(connection)
+
+async def produce(chunks, queue, consumers):
+    """Parses chunks on a worker thread & queues them (waiting while the queue is full), then one stop per consumer."""
+    loop = asyncio.get_running_loop()
+    iterator = iter(chunks)
+    while True:
+        chunk = await loop.run_in_executor(None, next, iterator, None)
+        if chunk is None:
+            break
+        await queue.put(chunk)
+    for _ in range(consumers):
+        await queue.put(None)
+
+async def consume(queue, write, writers):
+    """Writes queued chunks on worker threads (at most `writers` writes at once across tables) until told to stop."""
+    loop = asyncio.get_running_loop()
+    rows = 0
+    while True:
+        chunk = await queue.get()
+        if chunk is None:
+            return rows
+        async with writers:
+            rows += await loop.run_in_executor(None, write, chunk)
+
+async def ingest_table(chunks, write, writers, consumers=2, queue_chunks=QUEUE_CHUNKS):
+    """Streams one table from its chunks into write through a bounded queue; returns the number of rows written."""
+    queue = asyncio.Queue(maxsize=queue_chunks)
+    results = await asyncio.gather(produce(chunks, queue, consumers),
+                                   *[consume(queue, write, writers) for _ in range(consumers)])
+    return sum(results[1:])
+
+async def ingest(tables, parents, writers=4, consumers=2, queue_chunks=QUEUE_CHUNKS):
+    """Streams every table, each starting once the tables it references are written (independent tables overlap).
+
+    Args:
+        tables (dict): Table -> (iterable of row chunks, callable writing a chunk & returning its rows written)
+        parents (dict): Table -> tables it references (foreign keys), which must be written first
+        writers (int): Maximum number of chunk writes at the same time (e.g. the connection pool size)
+        consumers (int): Writing tasks per table
+        queue_chunks (int): Parsed chunks each table may hold in memory while waiting to be written
+
+    Returns:
+        dict: Table -> (rows written, wall time in seconds)
+    """
+
+    finished = {table: asyncio.Event() for table in tables}
+    semaphore = asyncio.Semaphore(writers)
+
+    async def run(table):
+        for parent in parents.get(table, ()):
+            if parent in finished:
+                await finished[parent].wait()
+        start = time.perf_counter()
+        chunks, write = tables[table]
+        rows = await ingest_table(chunks, write, semaphore, consumers, queue_chunks)
+        finished[table].set()
+        logging.info(f'Streamed {rows} {table} rows in {time.perf_counter() - start:.2f}s.')
+        return table, rows, time.perf_counter() - start
+
+    results = await asyncio.gather(*[run(table) for table in tables])
+    return {table: (rows, seconds) for table, rows, seconds in results}
@@ -0,0 +1,225 @@
+### HOW TO USE: Instantiate a source (CSV, Parquet, Postgres, SQLite or DataFrame source, or open_source by kind) &
+### call load(columns, seasons) to read only what a query needs; pass sources to tools like StreakFinder.
+
+import os
+import abc
+import sqlite3
+import logging
+import pandas as pd
+from utils import generate_game_id
+
+COMPREHENSIVE_PATH = './data/intermediate/comprehensive_player_statistic.csv'
+COMPREHENSIVE_PARQUET_PATH = './data/intermediate/comprehensive_player_statistic.parquet'
+MIRROR_PATH = './data/processed/nba3k.sqlite'
+CHUNK_ROWS = 200000
+
+# SQL expression of each comprehensive column, over player_statistic (ps), fixture (f) & player (p) in nba3k
+COMPREHENSIVE_SQL = {
+    'player_id': 'ps.player_id',
+    'player_name': "p.first_name || ' ' || p.last_name",
+    'fixture_id': 'ps.fixture_id',
+    'played_on': 'f.played_on',
+    'rebounds': 'ps.offensive_rebounds + ps.defensive_rebounds',
+    'fg%': 'ROUND(100.0 * ps.field_goals_made / NULLIF(ps.field_goals_attempted, 0), 2)',
+    'ft%': 'ROUND(100.0 * ps.free_throws_made / NULLIF(ps.free_throws_attempted, 0), 2)',
+    '3pt%': 'ROUND(100.0 * ps.threes_made / NULLIF(ps.threes_attempted, 0), 2)'
+}
+
+def fixture_range(season):
+    """Returns the [first, last) fixture IDs (YYPNNNNN, so all phases of a season share the YY prefix) of a season."""
+    first = season % 100 * 10 ** 6
+    return first, first + 10 ** 6
+
+class DataSource(abc.ABC):
+    """Reads the comprehensive player-game dataset (or a projection of its columns & seasons) from a backend."""
+
+    @abc.abstractmethod
+    def load(self, columns=None, seasons=None):
+        """Returns the rows of the given seasons (all if None) with only the given columns (all if None).
+
+        Args:
+            columns (list): Columns to read; fixture_id is read too (& dropped again) when filtering seasons
+            seasons (list): 4-digit starting years of the seasons to keep
+        """
+
+    @staticmethod
+    def read_columns(columns, seasons):
+        """Returns the columns to read for a query (fixture_id added to filter seasons), or None for all."""
+        if columns is None:
+            return None
+        return list(columns) + (['fixture_id'] if seasons is not None and 'fixture_id' not in columns else [])
+
+    @staticmethod
+    def select(stats_df, columns=None, seasons=None):
+        """Keeps the rows of the given seasons & the given columns, in the requested column order."""
+        if seasons is not None:
+            fixture_ids = stats_df['fixture_id']
+            in_seasons = fixture_ids.notna() & generate_game_id.fixture_season(
+                fixture_ids.fillna(0).astype('int64')).isin(list(seasons))
+            stats_df = stats_df[in_seasons.to_numpy()]
+        if columns is not None:
+            stats_df = stats_df[list(columns)]
+        return stats_df.reset_index(drop=True)
+
+class DataFrameSource(DataSource):
+    """In-memory source (tests, notebooks, or data another tool already loaded)."""
+
+    def __init__(self, stats_df):
+        self.stats_df = stats_df
+
+    def load(self, columns=None, seasons=None):
+        return self.select(self.stats_df, columns, seasons).copy()
+
+class CSVSource(DataSource):
+    """CSV file source, parsing only the needed columns & filtering seasons chunk by chunk to bound memory."""
+
+    def __init__(self, path=COMPREHENSIVE_PATH, chunk_rows=CHUNK_ROWS):
+        self.path = path
+        self.chunk_rows = chunk_rows
+
+    def load(self, columns=None, seasons=None):
+        read_columns = self.read_columns(columns, seasons)
+        reader = pd.read_csv(self.path, sep=',', header=0, encoding='utf-8', low_memory=False,
+                             usecols=read_columns, chunksize=self.chunk_rows if seasons is not None else None)
+        if seasons is None:
+            return self.select(reader, columns)
+        chunks = [self.select(chunk, columns, seasons) for chunk in reader]
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=read_columns)
+
+class ParquetSource(DataSource):
+    """Columnar (parquet) file source: only the needed columns are read & seasons are pushed down as row filters."""
+
+    def __init__(self, path=COMPREHENSIVE_PARQUET_PATH):
+        self.path = path
+
+    def load(self, columns=None, seasons=None):
+        filters = None
+        if seasons is not None:
+            filters = [[('fixture_id', '>=', first), ('fixture_id', '<', last)]
+                       for first, last in map(fixture_range, seasons)]
+        stats_df = pd.read_parquet(self.path, columns=self.read_columns(columns, seasons), filters=filters)
+        return self.select(stats_df, columns, seasons)
+
+    @staticmethod
+    def write(stats_df, path):
+        """Writes a dataframe (e.g. the comprehensive CSV, once) as a parquet file for this source to read."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        stats_df.to_parquet(path, index=False)
+
+class PostgresSource(DataSource):
+    """PostgreSQL source, building the comprehensive columns from the nba3k tables loaded by inject_rds_data.py."""
+
+    def __init__(self, connection=None, schema='nba3k'):
+        """Uses the given DB-API connection, or connects with the RDS_* environment variables on first load."""
+        self.connection = connection
+        self.schema = schema
+
+    def connect(self):
+        """Returns the connection, creating it from the environment (as DBClient does in AWS mode) if needed."""
+        if self.connection is None:
+            import psycopg2
+            self.connection = psycopg2.connect(
+                database=os.getenv('RDS_DB_NAME'),
+                user=os.getenv('RDS_USERNAME'),
+                password=os.getenv('RDS_PASSWORD'),
+                host=os.getenv('RDS_HOSTNAME'),
+                port=os.getenv('RDS_PORT')
+            )
+        return self.connection
+
+    def query(self, columns=None, seasons=None):
+        """Returns the (SQL, parameters) selecting the columns & seasons (season filters use fixture ID ranges).
+        Literal % signs are doubled, as the parameters are always passed to the driver."""
+
+        columns = list(COMPREHENSIVE_SQL) if columns is None else list(columns)
+        expressions = ', '.join(f'{COMPREHENSIVE_SQL.get(col, "ps." + col)} AS "{col.replace("%", "%%")}"'
+                                for col in columns)
+        sql = (f'SELECT {expressions} FROM {self.schema}.player_statistic ps '
+               f'LEFT JOIN {self.schema}.fixture f ON f.fixture_id = ps.fixture_id '
+               f'LEFT JOIN {self.schema}.player p ON p.player_id = ps.player_id')
+        params = []
+        if seasons is not None:
+            sql += ' WHERE ' + ' OR '.join(['(ps.fixture_id >= %s AND ps.fixture_id < %s)'] * len(seasons))
+            params = [int(bound) for season in seasons for bound in fixture_range(season)]
+        return sql + ' ORDER BY ps.fixture_id, ps.player_id', params
+
+    def load(self, columns=None, seasons=None):
+        sql, params = self.query(columns, seasons)
+        logging.debug(f'Querying {self.schema}: {sql}')
+        return self.read(sql, params)
+
+    def read(self, sql, params=()):
+        """Runs an ad-hoc query (%s placeholders) & returns its rows as a dataframe."""
+        return pd.read_sql_query(sql, self.connect(), params=list(params))
+
+    def player_ids(self):
+        """Returns a dict linking player names to player IDs (without reading any game rows)."""
+        sql = f"SELECT first_name || ' ' || last_name AS player_name, player_id FROM {self.schema}.player"
+        players_df = pd.read_sql_query(sql, self.connect(), params=[])
+        return dict(zip(players_df.player_name, players_df.player_id))
+
+    def deviation_query(self, player_id, categories, seasons=None):
+        """Returns the (SQL, parameters) of a player's regular-season games, with each category's deviation from
+        the player's (1-decimal rounded) season mean computed by a window over player & season, ordered by date."""
+
+        expressions = [f'({COMPREHENSIVE_SQL.get(cat, "ps." + cat)})::numeric' for cat in categories]
+        deviations = ', '.join(f'ROUND({expr} - ROUND(AVG({expr}) OVER seasons, 1), 1) AS "{cat.replace("%", "%%")}"'
+                               for cat, expr in zip(categories, expressions))
+        sql = (f'SELECT ps.fixture_id / 1000000 + 2000 AS season, f.played_on, {deviations} '
+               f'FROM {self.schema}.player_statistic ps '
+               f'JOIN {self.schema}.fixture f ON f.fixture_id = ps.fixture_id '
+               f'WHERE ps.player_id = %s AND ps.fixture_id / 100000 %% 10 = {generate_game_id.REGULAR_SEASON}')
+        params = [int(player_id)]
+        if seasons is not None:
+            sql += ' AND ps.fixture_id / 1000000 + 2000 = ANY(%s)'
+            params.append([int(season) for season in seasons])
+        sql += (' WINDOW seasons AS (PARTITION BY ps.player_id, ps.fixture_id / 1000000)'
+                ' ORDER BY season, f.played_on, ps.fixture_id')
+        return sql, params
+
+    def deviations(self, player_id, categories, seasons=None):
+        """Returns a player's season, played_on & per-category deviation columns (NULL stats stay missing)."""
+        sql, params = self.deviation_query(player_id, categories, seasons)
+        deviations_df = pd.read_sql_query(sql, self.connect(), params=params)
+        deviations_df[list(categories)] = deviations_df[list(categories)].astype(float)
+        return deviations_df
+
+class SQLiteSource(DataSource):
+    """Embedded SQLite mirror source (see utils.sqlite_mirror): indexed reads of the processed tables & the
+    comprehensive view, without a server or a CSV parse."""
+
+    def __init__(self, path=MIRROR_PATH):
+        self.path = path
+        self.connection = None
+
+    def connect(self):
+        """Returns a read-only connection to the mirror (raises FileNotFoundError if it hasn't been built)."""
+        if self.connection is None:
+            if not os.path.exists(self.path):
+                raise FileNotFoundError(f'No SQLite mirror at {self.path} (run execute_cleaners.py --sqlite)')
+            self.connection = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True, check_same_thread=False)
+        return self.connection
+
+    def read(self, sql, params=()):
+        """Runs an ad-hoc query (? placeholders) & returns its rows as a dataframe."""
+        return pd.read_sql_query(sql, self.connect(), params=list(params))
+
+    def load(self, columns=None, seasons=None):
+        selected = '*' if columns is None else ', '.join(f'"{col}"' for col in columns)
+        sql = f'SELECT {selected} FROM comprehensive_player_statistic'
+        params = []
+        if seasons is not None:
+            sql += ' WHERE ' + ' OR '.join(['(fixture_id >= ? AND fixture_id < ?)'] * len(seasons))
+            params = [int(bound) for season in seasons for bound in fixture_range(season)]
+        return self.read(sql + ' ORDER BY fixture_id, player_id', params)
+
+SOURCES = {'csv': CSVSource, 'parquet': ParquetSource, 'postgres': PostgresSource, 'sqlite': SQLiteSource}
+
+def open_source(kind, path=None):
+    """Instantiates a source by kind (one of SOURCES); file sources read from path (if None, the comprehensive CSV or
+    parquet file, or the SQLite mirror, by kind)."""
+    if kind not in SOURCES:
+        raise ValueError(f'Unknown data source {kind}, expected one of {list(SOURCES)}')
+    if kind == 'postgres' or path is None:
+        return SOURCES[kind]()
+    return SOURCES[kind](path)
@@ -0,0 +1,120 @@
+### HOW TO USE: Describe a load as table -> shard loaders & table -> parent tables, then call run_plan to load
+### independent tables concurrently (each starting once its parents are done); insert_rows quarantines bad rows.
+
+import csv
+import time
+import logging
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+BATCH_ROWS = 1000
+
+def shard_labels(fixture_ids, shards):
+    """Splits rows into shards of contiguous fixture ID ranges with about as many rows each (a fixture's rows stay
+    together), returning the shard number (0 to shards - 1, some possibly empty) of each row."""
+    fixture_ids = np.asarray(fixture_ids)
+    sorted_ids = np.sort(fixture_ids)
+    edges = sorted_ids[(np.arange(1, shards) * len(sorted_ids)) // shards] if len(sorted_ids) else []
+    return np.searchsorted(np.unique(edges), fixture_ids, side='right')
+
+class RejectLog:
+    """Thread-safe collection of rows that failed to insert, written to a CSV file for review & re-runs."""
+
+    def __init__(self):
+        self.rejects = []
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.rejects)
+
+    def add(self, table, record, error):
+        with self.lock:
+            self.rejects.append((table, str(error).strip(), repr(tuple(record))))
+
+    def write(self, path):
+        """Writes (table, error, record) rows to path (nothing is written when there are no rejects)."""
+        if not self.rejects:
+            return
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['table', 'error', 'record'])
+            writer.writerows(self.rejects)
+
+def insert_rows(connection, table, columns, rows, rejects, schema='nba3k', batch_rows=BATCH_ROWS):
+    """Inserts rows in multi-row batches through one cursor & commits; a failing batch is retried row by row (each
+    behind a savepoint) so only the failing rows are quarantined to the reject log.
+
+    Returns:
+        int: Number of rows inserted
+    """
+
+    from psycopg2.extras import execute_values
+
+    sql = f'INSERT INTO {schema}.{table} ({", ".join(columns)}) VALUES %s'
+    inserted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_rows):
+            batch = rows[start:start + batch_rows]
+            cursor.execute('SAVEPOINT batch')
+            try:
+                execute_values(cursor, sql, batch, page_size=len(batch))
+                inserted += len(batch)
+            except Exception:
+                cursor.execute('ROLLBACK TO SAVEPOINT batch')
+                for row in batch:
+                    cursor.execute('SAVEPOINT record')
+                    try:
+                        execute_values(cursor, sql, [row])
+                        inserted += 1
+                    except Exception as e:
+                        cursor.execute('ROLLBACK TO SAVEPOINT record')
+                        rejects.add(table, row, e)
+            cursor.execute('RELEASE SAVEPOINT batch')
+    connection.commit()
+    return inserted
+
+def run_plan(tasks, parents, workers=4):
+    """Runs each table's shard loaders on a thread pool, starting a table once all of its parents have finished.
+
+    Args:
+        tasks (dict): Table -> list of callables loading a shard of the table (an empty list finishes at once)
+        parents (dict): Table -> tables it references (foreign keys), which must be loaded first
+        workers (int): Maximum number of shards loading at the same time
+
+    Returns:
+        dict: Table -> wall time (seconds) from its first shard starting to its last shard finishing
+    """
+
+    pending, done, timings = dict(tasks), set(), {}
+    remaining, started = {}, {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        running = {}
+        while pending or running:
+            # Start every table whose parents are loaded (tables without rows finish at once, readying others)
+            ready = [table for table in pending if set(parents.get(table, ())) <= done]
+            while ready:
+                for table in ready:
+                    shards = pending.pop(table)
+                    started[table], remaining[table] = time.perf_counter(), len(shards)
+                    if not shards:
+                        done.add(table)
+                        timings[table] = 0.0
+                    for shard in shards:
+                        running[executor.submit(shard)] = table
+                ready = [table for table in pending if set(parents.get(table, ())) <= done]
+            if not running:
+                if pending:
+                    raise ValueError(f'Tables with unloadable parents: {sorted(pending)}')
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                table = running.pop(future)
+                future.result()  # Re-raises connection-level failures (row-level ones are quarantined)
+                remaining[table] -= 1
+                if not remaining[table]:
+                    done.add(table)
+                    timings[table] = time.perf_counter() - started[table]
+                    logging.info(f'Loaded {table} in {timings[table]:.2f}s.')
+    return timings
@@ -0,0 +1,157 @@
+### HOW TO USE: Call migrate(connection) to bring the nba3k schema up to the latest version before loading, then
+### drop_indexes/create_indexes around bulk loads & refresh_views once the new rows are committed (see DBClient).
+
+import logging
+from cleaners.generate_player_season_aggregate import AGGREGATE_STATS, PERCENTAGE_STATS
+
+SCHEMA = 'nba3k'
+
+def _season_aggregate_sql(schema):
+    """Builds the per-player regular-season aggregates view (same totals as the player_season_aggregate cleaner)."""
+    totals = ',\n'.join(
+        '        SUM(ps.offensive_rebounds + ps.defensive_rebounds) AS rebounds' if stat == 'rebounds' else
+        f'        SUM(ps.{stat}) AS {stat}' for stat in AGGREGATE_STATS
+    )
+    percentages = ',\n'.join(
+        f'        ROUND(100.0 * SUM(ps.{made}) / NULLIF(SUM(ps.{attempted}), 0), 2) AS "{pct}"'
+        for pct, (made, attempted) in PERCENTAGE_STATS.items()
+    )
+    return f'''CREATE MATERIALIZED VIEW IF NOT EXISTS {schema}.player_season_aggregate AS
+    SELECT ps.player_id, f.season, COUNT(*) AS games, ROUND(SUM(ps.seconds_played) / 60.0, 1) AS minutes,
+{totals},
+{percentages}
+    FROM {schema}.player_statistic ps
+    JOIN {schema}.fixture f ON f.fixture_id = ps.fixture_id
+    WHERE f.game_type = 'regular-season' AND ps.seconds_played > 0
+    GROUP BY ps.player_id, f.season
+    WITH NO DATA'''
+
+def migrations(schema=SCHEMA):
+    """Returns the versioned DDL steps as (version, description, statements), applied in version order."""
+    return [
+        (1, 'create tables', [
+            f'CREATE SCHEMA IF NOT EXISTS {schema}',
+            f'''CREATE TABLE IF NOT EXISTS {schema}.league (
+                league_id integer PRIMARY KEY, name text NOT NULL, shortname text, created_at timestamp)''',
+            f'''CREATE TABLE IF NOT EXISTS {schema}.team (
+                team_id bigint PRIMARY KEY, league_id integer, name text, shortname text, city text, state text,
+                conference text, division text, created_at timestamp)''',
+            f'''CREATE TABLE IF NOT EXISTS {schema}.player (
+                player_id integer PRIMARY KEY, first_name text, last_name text, birth_year integer,
+                draft_year integer, draft_pick integer, created_at timestamp)''',
+            f'''CREATE TABLE IF NOT EXISTS {schema}.player_position (
+                player_id integer NOT NULL, season integer NOT NULL, position_primary text, position_secondary text,
+                position_tertiary text, created_at timestamp, PRIMARY KEY (player_id, season))''',
+            f'''CREATE TABLE IF NOT EXISTS {schema}.player_team (
+                player_team_id serial PRIMARY KEY, team_id bigint, player_id integer NOT NULL, created_at timestamp)''',
+            f'''CREATE TABLE IF NOT EXISTS {schema}.fixture (
+                fixture_id integer PRIMARY KEY, home_team_id bigint, away_team_id bigint, season integer,
+                played_on date, game_type text, home_team_score numeric, away_team_score numeric,
+                home_team_win boolean, away_team_win boolean, created_at timestamp)''',
+            f'''CREATE TABLE IF NOT EXISTS {schema}.player_statistic (
+                player_statistic_id serial PRIMARY KEY, player_id integer NOT NULL, fixture_id integer NOT NULL,
+                player_status text, is_starter boolean, seconds_played integer, points numeric,
+                threes_attempted numeric, threes_made numeric, field_goals_attempted numeric,
+                field_goals_made numeric, free_throws_attempted numeric, free_throws_made numeric,
+                offensive_rebounds numeric, defensive_rebounds numeric, assists numeric, steals numeric,
+                blocks numeric, turnovers numeric, created_at timestamp)'''
+        ]),
+        # named as Postgres names FKs by default, so constraints the existing RDS schema already has are skipped
+        (2, 'add foreign keys', [
+            f'''DO $$ BEGIN
+                ALTER TABLE {schema}.{table} ADD CONSTRAINT {table}_{column}_fkey
+                    FOREIGN KEY ({column}) REFERENCES {schema}.{parent} ({parent_column});
+            EXCEPTION WHEN duplicate_object THEN NULL;
+            END $$'''
+            for table, column, parent, parent_column in [
+                ('team', 'league_id', 'league', 'league_id'),
+                ('player_position', 'player_id', 'player', 'player_id'),
+                ('player_team', 'player_id', 'player', 'player_id'),
+                ('player_team', 'team_id', 'team', 'team_id'),
+                ('fixture', 'home_team_id', 'team', 'team_id'),
+                ('fixture', 'away_team_id', 'team', 'team_id'),
+                ('player_statistic', 'player_id', 'player', 'player_id'),
+                ('player_statistic', 'fixture_id', 'fixture', 'fixture_id')
+            ]
+        ]),
+        (3, 'add player season aggregates view', [
+            _season_aggregate_sql(schema),
+            # A unique index is what allows the view to be refreshed concurrently (reads aren't blocked)
+            f'''CREATE UNIQUE INDEX IF NOT EXISTS player_season_aggregate_key
+                ON {schema}.player_season_aggregate (player_id, season)'''
+        ])
+    ]
+
+# Secondary indexes on the player_id, fixture_id & played_on access paths as (name, table, columns); they are dropped
+# before bulk loads & rebuilt in one pass afterwards, rather than maintained row by row during the inserts
+INDEXES = [
+    ('player_statistic_player_fixture_idx', 'player_statistic', 'player_id, fixture_id'),
+    ('player_statistic_fixture_idx', 'player_statistic', 'fixture_id'),
+    ('fixture_played_on_idx', 'fixture', 'played_on, fixture_id'),
+    ('player_team_player_idx', 'player_team', 'player_id'),
+]
+MATERIALIZED_VIEWS = ['player_season_aggregate']
+
+def applied_versions(connection, schema=SCHEMA):
+    """Returns the set of migration versions already applied (creating the version table if needed)."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE SCHEMA IF NOT EXISTS {schema}')
+        cursor.execute(f'''CREATE TABLE IF NOT EXISTS {schema}.schema_version (
+            version integer PRIMARY KEY, description text, applied_at timestamp DEFAULT now())''')
+        cursor.execute(f'SELECT version FROM {schema}.schema_version')
+        versions = {row[0] for row in cursor.fetchall()}
+    connection.commit()
+    return versions
+
+def migrate(connection, schema=SCHEMA, target=None):
+    """Applies the pending migrations (up to target, or all) in order, each in its own transaction.
+
+    Returns:
+        list: Versions applied by this call
+    """
+
+    done = applied_versions(connection, schema)
+    applied = []
+    for version, description, statements in migrations(schema):
+        if version in done or (target is not None and version > target):
+            continue
+        logging.info(f'Applying schema migration {version}: {description}...')
+        try:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+                cursor.execute(f'INSERT INTO {schema}.schema_version (version, description) VALUES (%s, %s)',
+                               (version, description))
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        applied.append(version)
+    return applied
+
+def drop_indexes(connection, schema=SCHEMA):
+    """Drops the secondary indexes ahead of a bulk load."""
+    with connection.cursor() as cursor:
+        for name, _, _ in INDEXES:
+            cursor.execute(f'DROP INDEX IF EXISTS {schema}.{name}')
+    connection.commit()
+
+def create_indexes(connection, schema=SCHEMA):
+    """Builds the secondary indexes after a bulk load & refreshes the planner statistics of the indexed tables."""
+    with connection.cursor() as cursor:
+        for name, table, columns in INDEXES:
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {schema}.{table} ({columns})')
+        for table in sorted({table for _, table, _ in INDEXES}):
+            cursor.execute(f'ANALYZE {schema}.{table}')
+    connection.commit()
+
+def refresh_views(connection, schema=SCHEMA):
+    """Refreshes the materialized views, concurrently once populated (the first refresh has to be a plain one)."""
+    with connection.cursor() as cursor:
+        for view in MATERIALIZED_VIEWS:
+            cursor.execute('SELECT ispopulated FROM pg_matviews WHERE schemaname = %s AND matviewname = %s',
+                           (schema, view))
+            row = cursor.fetchone()
+            concurrently = ' CONCURRENTLY' if row and row[0] else ''
+            cursor.execute(f'REFRESH MATERIALIZED VIEW{concurrently} {schema}.{view}')
+    connection.commit()
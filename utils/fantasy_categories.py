@@ -0,0 +1,9 @@
+### HOW TO USE: Import the constants shared by the fantasy tools (draft simulator, matchup projector, projections,
+### valuation, waivers & trades) to keep their stats matrices & 9-cat columns in the same order.
+
+# Raw season totals used to score the rosters, in the order of the stats matrix
+TOTALS = ['field_goals_made', 'field_goals_attempted', 'threes_made', 'free_throws_made', 'free_throws_attempted',
+          'rebounds', 'assists', 'steals', 'blocks', 'points', 'turnovers']
+
+# 9-cat head-to-head categories, in the order the roster totals are scored
+CATEGORIES = ['fg%', 'threes_made', 'ft%', 'rebounds', 'assists', 'steals', 'blocks', 'points', 'turnovers']
@@ -1,22 +1,167 @@
-from datetime import datetime
+"""Encodes & decodes NBA game identifiers for whole columns (NumPy arrays / pandas Series) or single values.
+
+Two formats are supported:
+	* Fixture IDs (YYPNNNNN), used throughout the processed data, re-ordered from the raw NBA IDs (PYYNNNNN)
+	* Schedule IDs (SSPDDDGG), built from a game's season, phase, day in year & game number on that day
+
+All functions rely on integer arithmetic only, so they accept Python ints, NumPy arrays & pandas Series alike and
+return a value of the same kind (nullable pandas integer columns keep their missing values).
+"""
+import numpy as np
+import pandas as pd
+
+# Season phase digits, as used by the NBA in raw game IDs
+PRE_SEASON = 1
+REGULAR_SEASON = 2
+ALL_STAR = 3
+POST_SEASON = 4
+PLAY_IN = 5
+PHASES = (PRE_SEASON, REGULAR_SEASON, ALL_STAR, POST_SEASON, PLAY_IN)
+
+# Positional multipliers for each of the encoded fields
+_SEASON_FACTOR = 10 ** 6
+_PHASE_FACTOR = 10 ** 5
+_RAW_PHASE_FACTOR = 10 ** 7
+_DAY_FACTOR = 10 ** 2
+
+def _as_values(values):
+	"""Converts list/tuple input into a NumPy array; leaves scalars, arrays & Series untouched."""
+	if isinstance(values, (list, tuple)):
+		return np.asarray(values, dtype=np.int64)
+	return values
+
+def _validate(values, low, high, field):
+	"""Raises a ValueError if any (non-missing) value of the given field falls outside of [low, high]."""
+	arr = np.asarray(pd.Series(values).dropna() if isinstance(values, pd.Series) else values)
+	if arr.size and (np.min(arr) < low or np.max(arr) > high):
+		raise ValueError(f'{field} must be between {low} and {high}')
+
+def raw_to_fixture_id(raw_ids):
+	"""Re-orders raw NBA game IDs (PYYNNNNN) into fixture IDs (YYPNNNNN).
+
+	Args:
+		raw_ids (int, list, np.ndarray, pd.Series): Raw game IDs, e.g. 21700001
+
+	Returns:
+		Fixture IDs of the same kind as the input, e.g. 17200001
+	"""
+	raw_ids = _as_values(raw_ids)
+	phase = raw_ids // _RAW_PHASE_FACTOR
+	season = raw_ids // _PHASE_FACTOR % 100
+	return season * _SEASON_FACTOR + phase * _PHASE_FACTOR + raw_ids % _PHASE_FACTOR
+
+def fixture_to_raw_id(fixture_ids):
+	"""Re-orders fixture IDs (YYPNNNNN) back into raw NBA game IDs (PYYNNNNN).
 
-def generate_game_id(games):
-	"""Generates a string representation for a game with the format SS-P-DDD-GG where S: 2-year season identifier, 
-	P: season phase (1: pre-season, 2: regular season, 3: post-season), DDD: day in year, GG: game number 
-	
 	Args:
-		games (list): A list of games for which game ids should be generated
+		fixture_ids (int, list, np.ndarray, pd.Series): Fixture IDs, e.g. 17200001
 
 	Returns:
-		str: The game id string representation
+		Raw game IDs of the same kind as the input, e.g. 21700001
 	"""
+	fixture_ids = _as_values(fixture_ids)
+	season = fixture_ids // _SEASON_FACTOR
+	phase = fixture_ids // _PHASE_FACTOR % 10
+	return phase * _RAW_PHASE_FACTOR + season * _PHASE_FACTOR + fixture_ids % _PHASE_FACTOR
+
+def encode_fixture_id(season, phase, game_number):
+	"""Builds fixture IDs (YYPNNNNN) from their components.
+
+	Args:
+		season: 2 or 4-digit starting year(s) of the season, e.g. 2017 or 17
+		phase: Season phase digit(s), one of PHASES
+		game_number: Game number(s) within the season phase (1 - 99999)
+
+	Returns:
+		Fixture IDs of the same kind as the input
+	"""
+	season, phase, game_number = _as_values(season), _as_values(phase), _as_values(game_number)
+	_validate(phase, PRE_SEASON, PLAY_IN, 'phase')
+	_validate(game_number, 0, _PHASE_FACTOR - 1, 'game_number')
+	return season % 100 * _SEASON_FACTOR + phase * _PHASE_FACTOR + game_number
+
+def decode_fixture_id(fixture_ids):
+	"""Splits fixture IDs (YYPNNNNN) into their components.
+
+	Args:
+		fixture_ids (int, list, np.ndarray, pd.Series): Fixture IDs, e.g. 17200001
 
-	game_number = 1
-	for g in games:
-		#TODO: Use list indexing to get the correct values
-		# trim the season to 2-digit (last 2)
-		# obtain the season phase from mapping
-		# convert the game date to true date and calculate the day in the year from the date
-		game_day = datetime.strptime(games[X])
-	# 
-	pass
\ No newline at end of file
+	Returns:
+		tuple: (4-digit season, phase, game number), each of the same kind as the input
+	"""
+	return fixture_season(fixture_ids), fixture_phase(fixture_ids), _as_values(fixture_ids) % _PHASE_FACTOR
+
+def fixture_season(fixture_ids):
+	"""Returns the 4-digit starting year of the season for the given fixture IDs."""
+	return _as_values(fixture_ids) // _SEASON_FACTOR + 2000
+
+def fixture_phase(fixture_ids):
+	"""Returns the season phase digit for the given fixture IDs."""
+	return _as_values(fixture_ids) // _PHASE_FACTOR % 10
+
+def is_regular_season(fixture_ids):
+	"""Returns a boolean mask flagging the fixture IDs that belong to regular-season games."""
+	return fixture_phase(fixture_ids) == REGULAR_SEASON
+
+def _day_of_year(dates):
+	"""Returns the day in year (1 - 366) for a date, datetime64 array or datetime Series."""
+	if isinstance(dates, pd.Series):
+		return pd.to_datetime(dates).dt.dayofyear
+	if np.ndim(dates) == 0:
+		return pd.Timestamp(dates).dayofyear
+	days = np.asarray(dates, dtype='datetime64[D]')
+	return (days - days.astype('datetime64[Y]')).astype(np.int64) + 1
+
+def _number_games(base_ids):
+	"""Numbers games (starting at 1) in input order within each group of equal season/phase/day IDs."""
+	base_ids = np.asarray(base_ids, dtype=np.int64)
+	order = np.argsort(base_ids, kind='stable')
+	sorted_ids = base_ids[order]
+	is_start = np.r_[True, sorted_ids[1:] != sorted_ids[:-1]]
+	group_start = np.maximum.accumulate(np.where(is_start, np.arange(len(sorted_ids)), 0))
+	numbers = np.empty(len(base_ids), dtype=np.int64)
+	numbers[order] = np.arange(len(sorted_ids)) - group_start + 1
+	return numbers
+
+def generate_game_id(seasons, phases, dates, game_numbers=None):
+	"""Generates integer schedule IDs for games with the format SSPDDDGG where SS: 2-digit season identifier,
+	P: season phase (see PHASES), DDD: day in year, GG: game number on that day
+
+	Args:
+		seasons: 2 or 4-digit starting year(s) of the season
+		phases: Season phase digit(s), one of PHASES
+		dates: Date(s) the games were played on (date, str, datetime64 array or Series)
+		game_numbers: Game number(s) on that day (1 - 99); numbered in input order when not provided
+
+	Returns:
+		The schedule ID(s) of the same kind as the input
+	"""
+	seasons, phases = _as_values(seasons), _as_values(phases)
+	if isinstance(dates, (list, tuple)):
+		dates = np.asarray(dates, dtype='datetime64[D]')
+	_validate(phases, PRE_SEASON, PLAY_IN, 'phase')
+
+	base_ids = (seasons % 100 * 10 + phases) * 1000 + _day_of_year(dates)
+	if game_numbers is None:
+		game_numbers = 1 if np.ndim(base_ids) == 0 else _number_games(base_ids)
+	game_numbers = _as_values(game_numbers)
+	_validate(game_numbers, 0, _DAY_FACTOR - 1, 'game_number')
+
+	return base_ids * _DAY_FACTOR + game_numbers
+
+def decode_game_id(game_ids):
+	"""Splits schedule IDs (SSPDDDGG) into their components.
+
+	Args:
+		game_ids (int, list, np.ndarray, pd.Series): Schedule IDs, e.g. 17228703
+
+	Returns:
+		tuple: (4-digit season, phase, day in year, game number), each of the same kind as the input
+	"""
+	game_ids = _as_values(game_ids)
+	return (
+		game_ids // _SEASON_FACTOR + 2000,
+		game_ids // _PHASE_FACTOR % 10,
+		game_ids // _DAY_FACTOR % 1000,
+		game_ids % _DAY_FACTOR
+	)
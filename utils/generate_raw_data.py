@@ -0,0 +1,335 @@
+### HOW TO USE: Call generate(output_path, seasons, players, seed) (or run this module with -h from the repo root) to
+### write a reproducible synthetic copy of the raw CSVs at any scale, then point execute_cleaners --raw at it.
+
+import os
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+
+RAW_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'raw')
+OUTPUT_PATH = './data/synthetic/raw/'
+
+FIRST_SEASON = 2003
+LAST_SEASON = 2099  # Raw & fixture IDs only keep 2 digits of the season, so synthetic seasons stop at 2099
+TEAMS = 30
+ROSTER_SIZE = 15  # Average players per team & season when players allow it (rows per team per game)
+GAMES_PER_TEAM = 82
+TEAM_SECONDS = 240 * 60  # Playing time shared by the players of a team in a game (5 players x 48 minutes)
+PRESEASON_GAMES = 60
+PLAYOFF_GAMES = 80
+
+DETAIL_COLUMNS = [
+    'GAME_ID', 'TEAM_ID', 'TEAM_ABBREVIATION', 'TEAM_CITY', 'PLAYER_ID', 'PLAYER_NAME', 'START_POSITION', 'COMMENT',
+    'MIN', 'FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB', 'AST',
+    'STL', 'BLK', 'TO', 'PF', 'PTS', 'PLUS_MINUS'
+]
+GAMES_COLUMNS = [
+    'GAME_DATE_EST', 'GAME_ID', 'GAME_STATUS_TEXT', 'HOME_TEAM_ID', 'VISITOR_TEAM_ID', 'SEASON', 'TEAM_ID_home',
+    'PTS_home', 'FG_PCT_home', 'FT_PCT_home', 'FG3_PCT_home', 'AST_home', 'REB_home', 'TEAM_ID_away', 'PTS_away',
+    'FG_PCT_away', 'FT_PCT_away', 'FG3_PCT_away', 'AST_away', 'REB_away', 'HOME_TEAM_WINS'
+]
+
+# League-average per-minute rates & shooting percentages (every player gets their own multiplier of each rate)
+PER_MINUTE_RATES = {'FGA': 0.38, 'FTA': 0.1, 'OREB': 0.045, 'DREB': 0.15, 'AST': 0.09, 'STL': 0.03, 'BLK': 0.02,
+                    'TO': 0.055, 'PF': 0.08}
+THREE_SHARE, TWO_PCT, THREE_PCT, FT_PCT = 0.33, 0.5, 0.35, 0.76
+
+# Share of rows without playing time & comments they carry (weights follow the statuses found in the real data)
+ABSENT_SHARE = 0.14
+COMMENTS = [
+    ("DNP - Coach's Decision", 0.52), ("DND - Injury/Illness", 0.06), ('DNP - Left Ankle Sprain', 0.05),
+    ('DNP - Right Knee Soreness', 0.05), ('DNP - Injury/Illness', 0.04), ('DNP - Rest', 0.05),
+    ('DND - Load Management', 0.02), ('NWT - Personal Reasons', 0.03), ('NWT - G League - On Assignment', 0.04),
+    ('NWT - Trade Pending', 0.01), ('DNP - Illness', 0.03), ('DND - Flu', 0.01),
+    ('DND - Health and Safety Protocols', 0.03),
+    ('DNP - Suspended', 0.01), ('DNP', 0.02), ('DND', 0.01), ('NWT -', 0.01), ('Inactive', 0.01)
+]
+PLAIN_MINUTES_SHARE = 0.03  # Rows recording whole minutes only ('12' instead of '12:00'), as in the older seasons
+POSITIONS = ['PG', 'SG', 'SF', 'PF', 'C']
+POSITION_SPANS = [0.35, 0.6, 0.05]  # Share of players listed at 1, 2 or 3 neighbouring positions (e.g. 'SG-SF-PF')
+START_POSITIONS = np.array(['G', 'G', 'F', 'F', 'C'], dtype=object)
+
+FIRST_NAMES = [
+    'Aaron', 'Andre', 'Anthony', 'Ben', 'Brandon', 'Caleb', 'Chris', 'Darius', 'David', 'DeAndre', 'Derrick', 'Devin',
+    'Dwight', 'Eric', 'Evan', 'Gary', 'Isaiah', 'Jalen', 'Jamal', 'James', 'Jaylen', 'Jordan', 'Josh', 'Justin',
+    'Kevin', 'Kyle', 'Lamar', 'Luka', 'Malik', 'Marcus', 'Mike', 'Nikola', 'Omar', 'Paul', 'Rudy', 'Russell', 'Terry',
+    'Tobias', 'Trae', 'Tyler'
+]
+SURNAME_SYLLABLES = [
+    'al', 'ben', 'car', 'dor', 'el', 'fin', 'gar', 'hol', 'ic', 'jan', 'kov', 'lan', 'mor', 'nel', 'os', 'per', 'ros',
+    'son', 'tor', 'val', 'ward', 'well', 'ley', 'dix', 'ton', 'man', 'ic', 'ard', 'berg', 'ez'
+]
+
+def player_names(players, rng):
+    """Draws unique 'First Last' names (surnames are built from two syllables) for the given number of players."""
+    capacity = len(FIRST_NAMES) * len(SURNAME_SYLLABLES) ** 2
+    if players > capacity:
+        raise ValueError(f'players must be at most {capacity}')
+    codes = rng.choice(capacity, players, replace=False)
+    first, surname = np.divmod(codes, len(SURNAME_SYLLABLES) ** 2)
+    syllable_1, syllable_2 = np.divmod(surname, len(SURNAME_SYLLABLES))
+    names = [f'{FIRST_NAMES[f]} {SURNAME_SYLLABLES[a].capitalize()}{SURNAME_SYLLABLES[b]}'
+             for f, a, b in zip(first, syllable_1, syllable_2)]
+    if len(set(names)) < players:  # Repeated syllables can spell the same surname twice; number the duplicates
+        names = pd.Series(names)
+        dupes = names.groupby(names).cumcount()
+        names = names.where(dupes == 0, names + ' ' + (dupes + 1).astype(str))
+        names = names.tolist()
+    return names
+
+def season_calendar(seasons, rng):
+    """Builds season_calendar rows (start, all-star break & end of each regular season) for the given seasons."""
+    starts = pd.to_datetime([f'{season}-10-20' for season in seasons]) + pd.to_timedelta(
+        rng.integers(0, 14, len(seasons)), unit='D')
+    return pd.DataFrame({
+        'season': seasons,
+        'regular_season_start': starts,
+        'all_star_break': starts + pd.Timedelta(days=112),
+        'regular_season_end': starts + pd.Timedelta(days=172)
+    })
+
+def _roster_rows(teams, roster_order, roster_start, roster_size):
+    """Expands one team per game into (game position, player index) pairs covering the team's whole roster."""
+    counts = roster_size[teams]
+    game_pos = np.repeat(np.arange(len(teams)), counts)
+    within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return game_pos, roster_order[np.repeat(roster_start[teams], counts) + within]
+
+class RawDataGenerator:
+    """Generates raw games, games_details & player CSVs shaped like the Kaggle/BM sources, one season at a time."""
+
+    def __init__(self, seasons=18, players=2400, first_season=FIRST_SEASON, seed=0):
+        if seasons < 1 or first_season + seasons - 1 > LAST_SEASON:
+            raise ValueError(f'seasons must fit between {first_season} and {LAST_SEASON}')
+        self.seasons = np.arange(first_season, first_season + seasons)
+        self.rng = np.random.default_rng(seed)
+        self.teams = pd.read_csv(os.path.join(RAW_PATH, 'teams.csv'), sep=',', header=0, encoding='utf-8', dtype=str)
+        self.nba_teams = pd.read_csv(os.path.join(RAW_PATH, 'nba_teams.csv'), sep=',', header=0, encoding='utf-8')
+        self.team_ids = self.teams['TEAM_ID'].astype(np.int64).to_numpy()
+        self.calendar = season_calendar(self.seasons, self.rng)
+
+        # Player attributes: careers sized so rosters average ROSTER_SIZE players, then talent & per-minute rates
+        rng = self.rng
+        self.names = np.array(player_names(players, rng), dtype=object)
+        active = ROSTER_SIZE * TEAMS
+        career = seasons if players <= active else min(active * (seasons - 1) / (players - active), seasons)
+        length = np.minimum(1 + rng.poisson(max(career - 1, 0), players), seasons)
+        self.career_start = rng.integers(first_season - length + 1, first_season + seasons)
+        self.career_end = self.career_start + length - 1
+        self.minutes = np.clip(rng.normal(20, 9, players), 4, 38)
+        self.rates = rng.lognormal(0, 0.35, (players, len(PER_MINUTE_RATES))) * np.array(
+            list(PER_MINUTE_RATES.values()))
+        self.shooting = np.clip(rng.normal([THREE_SHARE, TWO_PCT, THREE_PCT, FT_PCT], [0.15, 0.05, 0.05, 0.08],
+                                           (players, 4)), 0.01, 0.95)
+        span = rng.choice(len(POSITION_SPANS), players, p=POSITION_SPANS) + 1
+        first = np.minimum(rng.integers(0, len(POSITIONS), players), len(POSITIONS) - span)
+        self.positions = np.array(['-'.join(POSITIONS[f:f + n]) for f, n in zip(first, span)], dtype=object)
+        self.birth_year = self.career_start - rng.integers(19, 24, players)
+        self.player_team = np.zeros(players, dtype=np.int64)
+
+    def schedule(self, season, calendar_row):
+        """Builds one season of games (pre-season, regular season & playoffs) with raw IDs, dates & teams."""
+        rng = self.rng
+        start, end = calendar_row['regular_season_start'], calendar_row['regular_season_end']
+        phases = [(1, PRESEASON_GAMES, start - pd.Timedelta(days=21), 19),
+                  (2, TEAMS * GAMES_PER_TEAM // 2, start, (end - start).days + 1),
+                  (4, PLAYOFF_GAMES, end + pd.Timedelta(days=4), 60)]
+        frames = []
+        for phase, games, first_day, days in phases:
+            home = rng.integers(0, TEAMS, games)
+            frames.append(pd.DataFrame({
+                'GAME_DATE_EST': first_day + pd.to_timedelta(np.sort(rng.integers(0, days, games)), unit='D'),
+                'GAME_ID': phase * 10 ** 7 + season % 100 * 10 ** 5 + np.arange(1, games + 1),
+                'home': home,
+                'away': (home + rng.integers(1, TEAMS, games)) % TEAMS
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+    def rosters(self, season):
+        """Spreads the players active during the season evenly over the teams (fresh random draft every season)."""
+        active = np.flatnonzero((self.career_start <= season) & (self.career_end >= season))
+        active = self.rng.permutation(active)
+        self.player_team[active] = np.arange(len(active)) % TEAMS
+        roster_order = active[np.argsort(self.player_team[active], kind='stable')]
+        roster_size = np.bincount(self.player_team[active], minlength=TEAMS)
+        return roster_order, np.cumsum(roster_size) - roster_size, roster_size
+
+    def generate_season(self, season, calendar_row):
+        """Returns the raw games & games_details dataframes of one season."""
+        rng = self.rng
+        games = self.schedule(season, calendar_row)
+        roster_order, roster_start, roster_size = self.rosters(season)
+
+        # One row per rostered player of both teams of each game
+        home_pos, home_players = _roster_rows(games['home'].to_numpy(), roster_order, roster_start, roster_size)
+        away_pos, away_players = _roster_rows(games['away'].to_numpy(), roster_order, roster_start, roster_size)
+        game_pos, player = np.concatenate([home_pos, away_pos]), np.concatenate([home_players, away_players])
+        is_home = np.r_[np.ones(len(home_pos), bool), np.zeros(len(away_pos), bool)]
+        order = np.lexsort((~is_home, game_pos))
+        game_pos, player, is_home = game_pos[order], player[order], is_home[order]
+        team = np.where(is_home, games['home'].to_numpy()[game_pos], games['away'].to_numpy()[game_pos])
+        rows = len(player)
+
+        # Playing time & box score counts (absent players keep empty stats, like the source data)
+        played = rng.random(rows) >= ABSENT_SHARE
+        side = game_pos * 2 + ~is_home
+        seconds = np.where(played, np.clip(rng.normal(self.minutes[player], 6), 0.5, None), 0)
+        team_seconds = np.bincount(side, weights=seconds, minlength=len(games) * 2)
+        seconds = np.minimum(seconds * TEAM_SECONDS / np.maximum(team_seconds[side], 1), 2880).astype(np.int64)
+        minutes = seconds / 60
+        counts = rng.poisson(self.rates[player] * minutes[:, None])
+        stats = dict(zip(PER_MINUTE_RATES, counts.T))
+        shooting = self.shooting[player]
+        stats['FG3A'] = rng.binomial(stats['FGA'], shooting[:, 0])
+        stats['FG3M'] = rng.binomial(stats['FG3A'], shooting[:, 2])
+        two_made = rng.binomial(stats['FGA'] - stats['FG3A'], shooting[:, 1])
+        stats['FGM'] = two_made + stats['FG3M']
+        stats['FTM'] = rng.binomial(stats['FTA'], shooting[:, 3])
+        stats['REB'] = stats['OREB'] + stats['DREB']
+        stats['PTS'] = 2 * two_made + 3 * stats['FG3M'] + stats['FTM']
+
+        # No ties in basketball: the first home player on the floor of a tied game hits an extra free throw
+        points = np.bincount(side, weights=stats['PTS'], minlength=len(games) * 2).reshape(-1, 2)
+        tied = np.flatnonzero(points[:, 0] == points[:, 1])
+        candidates = np.flatnonzero(np.isin(game_pos, tied) & is_home & played)
+        winners = candidates[np.unique(game_pos[candidates], return_index=True)[1]]
+        for col in ('FTA', 'FTM', 'PTS'):
+            stats[col][winners] += 1
+
+        details = pd.DataFrame({
+            'GAME_ID': games['GAME_ID'].to_numpy()[game_pos],
+            'TEAM_ID': self.team_ids[team],
+            'TEAM_ABBREVIATION': self.teams['ABBREVIATION'].to_numpy()[team],
+            'TEAM_CITY': self.teams['CITY'].to_numpy()[team],
+            'PLAYER_ID': 1000000 + player,
+            'PLAYER_NAME': self.names[player]
+        })
+        details['START_POSITION'] = self._start_positions(game_pos, is_home, seconds)
+        comments = rng.choice(len(COMMENTS), rows, p=np.array([w for _, w in COMMENTS]) / sum(w for _, w in COMMENTS))
+        details['COMMENT'] = np.where(played, None, np.array([c for c, _ in COMMENTS], dtype=object)[comments])
+        details['MIN'] = self._minutes_played(seconds, played)
+        for col in ['FGM', 'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA', 'FT_PCT', 'OREB', 'DREB', 'REB',
+                    'AST', 'STL', 'BLK', 'TO', 'PF', 'PTS']:
+            if col.endswith('_PCT'):
+                made, attempted = stats[col[:-4] + 'M'], stats[col[:-4] + 'A']
+                values = np.round(np.divide(made, attempted, out=np.zeros(rows), where=attempted > 0), 3)
+            else:
+                values = stats[col].astype(float)
+            details[col] = np.where(played, values, np.nan)
+        margin = (points[:, 0] - points[:, 1])[game_pos]
+        details['PLUS_MINUS'] = np.where(
+            played, np.round(np.where(is_home, margin, -margin) * seconds / 2880 + rng.normal(0, 4, rows)), np.nan)
+
+        return self._games_table(season, games, details, is_home), details[DETAIL_COLUMNS]
+
+    def _start_positions(self, game_pos, is_home, seconds):
+        """Marks the 5 players with the most playing time of each team & game as starters (G, G, F, F, C)."""
+        order = np.lexsort((-seconds, ~is_home, game_pos))
+        group = (game_pos * 2 + ~is_home)[order]
+        rank = np.arange(len(order)) - np.maximum.accumulate(np.where(np.r_[True, group[1:] != group[:-1]],
+                                                                      np.arange(len(order)), 0))
+        positions = np.full(len(order), None, dtype=object)
+        starters = order[(rank < 5) & (seconds[order] > 0)]
+        positions[starters] = START_POSITIONS[rank[(rank < 5) & (seconds[order] > 0)]]
+        return positions
+
+    def _minutes_played(self, seconds, played):
+        """Formats playing time as 'MM:SS' strings, a few as whole minutes only & absent players as missing."""
+        text = pd.Series(seconds // 60).astype(str)
+        plain = self.rng.random(len(seconds)) < PLAIN_MINUTES_SHARE
+        text = text.where(plain, text + ':' + pd.Series(seconds % 60).astype(str).str.zfill(2))
+        return text.where(played, None).to_numpy()
+
+    def _games_table(self, season, games, details, is_home):
+        """Aggregates the team box scores of each game into the raw games.csv layout."""
+        totals = details.assign(home=is_home).groupby(['GAME_ID', 'home'])[
+            ['PTS', 'FGM', 'FGA', 'FTM', 'FTA', 'FG3M', 'FG3A', 'AST', 'REB']].sum().unstack('home')
+        totals = totals.reindex(games['GAME_ID']).fillna(0)
+        games_df = pd.DataFrame({
+            'GAME_DATE_EST': games['GAME_DATE_EST'].dt.strftime('%Y-%m-%d'),
+            'GAME_ID': games['GAME_ID'],
+            'GAME_STATUS_TEXT': 'Final',
+            'HOME_TEAM_ID': self.team_ids[games['home']],
+            'VISITOR_TEAM_ID': self.team_ids[games['away']],
+            'SEASON': season
+        })
+        for side, flag in (('home', True), ('away', False)):
+            side_totals = totals.xs(flag, axis=1, level='home') if flag in totals.columns.levels[1] else totals * 0
+            games_df[f'TEAM_ID_{side}'] = games_df['HOME_TEAM_ID' if flag else 'VISITOR_TEAM_ID']
+            games_df[f'PTS_{side}'] = side_totals['PTS'].to_numpy().astype(np.int64)
+            for pct, made, attempted in (('FG', 'FGM', 'FGA'), ('FT', 'FTM', 'FTA'), ('FG3', 'FG3M', 'FG3A')):
+                games_df[f'{pct}_PCT_{side}'] = np.round(
+                    side_totals[made].to_numpy() / np.maximum(side_totals[attempted].to_numpy(), 1), 3)
+            games_df[f'AST_{side}'] = side_totals['AST'].to_numpy().astype(np.int64)
+            games_df[f'REB_{side}'] = side_totals['REB'].to_numpy().astype(np.int64)
+        games_df['HOME_TEAM_WINS'] = (games_df['PTS_home'] > games_df['PTS_away']).astype(int)
+        return games_df[GAMES_COLUMNS]
+
+    def player_data(self):
+        """Builds player_data.csv (name, team, position, age & draft) for the players of the latest season, ranked by
+        playing time like the source list."""
+        rng = self.rng
+        last_season = self.seasons[-1]
+        current = np.flatnonzero((self.career_start <= last_season) & (self.career_end >= last_season))
+        current = current[np.argsort(-self.minutes[current], kind='stable')]
+        drafted = rng.random(len(current)) < 0.8
+        draft = pd.Series(self.career_start[current] - 1).astype(str) + ' ' + pd.Series(
+            rng.integers(1, 61, len(current))).astype(str)
+        return pd.DataFrame({
+            'Name': self.names[current],
+            'Team': self.teams['ABBREVIATION'].to_numpy()[self.player_team[current]],
+            'Pos': self.positions[current],
+            'Age': np.round(last_season + 1.55 - self.birth_year[current] - rng.random(len(current)), 1),
+            'Draft': draft.where(drafted, None).to_numpy()
+        })
+
+    def write(self, output_path=OUTPUT_PATH):
+        """Writes all raw CSVs into output_path, appending games & games_details one season at a time.
+
+        Returns:
+            dict: Number of rows written per file name
+        """
+        os.makedirs(output_path, exist_ok=True)
+        written = {'games.csv': 0, 'games_details.csv': 0}
+        for i, calendar_row in self.calendar.iterrows():
+            season = int(calendar_row['season'])
+            games_df, details_df = self.generate_season(season, calendar_row)
+            for name, df in (('games.csv', games_df), ('games_details.csv', details_df)):
+                df.to_csv(os.path.join(output_path, name), mode='w' if i == 0 else 'a', header=i == 0, index=False)
+                written[name] += len(df)
+            logging.info(f'Season {season}: {len(games_df)} games, {len(details_df)} player rows')
+
+        tables = {
+            'player_data.csv': self.player_data(),
+            'teams.csv': self.teams,
+            'nba_teams.csv': self.nba_teams,
+            'season_calendar.csv': self.calendar
+        }
+        for name, df in tables.items():
+            df.to_csv(os.path.join(output_path, name), index=False, date_format='%Y-%m-%d')
+            written[name] = len(df)
+        return written
+
+def generate(output_path=OUTPUT_PATH, seasons=18, players=2400, first_season=FIRST_SEASON, seed=0):
+    """Writes a synthetic raw data set (same seed, same files) & returns the number of rows written per file."""
+    return RawDataGenerator(seasons, players, first_season, seed).write(output_path)
+
+def main():
+    """Writes a synthetic raw data set of the requested scale (defaults match the size of the real 2003-2020 data)."""
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    parser = argparse.ArgumentParser(description='Generate synthetic raw NBA CSVs for stress-testing the pipeline.')
+    parser.add_argument('-o', '--output', default=OUTPUT_PATH, help='directory to write the raw CSVs into')
+    parser.add_argument('-s', '--seasons', type=int, default=18, help=f'number of seasons (up to {LAST_SEASON})')
+    parser.add_argument('-p', '--players', type=int, default=2400, help='number of players over all seasons')
+    parser.add_argument('-f', '--first-season', type=int, default=FIRST_SEASON, help='starting year of first season')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (same seed, same files)')
+    args = parser.parse_args()
+
+    written = generate(args.output, args.seasons, args.players, args.first_season, args.seed)
+    for name, rows in written.items():
+        logging.info(f'{name}: {rows} rows')
+
+if __name__ == '__main__':
+    main()
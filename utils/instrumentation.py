@@ -0,0 +1,163 @@
+### HOW TO USE: Decorate a stage function with @instrumented() or wrap a block in `with stage(name) as record` (setting
+### record['rows_out']); call start_report() before a run & write_report(path) (.json, or .prom for Prometheus) after.
+
+import os
+import sys
+import json
+import time
+import logging
+import functools
+import tracemalloc
+from datetime import datetime
+from contextlib import contextmanager
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Not available on Windows, where peak RSS is left out of the records
+    resource = None
+
+# Metrics recorded for every stage (in record order) & their help text in Prometheus reports
+METRICS = {
+    'rows_in': 'Dataframe rows passed into the stage.',
+    'rows_out': 'Dataframe rows returned (or written) by the stage.',
+    'wall_seconds': 'Wall-clock time of the stage.',
+    'cpu_seconds': 'CPU time of the process during the stage.',
+    'peak_rss_growth_bytes': 'Growth of the peak resident set size of the process during the stage.',
+    'tracemalloc_peak_bytes': 'Peak traced Python memory during the stage, above the traced memory at its start.',
+    'tracemalloc_delta_bytes': 'Traced Python memory still allocated at the end of the stage, against its start.'
+}
+PROMETHEUS_PREFIX = 'nba3k_stage_'
+
+def peak_rss():
+    """Returns the peak resident set size of the process so far, in bytes (None where it can't be read)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # Linux reports kilobytes, macOS bytes
+
+def count_rows(value):
+    """Returns the rows of a dataframe (or Series), the total rows of those in a list/tuple, or None without any."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value.index)
+    if isinstance(value, (list, tuple)):
+        counts = [count_rows(item) for item in value if isinstance(item, (pd.DataFrame, pd.Series))]
+        return sum(counts) if counts else None
+    return None
+
+class RunReport:
+    """Collects a record per instrumented stage of a run (see METRICS) & writes them as a JSON or Prometheus report.
+    Stages may be nested (e.g. a cleaner's main inside a phase), but must all run on the same thread."""
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.started_at = datetime.now()
+        self.stages = []
+        self._running = []
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """Measures the enclosed block as one stage; the yielded record takes rows_out (& rows_in) from the caller."""
+
+        record = {'stage': name, **{metric: None for metric in METRICS}, 'error': None}
+        record['rows_in'] = rows_in
+        self.stages.append(record)
+
+        # Traced memory is measured against the start of the stage; an enclosing stage keeps the peak seen so far
+        tracing = self.trace_memory
+        started_tracing = tracing and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if tracing:
+            traced_start, traced_peak = tracemalloc.get_traced_memory()
+            if self._running:
+                self._running[-1]['peak'] = max(self._running[-1]['peak'], traced_peak)
+            tracemalloc.reset_peak()
+        running = {'peak': traced_start if tracing else 0}
+        self._running.append(running)
+        rss_start, wall_start, cpu_start = peak_rss(), time.perf_counter(), time.process_time()
+
+        try:
+            yield record
+        except Exception as e:
+            record['error'] = type(e).__name__
+            raise
+        finally:
+            record['wall_seconds'] = round(time.perf_counter() - wall_start, 6)
+            record['cpu_seconds'] = round(time.process_time() - cpu_start, 6)
+            if rss_start is not None:
+                record['peak_rss_growth_bytes'] = peak_rss() - rss_start
+            self._running.pop()
+            if tracing:
+                traced_end, traced_peak = tracemalloc.get_traced_memory()
+                traced_peak = max(running['peak'], traced_peak)
+                record['tracemalloc_peak_bytes'] = traced_peak - traced_start
+                record['tracemalloc_delta_bytes'] = traced_end - traced_start
+                if self._running:
+                    self._running[-1]['peak'] = max(self._running[-1]['peak'], traced_peak)
+                if started_tracing:
+                    tracemalloc.stop()
+            logging.info(f'{name}: {record["wall_seconds"]:.2f}s wall, {record["cpu_seconds"]:.2f}s CPU, '
+                         f'rows {record["rows_in"]} -> {record["rows_out"]}')
+
+    def to_json(self):
+        """Returns the report as a JSON document (run details & the stage records in start order)."""
+        return json.dumps({
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'argv': sys.argv,
+            'python': sys.version.split()[0],
+            'trace_memory': self.trace_memory,
+            'stages': self.stages
+        }, indent=2)
+
+    def to_prometheus(self):
+        """Returns the report in the Prometheus text exposition format (one gauge per metric, labelled by stage)."""
+        lines = []
+        for metric, help_text in METRICS.items():
+            lines += [f'# HELP {PROMETHEUS_PREFIX}{metric} {help_text}', f'# TYPE {PROMETHEUS_PREFIX}{metric} gauge']
+            lines += [f'{PROMETHEUS_PREFIX}{metric}{{stage="{record["stage"]}",step="{step}"}} {record[metric]}'
+                      for step, record in enumerate(self.stages, 1) if record[metric] is not None]
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Writes the report to path: Prometheus text for .prom files, JSON otherwise."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(self.to_prometheus() if path.endswith('.prom') else self.to_json())
+
+_report = RunReport()
+
+def start_report(trace_memory=False):
+    """Starts a new run report that the stages record into. Tracing Python memory (tracemalloc) slows pure-Python
+    stages down several times over, so it is left to runs that need the memory deltas."""
+    global _report
+    _report = RunReport(trace_memory)
+    return _report
+
+def current_report():
+    """Returns the run report the stages currently record into."""
+    return _report
+
+def stage(name, rows_in=None):
+    """Measures the enclosed block as a stage of the current run report (see RunReport.stage)."""
+    return _report.stage(name, rows_in)
+
+def instrumented(name=None):
+    """Decorates a function as a stage, counting the dataframe rows of its arguments & of what it returns. Stages are
+    named after the function's module for main functions (e.g. 'generate_team'), after the function otherwise."""
+    def decorator(func):
+        stage_name = name or (func.__module__.split('.')[-1] if func.__name__ == 'main' else func.__qualname__)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name, count_rows(list(args) + list(kwargs.values()))) as record:
+                result = func(*args, **kwargs)
+                record['rows_out'] = count_rows(result)
+            return result
+        return wrapper
+    return decorator
+
+def write_report(path):
+    """Writes the current run report to path (Prometheus text for .prom files, JSON otherwise)."""
+    _report.write(path)
+    logging.info(f'Wrote the run report of {len(_report.stages)} stages to {path}')
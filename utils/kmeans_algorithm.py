@@ -0,0 +1,109 @@
+### HOW TO USE: Import & instantiate class with number of clusters, call fit method with a 2D feature array, retrieve
+### labels/centers/inertia attributes. Use fit_many to evaluate several k values & restarts across processes.
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+def squared_distances(features, centers):
+    """Returns the (n_samples, n_centers) matrix of squared euclidean distances, computed via dot products."""
+    distances = (np.einsum('ij,ij->i', features, features)[:, None] - 2 * features @ centers.T +
+                 np.einsum('ij,ij->i', centers, centers)[None, :])
+    return np.maximum(distances, 0)
+
+def kmeans_plus_plus(features, n_clusters, rng):
+    """Seeds initial centers with k-means++ (each next center sampled proportionally to its squared distance)."""
+    centers = np.empty((n_clusters, features.shape[1]))
+    centers[0] = features[rng.integers(len(features))]
+    closest = squared_distances(features, centers[:1])[:, 0]
+    for i in range(1, n_clusters):
+        total = closest.sum()
+        idx = rng.choice(len(features), p=closest / total) if total > 0 else rng.integers(len(features))
+        centers[i] = features[idx]
+        closest = np.minimum(closest, squared_distances(features, centers[i:i + 1])[:, 0])
+    return centers
+
+def lloyd(features, centers, max_iter=300, tol=1e-4):
+    """Runs Lloyd iterations from the given centers until they move less than tol; returns labels, centers, inertia."""
+    for _ in range(max_iter):
+        labels = squared_distances(features, centers).argmin(axis=1)
+
+        # Recompute centers as cluster means in one pass (empty clusters keep their previous center)
+        counts = np.bincount(labels, minlength=len(centers))
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, features)
+        new_centers = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+
+        shift = np.sum((new_centers - centers) ** 2)
+        centers = new_centers
+        if shift <= tol:
+            break
+
+    distances = squared_distances(features, centers)
+    labels = distances.argmin(axis=1)
+    return labels, centers, distances[np.arange(len(features)), labels].sum()
+
+def _fit_restarts(args):
+    """Runs a batch of seeded restarts for one k value & returns the best (lowest inertia) result (process worker)."""
+    features, n_clusters, seed_sequences, max_iter, tol = args
+    best = None
+    for seed_sequence in seed_sequences:
+        rng = np.random.default_rng(seed_sequence)
+        result = lloyd(features, kmeans_plus_plus(features, n_clusters, rng), max_iter, tol)
+        if best is None or result[2] < best[2]:
+            best = result
+    return n_clusters, best
+
+def fit_many(features, k_values, n_init=20, seed=None, workers=None, max_iter=300, tol=1e-4):
+    """Fits k-means for every k value with n_init restarts each, sharding restarts across a process pool.
+
+    Returns a dict of k -> (labels, centers, inertia) of the best restart. Seeds are derived from one SeedSequence so
+    results are reproducible for a given seed, regardless of the number of workers."""
+
+    features = np.ascontiguousarray(features, dtype=np.float64)
+    workers = workers or os.cpu_count() or 1
+    root = np.random.SeedSequence(seed)
+
+    # One task per (k, chunk of restarts), so that both k values & restarts are spread across the workers
+    tasks = []
+    for k, k_seed in zip(k_values, root.spawn(len(k_values))):
+        restart_seeds = k_seed.spawn(n_init)
+        for chunk in np.array_split(np.arange(n_init), min(n_init, max(1, workers // len(k_values) or 1))):
+            tasks.append((features, k, [restart_seeds[i] for i in chunk], max_iter, tol))
+
+    if workers == 1:
+        results = map(_fit_restarts, tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_fit_restarts, tasks))
+
+    best = {}
+    for k, result in results:
+        if k not in best or result[2] < best[k][2]:
+            best[k] = result
+    return best
+
+class KMeans:
+    """Implements vectorized k-means clustering with k-means++ seeding & multiple restarts (like R's nstart)."""
+
+    def __init__(self, n_clusters, n_init=20, seed=None, workers=1, max_iter=300, tol=1e-4):
+        self.n_clusters = n_clusters
+        self.n_init = n_init
+        self.seed = seed
+        self.workers = workers
+        self.max_iter = max_iter
+        self.tol = tol
+        self.labels = None
+        self.centers = None
+        self.inertia = None
+
+    def fit(self, features):
+        """Clusters the rows of the feature array, keeping the restart with the lowest within-cluster sum of squares."""
+        self.labels, self.centers, self.inertia = fit_many(
+            features, [self.n_clusters], self.n_init, self.seed, self.workers, self.max_iter, self.tol
+        )[self.n_clusters]
+        return self
+
+    def predict(self, features):
+        """Assigns each row of the feature array to its closest fitted center."""
+        return squared_distances(np.asarray(features, dtype=np.float64), self.centers).argmin(axis=1)
@@ -0,0 +1,46 @@
+### HOW TO USE: Import & instantiate class with the intermediate player dataframe (or call from_csv), then resolve
+### player names from any outside source into player IDs via the resolve method.
+
+import re
+import logging
+import unicodedata
+import pandas as pd
+
+INTERMEDIATE_PLAYER_DATA_PATH = './data/intermediate/intermediate_player_data.csv'
+NAME_SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv'}
+
+def normalize_name(name):
+    """Normalizes a player name for matching across sources (accents, case, punctuation & suffixes removed)."""
+    if not isinstance(name, str):
+        return None
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii').lower()
+    tokens = re.sub(r"[.'`,*]", '', name).replace('-', ' ').split()
+    return ' '.join(token for token in tokens if token not in NAME_SUFFIXES)
+
+class PlayerRegistry:
+    """Resolves player names (from any source spelling) to the player IDs assigned in intermediate_player_data."""
+
+    def __init__(self, intermediate_player_data):
+        player_df = intermediate_player_data[['player_id', 'Name']].dropna()
+        self.names = dict(zip(player_df.player_id, player_df.Name))
+
+        # First player ID wins for normalized names shared by different players (order of the intermediate data)
+        normalized = player_df.Name.map(normalize_name)
+        self.ids = dict(zip(normalized[~normalized.duplicated()], player_df.player_id[~normalized.duplicated()]))
+
+    @classmethod
+    def from_csv(cls, path=INTERMEDIATE_PLAYER_DATA_PATH):
+        """Instantiates the registry from the intermediate player data CSV file."""
+        return cls(pd.read_csv(path, sep=',', header=0, encoding='utf-8'))
+
+    def resolve(self, names):
+        """Maps a Series/list of names to player IDs (nullable Int64 Series; missing where no player matched)."""
+        names = pd.Series(names)
+        player_ids = names.map(normalize_name).map(self.ids).astype('Int64')
+        if player_ids.isna().any():
+            logging.debug(f'Unresolved player names: {names[player_ids.isna()].tolist()}')
+        return player_ids
+
+    def name(self, player_id):
+        """Returns the registered name of a player ID (None if unknown)."""
+        return self.names.get(player_id)
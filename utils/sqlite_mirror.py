@@ -0,0 +1,79 @@
+### HOW TO USE: Call build_mirror(path, tables) with the processed dataframes (see execute_cleaners --sqlite), then
+### read it through data_source.SQLiteSource (load for comprehensive rows, read for ad-hoc SQL).
+
+import os
+import time
+import sqlite3
+import logging
+from utils import db_schema
+from utils.data_source import COMPREHENSIVE_SQL, MIRROR_PATH
+from cleaners.comprehensive_compiler import COMPREHENSIVE_COLUMNS
+
+# Processed tables of the mirror, in load order, & the unique key of the tables that have one in production
+TABLES = ['team', 'player', 'player_position', 'player_team', 'fixture', 'player_statistic', 'player_season_aggregate']
+UNIQUE_KEYS = {
+    'team': ['team_id'],
+    'player': ['player_id'],
+    'fixture': ['fixture_id'],
+    'player_season_aggregate': ['player_id', 'season']
+}
+INSERT_CHUNK_ROWS = 50000
+
+def comprehensive_view_sql():
+    """Builds the comprehensive_player_statistic view (same columns as the compiled CSV) over the mirrored tables."""
+    expressions = ',\n    '.join(f'{COMPREHENSIVE_SQL.get(col, "ps." + col)} AS "{col}"'
+                                  for col in COMPREHENSIVE_COLUMNS)
+    return f'''CREATE VIEW comprehensive_player_statistic AS
+SELECT
+    {expressions}
+FROM player_statistic ps
+LEFT JOIN fixture f ON f.fixture_id = ps.fixture_id
+LEFT JOIN player p ON p.player_id = ps.player_id'''
+
+def build_mirror(path, tables):
+    """Writes the processed tables into a fresh single-file SQLite database, with production's indexes & a view.
+
+    The database is built in a temporary file (bulk inserts with journaling off, indexes after the rows) & then
+    swapped in, so readers never see a partial mirror.
+
+    Args:
+        path (str): Where to write the database file
+        tables (dict): Table name -> processed dataframe (tables missing from TABLES are skipped)
+    """
+
+    start = time.perf_counter()
+    tmp_path = f'{path}.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.execute('PRAGMA journal_mode = OFF')
+        connection.execute('PRAGMA synchronous = OFF')
+        for table in TABLES:
+            if tables.get(table) is None:
+                logging.debug(f'No {table} dataframe to mirror; skipping.')
+                continue
+            table_df = tables[table]
+            if table in UNIQUE_KEYS:
+                table_df = table_df.drop_duplicates(subset=UNIQUE_KEYS[table])
+            table_df.to_sql(table, connection, index=False, chunksize=INSERT_CHUNK_ROWS)
+
+        # Same secondary indexes as production, plus the primary/unique keys
+        mirrored = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for name, table, columns in db_schema.INDEXES:
+            if table in mirrored:
+                connection.execute(f'CREATE INDEX {name} ON {table} ({columns})')
+        for table, columns in UNIQUE_KEYS.items():
+            if table in mirrored:
+                connection.execute(f'CREATE UNIQUE INDEX {table}_key ON {table} ({", ".join(columns)})')
+        if {'player_statistic', 'fixture', 'player'} <= mirrored:
+            connection.execute(comprehensive_view_sql())
+        connection.execute('ANALYZE')
+        connection.commit()
+    finally:
+        connection.close()
+
+    os.replace(tmp_path, path)
+    logging.info(f'Built SQLite mirror {path} in {time.perf_counter() - start:.2f}s.')
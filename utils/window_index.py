@@ -0,0 +1,161 @@
+### HOW TO USE: Import & instantiate class with a player-game stats dataframe (player_id, fixture_id, played_on & stat
+### columns), then query window totals/averages (last N games, date range, season phase) via totals/averages methods.
+
+import logging
+import numpy as np
+import pandas as pd
+from utils import generate_game_id
+
+# Season phase codes, in chronological order within a season (keys are season * len(SEASON_PHASES) + code)
+SEASON_PHASES = ['pre-season', 'before-asb', 'after-asb', 'post-season']
+_DAY_BITS = 32
+
+class StatWindowIndex:
+    """Per-player, date-ordered prefix sums of stat columns, stored as contiguous arrays with per-player offsets.
+    Any window aggregate (last N games, date range, season phase) is two lookups & a subtraction per player, as
+    season phases are assigned by date (see phase_keys) so that they rise along each player's games."""
+
+    def __init__(self, stats_df, stats, season_calendar=None):
+        """Builds the index from the given rows (callers filter out DNPs, etc. beforehand).
+
+        Args:
+            stats_df (pd.DataFrame): Player-game rows with player_id, fixture_id, played_on & the stat columns
+            stats (list): Stat columns to index (non-numeric values, e.g. empty strings, count as missing)
+            season_calendar (pd.DataFrame): Season calendar (see generate_fixture.load_season_calendar), used to
+                split regular seasons at the all-star break (see phase_keys)
+        """
+        self.stats = list(stats)
+        stats_df = stats_df[stats_df['fixture_id'].notna()]
+        played_on = pd.to_datetime(stats_df['played_on'])
+        dated = played_on.notna().to_numpy()
+        if not dated.all():
+            logging.debug(f'Skipped {int((~dated).sum())} rows of games without a date.')
+        stats_df, played_on = stats_df[dated], played_on[dated]
+        fixture_ids = stats_df['fixture_id'].to_numpy(dtype=np.int64)
+        days = played_on.to_numpy(dtype='datetime64[D]').astype(np.int64)
+        keys = self.phase_keys(fixture_ids, days, season_calendar)
+
+        # Order rows by player, then by day (fixture IDs break same-day ties)
+        order = np.lexsort((fixture_ids, days, stats_df['player_id'].to_numpy()))
+        player_ids = stats_df['player_id'].to_numpy()[order]
+        self.fixture_ids, self.days, self.keys = fixture_ids[order], days[order], keys[order]
+        self.played_on = stats_df['played_on'].to_numpy()[order]
+
+        # Player offsets: rows of the player at position p are offsets[p]:offsets[p + 1]
+        is_start = np.r_[True, player_ids[1:] != player_ids[:-1]] if len(player_ids) else np.zeros(0, dtype=bool)
+        self.player_ids = player_ids[is_start]
+        self.offsets = np.r_[np.flatnonzero(is_start), len(player_ids)].astype(np.int64)
+        self.positions = {player_id: pos for pos, player_id in enumerate(self.player_ids.tolist())}
+        row_positions = np.cumsum(is_start) - 1
+        out_of_order = np.r_[False, self.keys[1:] < self.keys[:-1]] & ~is_start
+        if out_of_order.any():
+            logging.warning(f'{int(out_of_order.sum())} games precede an earlier season phase of the same player, '
+                            f'so season & phase windows including them are inexact.')
+
+        # Composite (player position, day/phase key) arrays, sorted, so windows of all players share one searchsorted
+        self._day_keys = (row_positions << _DAY_BITS) | np.clip(self.days, 0, 2 ** _DAY_BITS - 1)
+        self._phase_keys = (row_positions << _DAY_BITS) | self.keys
+
+        # Prefix sums (with a leading zero row) of stat values & of non-missing value counts
+        values = stats_df[self.stats].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)[order]
+        self.values = values
+        self.prefix = np.zeros((len(values) + 1, len(self.stats)))
+        self.count_prefix = np.zeros((len(values) + 1, len(self.stats)), dtype=np.int64)
+        np.cumsum(np.nan_to_num(values), axis=0, out=self.prefix[1:])
+        np.cumsum(~np.isnan(values), axis=0, out=self.count_prefix[1:])
+
+        logging.debug(f'Indexed {len(values)} games of {len(self.player_ids)} players for {len(self.stats)} stats.')
+
+    @staticmethod
+    def phase_keys(fixture_ids, days, season_calendar=None):
+        """Returns the season * len(SEASON_PHASES) + phase code key of each game (rising chronologically).
+        A season's all-star break is its first all-star game or its calendar all_star_break, whichever comes first;
+        regular-season games from then on are 'after-asb' (all 'before-asb' if the season has neither)."""
+
+        seasons, phases = generate_game_id.fixture_season(fixture_ids), generate_game_id.fixture_phase(fixture_ids)
+        season_values, season_rows = np.unique(seasons, return_inverse=True)
+        break_days = np.full(len(season_values), np.iinfo(np.int64).max)
+        if season_calendar is not None and len(season_calendar):
+            calendar_df = season_calendar.sort_values(by='season')
+            calendar_seasons = calendar_df['season'].to_numpy(dtype=np.int64)
+            idx = np.minimum(np.searchsorted(calendar_seasons, season_values), len(calendar_seasons) - 1)
+            asb_days = calendar_df['all_star_break'].to_numpy(dtype='datetime64[D]').astype(np.int64)[idx]
+            break_days = np.where(calendar_seasons[idx] == season_values, asb_days, break_days)
+        all_star = phases == generate_game_id.ALL_STAR
+        np.minimum.at(break_days, season_rows[all_star], days[all_star])
+        after_asb = days >= break_days[season_rows]
+
+        codes = np.select(
+            [phases == generate_game_id.PRE_SEASON, phases == generate_game_id.REGULAR_SEASON,
+             phases == generate_game_id.ALL_STAR],
+            [0, np.where(after_asb, 2, 1), 2],
+            default=3
+        )
+        return seasons * len(SEASON_PHASES) + codes
+
+    def _positions(self, player_ids):
+        """Returns the index positions of the given player IDs (all players if None); raises KeyError if unknown."""
+        if player_ids is None:
+            return np.arange(len(self.player_ids))
+        return np.array([self.positions[player_id] for player_id in np.atleast_1d(player_ids).tolist()],
+                        dtype=np.int64)
+
+    def bounds(self, player_ids=None, season=None, phase=None, start=None, end=None, last_n=None):
+        """Returns (positions, lo, hi): each player's window is rows lo:hi (filters combine, last_n applied last).
+
+        Args:
+            player_ids: Player ID(s) to query (all indexed players if None)
+            season (int): 4-digit starting year of the season
+            phase (str): One of SEASON_PHASES (requires season)
+            start, end: First & last date of the window (inclusive)
+            last_n (int): Only keep the last N games of the window
+        """
+
+        positions = self._positions(player_ids)
+        lo, hi = self.offsets[positions], self.offsets[positions + 1]
+        shifted = positions << _DAY_BITS
+
+        if season is not None:
+            first = season * len(SEASON_PHASES) + (0 if phase is None else SEASON_PHASES.index(phase))
+            last = season * len(SEASON_PHASES) + (len(SEASON_PHASES) - 1 if phase is None else
+                                                  SEASON_PHASES.index(phase))
+            lo = np.maximum(lo, np.searchsorted(self._phase_keys, shifted | first, side='left'))
+            hi = np.minimum(hi, np.searchsorted(self._phase_keys, shifted | last, side='right'))
+        elif phase is not None:
+            raise ValueError('A season is needed to query a season phase')
+        if start is not None:
+            day = pd.Timestamp(start).to_datetime64().astype('datetime64[D]').astype(np.int64)
+            lo = np.maximum(lo, np.searchsorted(self._day_keys, shifted | day, side='left'))
+        if end is not None:
+            day = pd.Timestamp(end).to_datetime64().astype('datetime64[D]').astype(np.int64)
+            hi = np.minimum(hi, np.searchsorted(self._day_keys, shifted | day, side='right'))
+
+        hi = np.maximum(hi, lo)
+        if last_n is not None:
+            lo = np.maximum(lo, hi - last_n)
+        return positions, lo, hi
+
+    def totals(self, player_ids=None, **window):
+        """Returns a player_id-indexed dataframe of games & stat totals over the window (see bounds for filters)."""
+        positions, lo, hi = self.bounds(player_ids, **window)
+        totals_df = pd.DataFrame(self.prefix[hi] - self.prefix[lo], columns=self.stats,
+                                 index=pd.Index(self.player_ids[positions], name='player_id'))
+        totals_df.insert(0, 'games', hi - lo)
+        return totals_df
+
+    def averages(self, player_ids=None, **window):
+        """Returns a player_id-indexed dataframe of games & per-game stat averages (missing values not counted)."""
+        positions, lo, hi = self.bounds(player_ids, **window)
+        counts = self.count_prefix[hi] - self.count_prefix[lo]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            averages = (self.prefix[hi] - self.prefix[lo]) / counts
+        averages_df = pd.DataFrame(averages, columns=self.stats,
+                                   index=pd.Index(self.player_ids[positions], name='player_id'))
+        averages_df.insert(0, 'games', hi - lo)
+        return averages_df
+
+    def seasons(self, player_id):
+        """Returns the sorted seasons a player has indexed games in."""
+        pos = self.positions[player_id]
+        keys = self.keys[self.offsets[pos]:self.offsets[pos + 1]]
+        return np.unique(keys // len(SEASON_PHASES)).tolist()
@@ -0,0 +1,156 @@
+import time
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+from utils import generate_game_id
+from utils.window_index import StatWindowIndex
+from player_valuation import LeagueValuation, category_values, standardize, PUNT_MASKS, punt_variant
+from utils.fantasy_categories import CATEGORIES
+
+# Defining the paths for the comprehensive player/game statistics, player teams & the exported recommendations
+DATA_PATH = './data/intermediate/comprehensive_player_statistic.csv'
+PLAYER_TEAM_PATH = './data/processed/player_team.csv'
+RECOMMENDATIONS_PATH = './data/processed/waiver_recommendations.csv'
+
+# Custom player statuses (see generate_player_statistic.player_status_conversion) of games a player missed
+STATUSES = ['DNP-CD', 'DNP-REST', 'NWT', 'SUS', 'DNP-ILL', 'INJ', 'PROTOCOL']
+FREE_AGENT_TEAMS = (0, 'FA')
+
+def logger_setup():
+    """Standardized logging set up with custom handlers & formatters. Implements logging for all submodules executed."""
+    logger = logging.getLogger()
+    sh, fh = logging.StreamHandler(), logging.FileHandler('../logs_nba3k.log', 'a')
+    sh.setFormatter(logging.Formatter('%(message)s'))
+    fh.setFormatter(logging.Formatter('%(module)s (%(lineno)d): %(asctime)s | %(levelname)s | %(message)s'))
+    logger.setLevel(logging.DEBUG), sh.setLevel(logging.INFO), logger.addHandler(fh), logger.addHandler(sh)
+    return logger
+
+def free_agents(player_team_df):
+    """Returns the IDs of players without an NBA team (team_id FA/0) in the processed player_team dataframe."""
+    is_free_agent = player_team_df['team_id'].astype(str).isin([str(team) for team in FREE_AGENT_TEAMS])
+    return player_team_df.loc[is_free_agent, 'player_id'].tolist()
+
+class WaiverRecommender:
+    """Ranks waiver-wire candidates by category fit for a roster, current hot-stretch lift & recent availability.
+    Every score is computed for the whole player pool at once from prefix-sum windows (see StatWindowIndex)."""
+
+    def __init__(self, comprehensive_stats_df, season, season_calendar=None):
+        """Builds the valuation windows (games played) & the availability windows (every listed game & its status)."""
+        self.season = season
+        self.valuation = LeagueValuation(comprehensive_stats_df, season_calendar)
+        self.status_index = None
+        self.pre_processing(comprehensive_stats_df)
+
+    def pre_processing(self, comprehensive_stats_df):
+        """Index the regular-season games each player was listed for, flagged as played or by the status missed."""
+
+        status_df = comprehensive_stats_df[comprehensive_stats_df['fixture_id'].notna()]
+        status_df = status_df[generate_game_id.is_regular_season(status_df['fixture_id'].astype(np.int64))]
+        flags = {'played': (status_df['seconds_played'].fillna(0) > 0).astype(np.float64)}
+        statuses = status_df['player_status'].astype(str)
+        flags.update({status: (statuses == status).astype(np.float64) for status in STATUSES})
+        status_df = pd.concat([status_df[['player_id', 'fixture_id', 'played_on']], pd.DataFrame(flags)], axis=1)
+        self.status_index = StatWindowIndex(status_df, ['played'] + STATUSES, self.valuation.season_calendar)
+
+    def recommend(self, candidates, roster=(), as_of=None, recent_games=10, availability_games=10, punts=(),
+                  min_games=5, lift_weight=0.5):
+        """Scores & ranks waiver candidates for a roster as of a date.
+
+        Args:
+            candidates (list): Player IDs available on waivers
+            roster (list): Player IDs of the fantasy roster (category needs are weighted by its weaknesses)
+            as_of (str): Last date of data to use (every game of the season if None)
+            recent_games (int): Games of the current stretch compared against the season average
+            availability_games (int): Listed games used for the availability rate
+            punts (list): Categories punted by the roster (left out of fit & lift)
+            min_games (int): Games needed to be part of the pool the z-scores are standardized against
+            lift_weight (float): Weight of the hot-stretch lift relative to category fit
+
+        Returns:
+            pd.DataFrame: Candidates ranked by score = availability x (fit + lift_weight x lift)
+        """
+
+        # Season-to-date z-scores of every player, standardized against the pool with min_games
+        player_ids, games, totals = self.valuation.window_totals(self.season, end=as_of)
+        pool = games >= min_games
+        if not pool.any():
+            raise ValueError(f'No players with {min_games}+ games in the {self.season} season as of {as_of}')
+        pool_values, pool_pcts = category_values(games[pool], totals[pool])
+        mean, std = pool_values.mean(axis=0), pool_values.std(axis=0)
+        season_z = standardize(category_values(games, totals, pool_pcts)[0], mean, std)
+
+        # Current stretch z-scores on the same scale (last N games, per player)
+        _, recent_counts, recent_totals = self.valuation.window_totals(self.season, end=as_of, last_n=recent_games)
+        recent_z = standardize(category_values(recent_counts, recent_totals, pool_pcts)[0], mean, std)
+
+        # Category needs: weights grow where the roster is weak (per player), punted categories don't count
+        weights = PUNT_MASKS[punt_variant(punts)].astype(np.float64)
+        rows = np.flatnonzero(np.isin(player_ids, list(roster)))
+        if len(rows):
+            weights = weights * np.exp(-season_z[rows].mean(axis=0))
+            weights = weights / weights[weights > 0].mean()
+
+        availability_df = self.status_index.totals(
+            [player_id for player_id in player_ids if player_id in self.status_index.positions],
+            season=self.season, end=as_of, last_n=availability_games
+        )
+
+        scores_df = pd.DataFrame({
+            'player_id': player_ids,
+            'player_name': [self.valuation.player_names.get(player_id) for player_id in player_ids],
+            'games': games.astype(np.int64),
+            'fit': (season_z @ weights).round(3),
+            'lift': ((recent_z - season_z) @ weights).round(3)
+        }).set_index('player_id')
+        scores_df['availability'] = (availability_df['played'] / availability_df['games']).round(3)
+        for status in STATUSES:
+            scores_df[f'missed_{status}'] = availability_df[status].astype(np.int64)
+        scores_df['score'] = (scores_df['availability'] * (scores_df['fit'] + lift_weight * scores_df['lift'])).round(3)
+
+        missing = set(candidates) - set(scores_df.index)
+        if missing:
+            logging.debug(f'Candidates without games in the {self.season} season: {sorted(missing)}')
+        scores_df = scores_df[scores_df.index.isin(candidates)]
+        return scores_df.sort_values(by='score', ascending=False).reset_index()
+
+def main():
+    """Ranks the free agents (players without an NBA team) & exports the morning waiver recommendations."""
+    logger = logger_setup()
+
+    parser = argparse.ArgumentParser(description='Rank waiver-wire candidates for a fantasy roster.')
+    parser.add_argument('season', type=int, help='starting year of the season, e.g. 2020')
+    parser.add_argument('--as-of', help='last date of data to use (YYYY-MM-DD)')
+    parser.add_argument('--roster', nargs='*', type=int, default=[], help='player IDs of the fantasy roster')
+    parser.add_argument('--pool', choices=['free-agents', 'all'], default='free-agents',
+                        help='rank players without an NBA team (FA/0 in player_team) or every player not on the roster')
+    parser.add_argument('--punt', nargs='*', default=[], choices=CATEGORIES, help='categories to punt')
+    parser.add_argument('--recent-games', type=int, default=10, help='games of the current stretch')
+    parser.add_argument('--top', type=int, default=25, help='number of players to display')
+    args = parser.parse_args()
+
+    try:
+        logging.info('\nLOG: Loading player statistical data since 2016...')
+        comprehensive_stats_df = pd.read_csv(DATA_PATH, sep=',', header=0, encoding='utf-8', low_memory=False)
+        player_team_df = pd.read_csv(PLAYER_TEAM_PATH, sep=',', header=0, encoding='utf-8')
+    except FileNotFoundError as e:
+        logging.error(f'File not found error: {e}')
+        return
+
+    start = time.perf_counter()
+    recommender = WaiverRecommender(comprehensive_stats_df, args.season)
+    if args.pool == 'free-agents':
+        candidates = free_agents(player_team_df)
+    else:
+        candidates = [player_id for player_id in recommender.valuation.player_names if player_id not in args.roster]
+    recommendations_df = recommender.recommend(candidates, args.roster, args.as_of, args.recent_games,
+                                               punts=args.punt)
+    elapsed = time.perf_counter() - start
+
+    recommendations_df.to_csv(path_or_buf=RECOMMENDATIONS_PATH, index=False)
+    logging.info(recommendations_df.head(args.top).to_string(index=False))
+    logging.info(f'\nRanked {len(recommendations_df)} waiver candidates in {elapsed:.3f}s '
+                 f'(exported to {RECOMMENDATIONS_PATH}).')
+
+if __name__ == '__main__':
+    main()